@@ -1,18 +1,34 @@
+from .adaptive_concurrency_settings import adaptive_concurrency_config
 from .dataset_enum import Dataset
 from .dataset_settings import datasets_config
+from .export_pipeline_settings import parquet_export_pipeline_config
 from .ingestion_pipelines_settings import (
     guitar_set_ingestion_pipeline_config,
     idmt_smt_guitar_ingestion_pipeline_config,
 )
+from .job_queue_settings import job_queue_config
+from .logging_settings import logging_config
+from .metrics_settings import metrics_config
 from .minio_settings import minio_config
 from .mongodb_settings import mongo_config
 from .postgresql_settings import postgres_config
+from .profiling_settings import profiling_config
+from .scheduling_settings import scheduling_config
+from .tracing_settings import tracing_config
 
 __all__ = [
+    "adaptive_concurrency_config",
     "Dataset",
     "datasets_config",
     "ingestion_pipeline_config",
+    "job_queue_config",
+    "logging_config",
+    "metrics_config",
     "minio_config",
     "mongo_config",
+    "parquet_export_pipeline_config",
     "postgres_config",
+    "profiling_config",
+    "scheduling_config",
+    "tracing_config",
 ]
@@ -0,0 +1,19 @@
+import os
+from dataclasses import dataclass
+
+
+@dataclass
+class AdaptiveConcurrencyConfig:
+    enabled: bool = os.getenv("ADAPTIVE_CONCURRENCY", "true").lower() == "true"
+    window: int = int(os.getenv("ADAPTIVE_WINDOW", 16))  # Requests by decision
+    decrease_factor: float = float(os.getenv("ADAPTIVE_DECREASE_FACTOR", 0.5))
+    latency_spike_factor: float = float(os.getenv("ADAPTIVE_LATENCY_SPIKE_FACTOR", 2.0))
+    throughput_tolerance: float = float(os.getenv("ADAPTIVE_THROUGHPUT_TOLERANCE", 0.05))
+    probe_after: int = int(os.getenv("ADAPTIVE_PROBE_AFTER", 4))  # Holds before probing a higher limit
+    upload_max_concurrency: int = int(os.getenv("ADAPTIVE_UPLOAD_MAX_CONCURRENCY", 16))
+    bulk_min_batch_size: int = int(os.getenv("ADAPTIVE_BULK_MIN_BATCH_SIZE", 50))
+    bulk_max_batch_size: int = int(os.getenv("ADAPTIVE_BULK_MAX_BATCH_SIZE", 2000))
+    bulk_batch_size_step: int = int(os.getenv("ADAPTIVE_BULK_BATCH_SIZE_STEP", 50))
+
+
+adaptive_concurrency_config = AdaptiveConcurrencyConfig()
@@ -0,0 +1,13 @@
+import os
+from dataclasses import dataclass
+
+
+@dataclass
+class ParquetExportPipelineConfig:
+    prefix: str = os.getenv("PARQUET_EXPORT_PREFIX", "parquet")
+    cursor_batch_size: int = int(os.getenv("PARQUET_EXPORT_CURSOR_BATCH_SIZE", 100))
+    row_group_size: int = int(os.getenv("PARQUET_EXPORT_ROW_GROUP_SIZE", 250_000))
+    compression: str = os.getenv("PARQUET_EXPORT_COMPRESSION", "zstd")
+
+
+parquet_export_pipeline_config = ParquetExportPipelineConfig()
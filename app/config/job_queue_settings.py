@@ -0,0 +1,13 @@
+import os
+from dataclasses import dataclass
+
+
+@dataclass
+class JobQueueConfig:
+    batch_size: int = int(os.getenv("JOB_QUEUE_BATCH_SIZE", 8))
+    lease_seconds: int = int(os.getenv("JOB_QUEUE_LEASE_SECONDS", 600))
+    max_attempts: int = int(os.getenv("JOB_QUEUE_MAX_ATTEMPTS", 3))
+    poll_interval: float = float(os.getenv("JOB_QUEUE_POLL_INTERVAL", 5))
+
+
+job_queue_config = JobQueueConfig()
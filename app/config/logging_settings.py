@@ -0,0 +1,15 @@
+import os
+from dataclasses import dataclass
+
+
+@dataclass
+class LoggingConfig:
+    file_level: str = os.getenv("LOG_FILE_LEVEL", "DEBUG")  # The console stays at INFO
+    json_lines: bool = os.getenv("LOG_JSON_LINES", "false").lower() == "true"  # JSON lines log file
+    # Records kept by call site and period, at or above rate_limit_level and below ERROR. 0 for no limit
+    rate_limit_burst: int = int(os.getenv("LOG_RATE_LIMIT_BURST", 20))
+    rate_limit_period: float = float(os.getenv("LOG_RATE_LIMIT_PERIOD", 60))
+    rate_limit_level: str = os.getenv("LOG_RATE_LIMIT_LEVEL", "WARNING")
+
+
+logging_config = LoggingConfig()
@@ -0,0 +1,14 @@
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass
+class MetricsConfig:
+    enabled: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    report_dir: Path = Path(os.getenv("METRICS_DIR", "./app/logs"))  # /app/logs in container
+    prometheus_textfile: str | None = os.getenv("METRICS_PROMETHEUS_TEXTFILE")  # Disabled if None
+    prometheus_interval: float = float(os.getenv("METRICS_PROMETHEUS_INTERVAL", 15))
+
+
+metrics_config = MetricsConfig()
@@ -13,6 +13,31 @@ class MinIOConfig:
     bucket_raw: str = os.getenv("BUCKET_BRONZE", "raw")
     bucket_processed: str = os.getenv("BUCKET_SILVER", "processed")
     bucket_output: str = os.getenv("BUCKET_GOLD", "output")
+    cache_dir: str | None = os.getenv("MINIO_CACHE_DIR")  # Disk cache disabled if None
+    cache_max_bytes: int = int(os.getenv("MINIO_CACHE_MAX_MB", 2048)) * 1024 * 1024
+    cache_ttl: float = float(os.getenv("MINIO_CACHE_TTL", 0))  # 0: validate with stat_object
+    index_path: str | None = os.getenv("MINIO_INDEX_PATH")  # Object index disabled if None
+    index_workers: int = int(os.getenv("MINIO_INDEX_WORKERS", 8))
+    compression: str | None = os.getenv("MINIO_COMPRESSION")  # "gzip", "zstd" or None
+    compression_min_bytes: int = int(os.getenv("MINIO_COMPRESSION_MIN_BYTES", 1024))
+    audio_format_raw: str = os.getenv("AUDIO_FORMAT_RAW", "WAV")  # "WAV", "FLAC" or "OGG"
+    audio_format_processed: str = os.getenv("AUDIO_FORMAT_PROCESSED", "WAV")
+    audio_format_output: str = os.getenv("AUDIO_FORMAT_OUTPUT", "WAV")
+    upload_workers: int = int(os.getenv("MINIO_UPLOAD_WORKERS", 4))
+    multipart_threshold: int = int(os.getenv("MINIO_MULTIPART_THRESHOLD_MB", 16)) * 1024 * 1024
+    multipart_part_size: int = int(os.getenv("MINIO_MULTIPART_PART_SIZE_MB", 8)) * 1024 * 1024
+    multipart_workers: int = int(os.getenv("MINIO_MULTIPART_WORKERS", 8))
+    multipart_retries: int = int(os.getenv("MINIO_MULTIPART_RETRIES", 3))
+    shared_audio_cache_max_bytes: int = int(os.getenv("SHARED_AUDIO_CACHE_MAX_MB", 1024)) * 1024 * 1024
+    shared_audio_cache_load_timeout: float = float(os.getenv("SHARED_AUDIO_CACHE_LOAD_TIMEOUT", 300))
+
+    @property
+    def audio_formats(self) -> dict[str, str]:
+        return {
+            self.bucket_raw: self.audio_format_raw.upper(),
+            self.bucket_processed: self.audio_format_processed.upper(),
+            self.bucket_output: self.audio_format_output.upper(),
+        }
 
 
 minio_config = MinIOConfig()
@@ -13,6 +13,16 @@ class MongoConfig:
     collection_note_midi: str = "note_midi"
     collection_beat_position: str = "beat_position"
     collection_chord: str = "chord"
+    ensure_indexes: bool = os.getenv("MONGO_ENSURE_INDEXES", "true").lower() == "true"
+    bulk_batch_size: int = int(os.getenv("MONGO_BULK_BATCH_SIZE", 200))
+    bucket_duration: float = float(
+        os.getenv("MONGO_BUCKET_DURATION", 0)
+    )  # Seconds, 0 keeps one document per recording
+    bucket_suffix: str = "_bucketed"
+
+    @property
+    def bucketed(self) -> bool:
+        return self.bucket_duration > 0
 
     @property
     def connection_string(self) -> str:
@@ -9,6 +9,10 @@ class PostgresConfig:
     host: str = "localhost"  # os.getenv("POSTGRES_HOST", "localhost")
     port: int = os.getenv("POSTGRES_PORT", 5432)
     dbname: str = os.getenv("POSTGRES_DBNAME", "audio_midi")
+    itersize: int = int(os.getenv("POSTGRES_ITERSIZE", 2000))
+    ensure_indexes: bool = (
+        os.getenv("POSTGRES_ENSURE_INDEXES", "true").lower() == "true"
+    )
 
     @property
     def connection_string(self) -> str:
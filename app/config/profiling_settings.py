@@ -0,0 +1,14 @@
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass
+class ProfilingConfig:
+    profile_dir: Path = Path(os.getenv("PROFILING_DIR", "./app/logs"))  # /app/logs in container
+    sampling_interval: float = float(os.getenv("PROFILING_SAMPLING_INTERVAL", 0.005))  # cpu mode
+    traceback_frames: int = int(os.getenv("PROFILING_TRACEBACK_FRAMES", 10))  # memory mode
+    top: int = int(os.getenv("PROFILING_TOP", 15))  # Functions or allocation sites listed by stage
+
+
+profiling_config = ProfilingConfig()
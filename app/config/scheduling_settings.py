@@ -0,0 +1,18 @@
+import os
+from dataclasses import dataclass
+
+
+@dataclass
+class SchedulingConfig:
+    largest_first: bool = os.getenv("SCHEDULING_LARGEST_FIRST", "true").lower() == "true"
+    # Cost model of a file: cost_overhead_seconds + samples / cost_samples_per_second
+    cost_overhead_seconds: float = float(os.getenv("SCHEDULING_COST_OVERHEAD_SECONDS", 0.05))
+    cost_samples_per_second: float = float(
+        os.getenv("SCHEDULING_COST_SAMPLES_PER_SECOND", 20_000_000)
+    )
+    # Audio (decoded and encoded) admitted into decode/encode/upload at once, 0 for no limit.
+    # The ceiling is for the host: --work shares it out between its workers
+    max_inflight_bytes: int = int(os.getenv("MAX_INFLIGHT_MB", 1024)) * 1024 * 1024
+
+
+scheduling_config = SchedulingConfig()
@@ -0,0 +1,16 @@
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass
+class TracingConfig:
+    enabled: bool = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    # Share of the recordings traced, sampled by a stable hash of their correlation ID
+    sample_rate: float = float(os.getenv("TRACING_SAMPLE_RATE", 1.0))
+    trace_dir: Path = Path(os.getenv("TRACING_DIR", "./app/logs"))  # /app/logs in container
+    # Spans kept in memory by process, further spans are dropped
+    max_events: int = int(os.getenv("TRACING_MAX_EVENTS", 1_000_000))
+
+
+tracing_config = TracingConfig()
@@ -1,20 +1,218 @@
 import argparse
+import json
+import logging
+import multiprocessing
 from pathlib import Path
+from queue import Empty
+from typing import Any, Callable
 
-from config import Dataset
+from config import (
+    Dataset,
+    metrics_config,
+    profiling_config,
+    scheduling_config,
+    tracing_config,
+)
 from src.pipelines import (
+    AbstractIngestionPipeline,
+    AbstractPipeline,
     GuitarSetIngestionPipeline,
     IDMTSMTGuitarIngestionPipeline,
+    ParquetExportPipeline,
     PreprocessingPipeline,
 )
+from src.storages import MongoStorage
 from src.utils import (
+    LOGGER_NAME,
+    Shard,
     download_and_extract_dataset,
     initialize_logger,
+    shutdown_logger,
 )
+from src.utils.metrics import merge_snapshots, metrics, summary_table, write_json_report
+from src.utils.profiler import merge_profiles, profile_summary, profiler
+from src.utils.tracing import merge_trace_files
 
 DATA_RAW_DIR = Path("./app/data/raw")
 
 
+def _run_pipeline(
+    pipeline: AbstractPipeline,
+    run: Callable[[], Any],
+    profile: str | None = None,
+    suffix: str = "",
+) -> Path | None:
+    """Call 'run' then close the pipeline, under the profiler if 'profile' is set.
+
+    Args:
+        pipeline (AbstractPipeline): The pipeline.
+        run (Callable[[], Any]): Entry point, e.g. pipeline.run.
+        profile (str | None, optional): "cpu" or "memory". Defaults to None.
+        suffix (str, optional): Suffix of the profile file name, e.g. "_worker1". Defaults to "".
+
+    Returns:
+        Path | None: Path of the profile '<PROFILING_DIR>/profile_<pipeline_name><suffix>_<profile>', None if not profiled.
+    """
+    profile_path = None
+    if profile:
+        profiler.start(profile)
+    try:
+        run()
+    finally:
+        pipeline.close()
+        if profile:
+            profile_path = profiler.stop(
+                profiling_config.profile_dir
+                / f"profile_{pipeline.pipeline_name}{suffix}_{profile}"
+            )
+    return profile_path
+
+
+def _log_profile(pipeline_name: str, path: Path | None, nb_processes: int = 1) -> None:
+    """Log the summary of a profile, if any."""
+    if path:
+        logging.getLogger(LOGGER_NAME).info(
+            f"{pipeline_name} profile of {nb_processes} process(es) ({path.as_posix()}):\n{profile_summary(path)}"
+        )
+
+
+def _work(
+    pipeline_class: type[AbstractIngestionPipeline],
+    pipeline_kwargs: dict,
+    worker_number: int,
+    results: multiprocessing.Queue,
+    profile: str | None = None,
+) -> None:
+    """Job queue worker process. Its metrics and the paths of its trace and profile
+    are sent back to the parent process to be merged."""
+    initialize_logger(suffix=f"_worker{worker_number}")
+    suffix = f"_worker{worker_number}"
+    pipeline = pipeline_class(**pipeline_kwargs)
+    pipeline.metrics_suffix = suffix
+    profile_path = None
+    try:
+        profile_path = _run_pipeline(
+            pipeline=pipeline, run=pipeline.work, profile=profile, suffix=suffix
+        )
+    finally:
+        results.put(
+            {
+                "pipeline_name": pipeline.pipeline_name,
+                "metrics": metrics.snapshot(),
+                "trace_path": pipeline.trace_path,
+                "profile_path": profile_path,
+            }
+        )
+        shutdown_logger()
+
+
+def _report_workers(
+    workers: list[multiprocessing.Process],
+    results: multiprocessing.Queue,
+    profile: str | None = None,
+) -> None:
+    """Merge the metrics, the traces and the profiles of the worker processes into one report.
+    Crashed workers are left out."""
+    worker_results = []
+    while len(worker_results) < len(workers):
+        try:
+            worker_results.append(results.get(timeout=1))
+        except Empty:
+            if not any(worker.is_alive() for worker in workers):
+                break
+    if not worker_results:
+        return
+    pipeline_name = worker_results[0]["pipeline_name"]
+    merged = merge_snapshots([result["metrics"] for result in worker_results])
+    path = write_json_report(
+        snapshot=merged,
+        path=metrics_config.report_dir / f"metrics_{pipeline_name}.json",
+    )
+    logging.getLogger(LOGGER_NAME).info(
+        f"{pipeline_name} metrics of {len(worker_results)} workers ({path.as_posix()}):\n{summary_table(merged)}"
+    )
+
+    trace_path = merge_trace_files(
+        paths=[result["trace_path"] for result in worker_results if result["trace_path"]],
+        path=tracing_config.trace_dir / f"trace_{pipeline_name}.json",
+    )
+    if trace_path:
+        logging.getLogger(LOGGER_NAME).info(
+            f"{pipeline_name} trace of {len(worker_results)} workers: path={trace_path.as_posix()}"
+        )
+
+    profile_paths = [
+        result["profile_path"] for result in worker_results if result["profile_path"]
+    ]
+    if profile_paths:
+        profile_path = merge_profiles(
+            paths=profile_paths,
+            path=profiling_config.profile_dir / f"profile_{pipeline_name}_{profile}",
+        )
+        _log_profile(pipeline_name, profile_path, nb_processes=len(profile_paths))
+
+
+def _run_ingestion(
+    pipeline_class: type[AbstractIngestionPipeline],
+    pipeline_kwargs: dict,
+    args: argparse.Namespace,
+) -> None:
+    """Run an ingestion pipeline, or plan, work on and report its job queue."""
+    if not (args.plan or args.work or args.progress):
+        ingestion_pipeline = pipeline_class(**pipeline_kwargs)
+        profile_path = _run_pipeline(
+            pipeline=ingestion_pipeline,
+            run=ingestion_pipeline.run,
+            profile=args.profile,
+        )
+        _log_profile(ingestion_pipeline.pipeline_name, profile_path)
+        return
+
+    if args.plan:
+        ingestion_pipeline = pipeline_class(**pipeline_kwargs)
+        ingestion_pipeline.plan()
+        ingestion_pipeline.close()
+
+    if args.work:
+        # The in-flight byte budget is a host ceiling, shared out between the workers
+        max_inflight_mb = (
+            args.max_inflight_mb
+            if args.max_inflight_mb is not None
+            else scheduling_config.max_inflight_bytes // 2**20
+        )
+        if max_inflight_mb:
+            pipeline_kwargs = {
+                **pipeline_kwargs,
+                "max_inflight_mb": max(max_inflight_mb // args.workers, 1),
+            }
+        # Spawned workers open their own connections and pools
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        workers = [
+            context.Process(
+                target=_work,
+                args=(
+                    pipeline_class,
+                    pipeline_kwargs,
+                    worker_number,
+                    results,
+                    args.profile,
+                ),
+            )
+            for worker_number in range(1, args.workers + 1)
+        ]
+        for worker in workers:
+            worker.start()
+        _report_workers(workers=workers, results=results, profile=args.profile)
+        for worker in workers:
+            worker.join()
+
+    if args.progress:
+        ingestion_pipeline = pipeline_class(**pipeline_kwargs)
+        ingestion_pipeline.progress()
+        ingestion_pipeline.close()
+
+
 def main() -> None:
     initialize_logger()
 
@@ -30,6 +228,51 @@ def main() -> None:
     parser.add_argument(
         "--limit", type=int, default=None, help="Max number of files ingested"
     )
+    parser.add_argument(
+        "--shard",
+        type=Shard.parse,
+        default=None,
+        help="Only ingest shard i/N (0 <= i < N): files are assigned by a stable hash of their title",
+    )
+    parser.add_argument(
+        "--max-inflight-mb",
+        dest="max_inflight_mb",
+        type=int,
+        default=None,
+        help="Ceiling of audio held by the WAV ingestion at once, in MB (0 for no limit), shared out between --workers",
+    )
+    parser.add_argument(
+        "--skip-existing",
+        dest="skip_existing",
+        action="store_true",
+        help="Skip the upload of files already in the raw bucket (uses the MinIO object index if enabled)",
+    )
+    parser.add_argument(
+        "--bulk_load",
+        action="store_true",
+        help="Bulk-load Mongo annotations: batched unordered writes, validation and secondary indexes deferred to the end",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Enumerate the source files of the selected ingestion pipelines into the Postgres job queue",
+    )
+    parser.add_argument(
+        "--work",
+        action="store_true",
+        help="Claim and process jobs of the selected ingestion pipelines until their queue is drained",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes started on this host by --work",
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="Report the number of jobs of the selected ingestion pipelines by kind and status",
+    )
     parser.add_argument(
         "--no-dataset1",
         dest="dataset1",
@@ -57,9 +300,25 @@ def main() -> None:
     parser.add_argument(
         "--preprocessor", action="store_true", help="Launch preprocessing pipeline"
     )
+    parser.add_argument(
+        "--export_parquet",
+        action="store_true",
+        help="Export annotations and metadata as Parquet files partitioned by dataset_name to the output bucket",
+    )
     parser.add_argument(
         "--ml", action="store_true", help="Launch machine learning pipeline"
     )
+    parser.add_argument(
+        "--check_indexes",
+        action="store_true",
+        help="Check that Mongo hot filters use an index and report index sizes and query plans",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=["cpu", "memory"],
+        default=None,
+        help="Profile the pipeline runs by stage: sampled stacks of every thread (cpu) or tracemalloc snapshots and peak RSS (memory), written to app/logs",
+    )
     parser.add_argument("--download_guitarset", action="store_true")
     parser.add_argument("--download_idmt_smt_guitar", action="store_true")
     args = parser.parse_args()
@@ -76,26 +335,59 @@ def main() -> None:
             base_dir=DATA_RAW_DIR,
         )
 
+    if args.check_indexes:
+        mongo_storage = MongoStorage()
+        mongo_storage.check_indexes()
+        logging.getLogger(LOGGER_NAME).info(
+            f"Mongo index report: {json.dumps(mongo_storage.index_report(), indent=4)}"
+        )
+        mongo_storage.close()
+
     if args.guitar_set:
-        ingestion_pipeline = GuitarSetIngestionPipeline(ingestion_limit=args.limit)
-        ingestion_pipeline.run()
-        ingestion_pipeline.close()
+        _run_ingestion(
+            pipeline_class=GuitarSetIngestionPipeline,
+            pipeline_kwargs=dict(
+                ingestion_limit=args.limit,
+                skip_existing=args.skip_existing,
+                bulk_load=args.bulk_load,
+                shard=args.shard,
+                max_inflight_mb=args.max_inflight_mb,
+            ),
+            args=args,
+        )
 
     if args.idmt_smt_guitar:
-        ingestion_pipeline = IDMTSMTGuitarIngestionPipeline(
-            ingestion_limit=args.limit,
-            dataset1=args.dataset1,
-            dataset2=args.dataset2,
-            dataset3=args.dataset3,
-            dataset4=args.dataset4,
+        _run_ingestion(
+            pipeline_class=IDMTSMTGuitarIngestionPipeline,
+            pipeline_kwargs=dict(
+                ingestion_limit=args.limit,
+                dataset1=args.dataset1,
+                dataset2=args.dataset2,
+                dataset3=args.dataset3,
+                dataset4=args.dataset4,
+                skip_existing=args.skip_existing,
+                bulk_load=args.bulk_load,
+                shard=args.shard,
+                max_inflight_mb=args.max_inflight_mb,
+            ),
+            args=args,
         )
-        ingestion_pipeline.run()
-        ingestion_pipeline.close()
+
+    if args.export_parquet:
+        export_pipeline = ParquetExportPipeline()
+        profile_path = _run_pipeline(
+            pipeline=export_pipeline, run=export_pipeline.run, profile=args.profile
+        )
+        _log_profile(export_pipeline.pipeline_name, profile_path)
 
     if args.preprocessor:
         preprocessing_pipeline = PreprocessingPipeline()
-        preprocessing_pipeline.run()
-        ingestion_pipeline.close()
+        profile_path = _run_pipeline(
+            pipeline=preprocessing_pipeline,
+            run=preprocessing_pipeline.run,
+            profile=args.profile,
+        )
+        _log_profile(preprocessing_pipeline.pipeline_name, profile_path)
 
 
 if __name__ == "__main__":
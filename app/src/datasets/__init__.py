@@ -0,0 +1,6 @@
+from .dataset import DatasetQuery, Recording
+
+__all__ = [
+    "DatasetQuery",
+    "Recording",
+]
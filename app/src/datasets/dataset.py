@@ -0,0 +1,233 @@
+import logging
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Iterator
+
+import numpy as np
+from config import minio_config, mongo_config
+
+from src.storages import MinIOStorage, MongoStorage, PostgresStorage
+from src.utils import LOGGER_NAME
+
+ANNOTATION_COLLECTIONS = (
+    mongo_config.collection_pitch_contour,
+    mongo_config.collection_note_midi,
+    mongo_config.collection_beat_position,
+    mongo_config.collection_chord,
+)
+
+
+@dataclass
+class Recording:
+    """A recording: its metadata, its annotations and its audio objects, downloaded on access."""
+
+    id_metadata: int
+    dataset_name: str
+    title: str
+    metadata: dict
+    annotations: dict[str, list[dict]]
+    audio_names: list[str]
+    _dataset: "DatasetQuery" = field(repr=False)
+    _audio_futures: dict[str, Future] = field(default_factory=dict, repr=False)
+
+    def audio_future(self, audio_name: str) -> Future:
+        """Start the download of an audio object, once.
+
+        Args:
+            audio_name (str): Name of the audio object, e.g. 'audio_mono-mic.wav'.
+
+        Returns:
+            Future: Future of the tuple (audio_data, sample_rate) or None.
+        """
+        if audio_name not in self._audio_futures:
+            self._audio_futures[audio_name] = self._dataset.minio_storage.get_audio_async(
+                bucket_name=self._dataset.bucket_name,
+                file_name=f"{self.dataset_name}/{self.title}/{audio_name}",
+            )
+        return self._audio_futures[audio_name]
+
+    def audio(self, audio_name: str | None = None) -> tuple[np.ndarray, int] | None:
+        """Download and decode an audio object of the recording.
+
+        Args:
+            audio_name (str | None, optional): Name of the audio object. Defaults to None (first audio object).
+
+        Returns:
+            tuple[np.ndarray, int] | None: A tuple containing audio_data and sample_rate or None.
+        """
+        audio_name = audio_name or (self.audio_names[0] if self.audio_names else None)
+        if audio_name is None:
+            return None
+        return self.audio_future(audio_name).result()
+
+    def audios(self) -> dict[str, tuple[np.ndarray, int] | None]:
+        """Download and decode every audio object of the recording concurrently.
+
+        Returns:
+            dict[str, tuple[np.ndarray, int] | None]: Audio by audio object name.
+        """
+        futures = {name: self.audio_future(name) for name in self.audio_names}
+        return {name: future.result() for name, future in futures.items()}
+
+
+class DatasetQuery:
+    """
+    Lazy query over the three storages.
+
+    Filters are pushed down to Postgres and metadata is streamed with a server-side cursor.
+    For each batch of recordings, annotations are fetched with one $in query by collection
+    and audio objects are listed once by dataset prefix. Audio is only downloaded on access,
+    in the worker pool of MinIOStorage.
+
+    Example:
+        dataset = DatasetQuery().filter(dataset_name="GuitarSet", style="jazz").annotations("note_midi")
+        for recording in dataset:
+            notes = recording.annotations["note_midi"]
+            audio_data, sample_rate = recording.audio("audio_mono-mic.wav")
+    """
+
+    def __init__(
+        self,
+        postgres_storage: PostgresStorage | None = None,
+        mongo_storage: MongoStorage | None = None,
+        minio_storage: MinIOStorage | None = None,
+        bucket_name: str = minio_config.bucket_raw,
+        batch_size: int = 200,
+    ):
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.postgres_storage = postgres_storage or PostgresStorage()
+        self.mongo_storage = mongo_storage or MongoStorage()
+        self.minio_storage = minio_storage or MinIOStorage()
+        self._owned_storages = [
+            storage
+            for storage, given in (
+                (self.postgres_storage, postgres_storage),
+                (self.mongo_storage, mongo_storage),
+                (self.minio_storage, minio_storage),
+            )
+            if given is None
+        ]
+        self.bucket_name = bucket_name
+        self.batch_size = batch_size
+        self._filters: dict = {}
+        self._collections: dict[str, list[str] | None] = {
+            name: None for name in ANNOTATION_COLLECTIONS
+        }
+        self._prefetch_audio = False
+        self._audio_names: dict[str, dict[str, list[str]]] = {}
+
+    def _copy(self, **changes) -> "DatasetQuery":
+        dataset = object.__new__(DatasetQuery)
+        dataset.__dict__.update(self.__dict__)
+        dataset._owned_storages = []
+        dataset.__dict__.update(changes)
+        return dataset
+
+    def filter(self, **filters) -> "DatasetQuery":
+        """Restrict the recordings with metadata filters. A list value matches any of its items.
+
+        Args:
+            **filters: Metadata columns and values, e.g. style="jazz", guitarist_id=[0, 1].
+
+        Returns:
+            DatasetQuery: New dataset.
+        """
+        return self._copy(_filters={**self._filters, **filters})
+
+    def annotations(self, *collection_names: str, fields: list[str] | None = None) -> "DatasetQuery":
+        """Select the annotation collections to fetch and the event fields to project.
+
+        Args:
+            *collection_names (str): Names of the annotation collections. Without names, no annotation is fetched.
+            fields (list[str] | None, optional): Event fields to project. Defaults to None (every field).
+
+        Returns:
+            DatasetQuery: New dataset.
+        """
+        return self._copy(_collections={name: fields for name in collection_names})
+
+    def prefetch_audio(self, prefetch: bool = True) -> "DatasetQuery":
+        """Start the download of every audio object of a batch as soon as the batch is fetched.
+
+        Returns:
+            DatasetQuery: New dataset.
+        """
+        return self._copy(_prefetch_audio=prefetch)
+
+    def _list_audio_names(self, dataset_name: str) -> dict[str, list[str]]:
+        """Audio object names by title under a dataset prefix, listed once."""
+        if dataset_name not in self._audio_names:
+            prefix = f"{dataset_name}/"
+            if self.minio_storage.index is not None:
+                self.minio_storage._ensure_index(bucket_name=self.bucket_name)
+                names = self.minio_storage.index.names(self.bucket_name, prefix=prefix)
+            else:
+                names = (
+                    obj.object_name
+                    for obj in self.minio_storage.list_objects(self.bucket_name, prefix=prefix)
+                )
+            by_title: dict[str, list[str]] = {}
+            for name in sorted(names):
+                parts = name[len(prefix) :].split("/", 1)
+                if len(parts) == 2 and not parts[1].startswith("annotation."):
+                    by_title.setdefault(parts[0], []).append(parts[1])
+            self._audio_names[dataset_name] = by_title
+        return self._audio_names[dataset_name]
+
+    def _to_recordings(self, rows: list[dict]) -> list[Recording]:
+        titles = [row["title"] for row in rows]
+        annotations = {
+            collection_name: self.mongo_storage.find_annotations(
+                collection_name=collection_name, titles=titles, fields=fields
+            )
+            for collection_name, fields in self._collections.items()
+        }
+        recordings = [
+            Recording(
+                id_metadata=row["id_metadata"],
+                dataset_name=row["dataset_name"],
+                title=row["title"],
+                metadata=row,
+                annotations={
+                    collection_name: events_by_title.get(row["title"], [])
+                    for collection_name, events_by_title in annotations.items()
+                },
+                audio_names=self._list_audio_names(row["dataset_name"]).get(
+                    row["title"], []
+                ),
+                _dataset=self,
+            )
+            for row in rows
+        ]
+        if self._prefetch_audio:
+            for recording in recordings:
+                for audio_name in recording.audio_names:
+                    recording.audio_future(audio_name)
+        return recordings
+
+    def __iter__(self) -> Iterator[Recording]:
+        for rows in self.postgres_storage.stream_metadata(
+            filters=self._filters, itersize=self.batch_size
+        ):
+            self.logger.debug(f"Dataset batch fetched: recordings={len(rows)}")
+            yield from self._to_recordings(rows)
+
+    def to_list(self) -> list[Recording]:
+        """Fetch every recording. Audio is still downloaded on access."""
+        return list(self)
+
+    def count(self) -> int:
+        """Number of recordings matching the filters, without fetching annotations."""
+        return sum(
+            len(batch["id_metadata"])
+            for batch in self.postgres_storage.stream_metadata(
+                columns=["id_metadata"],
+                filters=self._filters,
+                batch_format="numpy",
+            )
+        )
+
+    def close(self) -> None:
+        """Close the storages opened by the dataset."""
+        for storage in self._owned_storages:
+            storage.close()
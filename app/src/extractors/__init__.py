@@ -5,6 +5,7 @@ from .excel_extractor import ExcelExtractor
 from .jams_extractor import JAMSExtractor
 from .json_extractor import JSONExtractor
 from .wav_extractor import WAVExtractor
+from .wav_memmap_extractor import PCM24Memmap, WAVMemmapExtractor
 from .xml_extractor import XMLExtractor
 
 __all__ = [
@@ -15,5 +16,7 @@ __all__ = [
     "JAMSExtractor",
     "JSONExtractor",
     "WAVExtractor",
+    "PCM24Memmap",
+    "WAVMemmapExtractor",
     "XMLExtractor",
 ]
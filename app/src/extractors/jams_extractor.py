@@ -1,3 +1,4 @@
+import logging
 import re
 from pathlib import Path
 from typing import Any
@@ -19,6 +20,7 @@ from src.models import (
     Scale,
     Style,
 )
+from src.utils.metrics import metrics
 
 TITLE_REGEX = re.compile(
     r"^(?P<guitarist_id>\d{2})_(?P<style>[A-Za-z0-9]+)-(?P<tempo>\d+)-(?P<scale>[A-G](?:b|\#)?)_(?P<playing_version>[A-Za-z]+)$",
@@ -50,8 +52,10 @@ class JAMSExtractor(AbstractExtractor):
         self._validate_file_path(file_path=file_path, suffix=".jams")
 
         try:
-            self.logger.debug(f"Reading JAMS file: path: {file_path.as_posix()}")
-            jam = jams.load(path_or_file=str(file_path), **kwargs)
+            self.logger.debug("Reading JAMS file: path: %s", file_path)
+            with metrics.timer("extract.jams_read") as call:
+                call["bytes_read"] = file_path.stat().st_size
+                jam = jams.load(path_or_file=str(file_path), **kwargs)
             self.logger.debug("JAMS extraction completed")
             return jam
         except Exception as exception:
@@ -70,7 +74,7 @@ class JAMSExtractor(AbstractExtractor):
         Returns:
             JAMSAnnotation: JAMSAnnotation enriched.
         """
-        self.logger.debug(f"Enrich JAMSMetadata: title={jam_metadata.title}")
+        self.logger.debug("Enrich JAMSMetadata: title=%s", jam_metadata.title)
 
         if re.search(r"\bmic\b", jam_file_path.as_posix()):
             jam_metadata.pick_up_setting = "room_mic"
@@ -138,7 +142,7 @@ class JAMSExtractor(AbstractExtractor):
                 )
                 raise RuntimeError("enum cast has failed") from exception
 
-            self.logger.debug(f"JAMS metadata extracted: title: {title}")
+            self.logger.debug("JAMS metadata extracted: title: %s", title)
             return JAMSMetadata(
                 dataset_name=dataset_name,
                 guitarist_id=guitarist_id,
@@ -298,15 +302,21 @@ class JAMSExtractor(AbstractExtractor):
                 elif (namespace == "chord") and (data_source == ""):
                     chord.extend(self._extract_chord(annotation=annotation))
 
-            self.logger.debug(
-                "JAMS annotation extracted",
-                extra={
-                    "pitch_contour": len(pitch_contour),
-                    "note_midi": len(note_midi),
-                    "beat_position": len(beat_position),
-                    "chord": len(chord),
-                },
-            )
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "JAMS annotation extracted: title=%s, pitch_contour=%d, note_midi=%d, beat_position=%d, chord=%d",
+                    title,
+                    len(pitch_contour),
+                    len(note_midi),
+                    len(beat_position),
+                    len(chord),
+                    extra={
+                        "pitch_contour": len(pitch_contour),
+                        "note_midi": len(note_midi),
+                        "beat_position": len(beat_position),
+                        "chord": len(chord),
+                    },
+                )
             return JAMSAnnotation(
                 dataset_name=dataset_name,
                 title=title,
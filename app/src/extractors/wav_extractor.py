@@ -1,3 +1,4 @@
+import logging
 from pathlib import Path
 from typing import Any
 
@@ -5,6 +6,7 @@ import numpy as np
 import soundfile as sf
 
 from src.extractors import AbstractExtractor
+from src.utils.metrics import metrics
 
 
 class WAVExtractor(AbstractExtractor):
@@ -32,25 +34,33 @@ class WAVExtractor(AbstractExtractor):
         self._validate_file_path(file_path=file_path, suffix=".wav")
 
         try:
-            self.logger.debug(
-                "Reading WAV file",
-                extra={
-                    "path": str(file_path),
-                },
-            )
-            audio_data, sample_rate = sf.read(
-                file=file_path,
-                **kwargs,
-            )
-            self.logger.debug(
-                "WAV extraction completed",
-                extra={
-                    "path": str(file_path),
-                    "sample_rate": sample_rate,
-                    "shape": audio_data.shape,
-                    "dtype": audio_data.dtype,
-                },
-            )
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "Reading WAV file: path=%s",
+                    file_path,
+                    extra={
+                        "path": str(file_path),
+                    },
+                )
+            with metrics.timer("extract.wav_read") as call:
+                call["bytes_read"] = file_path.stat().st_size
+                audio_data, sample_rate = sf.read(
+                    file=file_path,
+                    **kwargs,
+                )
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "WAV extraction completed: path=%s, sample_rate=%d, shape=%s",
+                    file_path,
+                    sample_rate,
+                    audio_data.shape,
+                    extra={
+                        "path": str(file_path),
+                        "sample_rate": sample_rate,
+                        "shape": audio_data.shape,
+                        "dtype": audio_data.dtype,
+                    },
+                )
             return audio_data, sample_rate
         except Exception as exc:
             self.logger.exception(
@@ -0,0 +1,200 @@
+import logging
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+from src.extractors import AbstractExtractor
+from src.models import WAV_HEADER_PROBE_SIZE, WAVHeader
+
+
+class PCM24Memmap:
+    """
+    Read-only (frames, channels) view over packed 24-bit PCM samples.
+    Samples are unpacked to int32 only for the frames being indexed.
+    """
+
+    ndim = 2
+    dtype = np.dtype(np.int32)
+
+    def __init__(self, raw: np.memmap, channels: int):
+        self._raw = raw.reshape(-1, channels, 3)
+        self.shape = self._raw.shape[:2]
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, key) -> np.ndarray:
+        return WAVHeader.unpack_pcm24(self._raw[key])
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        data = self[:]
+        return data if dtype is None else data.astype(dtype)
+
+
+class WAVMemmapExtractor(AbstractExtractor):
+    """
+    Memory-mapped WAV file extractor.
+    Expose the data chunk of a PCM/float WAV file as a (frames, channels) np.memmap without decoding,
+    and fall back to the soundfile backend for any other format.
+    """
+
+    def read_header(self, file_path: Path) -> WAVHeader:
+        """Parse the RIFF header of a WAV file.
+
+        Args:
+            file_path (Path): Path to the WAV file. Must end with '.wav'.
+
+        Raises:
+            FileNotFoundError: If the WAV file does not exist.
+            ValueError: If inputs are invalid or if the header cannot be parsed.
+
+        Returns:
+            WAVHeader: Parsed header.
+        """
+        self._validate_file_path(file_path=file_path, suffix=".wav")
+        return self._parse_header(file_path=file_path)
+
+    def _parse_header(self, file_path: Path) -> WAVHeader:
+        """Parse the RIFF header of a WAV file whose path has been validated."""
+        with file_path.open("rb") as f:
+            header = WAVHeader.from_bytes(f.read(WAV_HEADER_PROBE_SIZE))
+
+        # Some writers leave the data chunk size unset (0 or 0xFFFFFFFF) when streaming.
+        data_size = file_path.stat().st_size - header.data_offset
+        if header.data_size > data_size or header.data_size == 0:
+            header = replace(header, data_size=data_size)
+        return header
+
+    def _memmap_data(self, file_path: Path, header: WAVHeader) -> np.memmap:
+        """Map the whole frames of the data chunk as a flat uint8 np.memmap."""
+        return np.memmap(
+            file_path,
+            dtype=np.uint8,
+            mode="r",
+            offset=header.data_offset,
+            shape=(header.frames * header.block_align,),
+        )
+
+    def extract(self, file_path: Path) -> tuple[np.ndarray | PCM24Memmap, int]:
+        """
+        Map audio data of a WAV file and return it with its sample rate.
+
+        PCM_U8, PCM_16, PCM_32, FLOAT and DOUBLE samples are exposed as raw np.memmap values.
+        PCM_24 samples are exposed through a PCM24Memmap returning int32 values.
+        Any other format is decoded with 'soundfile.read' and returned as float64 values.
+
+        Args:
+            file_path (Path): Path to the WAV file. Must end with '.wav'.
+
+        Returns:
+            tuple[np.ndarray | PCM24Memmap, int]: A tuple containing audio_data, an array-like of shape (n_frames, n_channels), and sample_rate, a sampling rate in Hz.
+
+        Raises:
+            FileNotFoundError: If the WAV file does not exist.
+            ValueError: If inputs are invalid.
+            RuntimeError: If reading the WAV file fails.
+        """
+        self._validate_file_path(file_path=file_path, suffix=".wav")
+
+        try:
+            header = self._parse_header(file_path=file_path)
+            if header.subtype is None:
+                raise ValueError(f"Unsupported WAV subtype: {header}")
+        except ValueError as exception:
+            self.logger.debug(
+                "Memory mapping not available, fallback to soundfile: path=%s, reason=%s",
+                file_path,
+                exception,
+            )
+            return self._soundfile_read(file_path=file_path)
+
+        try:
+            raw = self._memmap_data(file_path=file_path, header=header)
+            if header.subtype == "PCM_24":
+                audio_data = PCM24Memmap(raw=raw, channels=header.channels)
+            else:
+                audio_data = raw.view(header.dtype).reshape(-1, header.channels)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "WAV file mapped: path=%s, subtype=%s, shape=%s",
+                    file_path,
+                    header.subtype,
+                    audio_data.shape,
+                )
+            return audio_data, header.sample_rate
+        except Exception as exception:
+            self.logger.exception(f"Failed to map WAV file: {exception}")
+            raise RuntimeError("WAV memory mapping failed") from exception
+
+    def read_segment(
+        self,
+        file_path: Path,
+        start_s: float,
+        duration_s: float,
+        dtype: str = "float64",
+    ) -> tuple[np.ndarray, int]:
+        """
+        Read a segment of a WAV file. Only the pages holding the requested frames are touched.
+        Values are scaled to [-1, 1] like 'soundfile.read'.
+
+        Args:
+            file_path (Path): Path to the WAV file. Must end with '.wav'.
+            start_s (float): Start of the segment in seconds.
+            duration_s (float): Duration of the segment in seconds.
+            dtype (str, optional): Output dtype, "float64" or "float32". Defaults to "float64".
+
+        Returns:
+            tuple[np.ndarray, int]: A tuple containing audio_data, a numpy array of shape (n_frames, n_channels), and sample_rate, a sampling rate in Hz.
+
+        Raises:
+            FileNotFoundError: If the WAV file does not exist.
+            ValueError: If inputs are invalid.
+            RuntimeError: If reading the WAV file fails.
+        """
+        if start_s < 0 or duration_s < 0:
+            raise ValueError("start_s and duration_s must be positive.")
+        self._validate_file_path(file_path=file_path, suffix=".wav")
+
+        try:
+            header = self._parse_header(file_path=file_path)
+            if header.subtype is None:
+                raise ValueError(f"Unsupported WAV subtype: {header}")
+        except ValueError:
+            info = sf.info(file_path)
+            return self._soundfile_read(
+                file_path=file_path,
+                start=int(round(start_s * info.samplerate)),
+                frames=int(round(duration_s * info.samplerate)),
+                dtype=dtype,
+            )
+
+        try:
+            start_frame, n_frames = header.clamp_frames(
+                start_frame=int(round(start_s * header.sample_rate)),
+                n_frames=int(round(duration_s * header.sample_rate)),
+            )
+            raw = self._memmap_data(file_path=file_path, header=header)
+            begin = start_frame * header.block_align
+            end = begin + n_frames * header.block_align
+            audio_data = header.decode(raw[begin:end], dtype=dtype)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "WAV segment read: path=%s, start_frame=%d, shape=%s",
+                    file_path,
+                    start_frame,
+                    audio_data.shape,
+                )
+            return audio_data, header.sample_rate
+        except Exception as exception:
+            self.logger.exception(f"Failed to read WAV segment: {exception}")
+            raise RuntimeError("WAV segment reading failed") from exception
+
+    def _soundfile_read(self, file_path: Path, **kwargs) -> tuple[np.ndarray, int]:
+        """Decode a WAV file with the soundfile backend as a (n_frames, n_channels) array."""
+        try:
+            return sf.read(file=file_path, always_2d=True, **kwargs)
+        except Exception as exception:
+            self.logger.exception(f"Failed to load WAV file: {exception}")
+            raise RuntimeError("WAV extraction failed") from exception
@@ -15,6 +15,7 @@ from src.models import (
     XMLMetadata,
 )
 from src.transformers import ElementTreeWrapper
+from src.utils.metrics import metrics
 
 DIRECTORY_NAME_REGEX = re.compile(
     r"(?P<instrument_model>(Fender\ Strat|Ibanez\ Power\ Strat))\ (?P<amp_channel>Clean)\ (?P<pick_up_setting>Neck|Bridge|Bridge\+Neck)\ (?P<pick_up_type>SC|HU)\ ?(?P<polyphony>(?:Chords)?)",
@@ -46,8 +47,10 @@ class XMLExtractor(AbstractExtractor):
         self._validate_file_path(file_path=file_path, suffix=".xml")
 
         try:
-            self.logger.debug(f"Reading XML file: path={file_path.as_posix()}")
-            tree = ET.parse(file_path, **kwargs)
+            self.logger.debug("Reading XML file: path=%s", file_path)
+            with metrics.timer("extract.xml_read") as call:
+                call["bytes_read"] = file_path.stat().st_size
+                tree = ET.parse(file_path, **kwargs)
             self.logger.debug("XML extraction completed")
             return tree
         except Exception as exception:
@@ -66,7 +69,7 @@ class XMLExtractor(AbstractExtractor):
         Returns:
             XMLMetadata: XMLMetadata enriched.
         """
-        self.logger.debug(f"Enrich XMLMedata: title={xml_metadata.title}")
+        self.logger.debug("Enrich XMLMedata: title=%s", xml_metadata.title)
 
         if "dataset1" in xml_file_path.as_posix():
             directory_name_search = DIRECTORY_NAME_REGEX.search(
@@ -171,7 +174,7 @@ class XMLExtractor(AbstractExtractor):
             except ValueError as exception:
                 raise RuntimeError("enum cast has failed") from exception
 
-            self.logger.debug(f"XML metadata extracted: title={title}")
+            self.logger.debug("XML metadata extracted: title=%s", title)
             return XMLMetadata(
                 dataset_name=dataset_name,
                 title=title,
@@ -273,7 +276,7 @@ class XMLExtractor(AbstractExtractor):
                     raise RuntimeError("Event cast has failed") from exception
 
             self.logger.debug(
-                f"XML annotation extracted: transcription={len(events_processed)}"
+                "XML annotation extracted: transcription=%d", len(events_processed)
             )
             return XMLAnnotation(
                 dataset_name=dataset_name,
@@ -11,6 +11,8 @@ from .jams_models import (
     Scale,
     Style,
 )
+from .statistics_models import PITCH_HISTOGRAM_BINS, AnnotationStatistics
+from .wav_models import WAV_HEADER_PROBE_SIZE, WAVHeader
 from .xml_models import (
     AmpChannel,
     Event,
@@ -38,6 +40,10 @@ __all__ = [
     "PlayingVersion",
     "Scale",
     "Style",
+    "PITCH_HISTOGRAM_BINS",
+    "AnnotationStatistics",
+    "WAV_HEADER_PROBE_SIZE",
+    "WAVHeader",
     "AmpChannel",
     "Event",
     "ExcitationStyle",
@@ -0,0 +1,114 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from .jams_models import JAMSAnnotation
+from .xml_models import XMLAnnotation
+
+PITCH_HISTOGRAM_BINS = 128  # One bin by MIDI note number
+
+
+def _float_or_none(value: float) -> float | None:
+    return None if value is None or np.isnan(value) else float(value)
+
+
+@dataclass
+class AnnotationStatistics:
+    """Summary of the annotations of a recording, stored next to its metadata."""
+
+    n_pitch_contour: int = 0
+    n_notes: int = 0
+    n_beats: int = 0
+    n_chords: int = 0
+    pitch_min: float | None = None
+    pitch_max: float | None = None
+    pitch_histogram: list[int] = field(
+        default_factory=lambda: [0] * PITCH_HISTOGRAM_BINS
+    )
+    note_duration_mean: float | None = None
+    note_density: float | None = None
+    distinct_chords: int = 0
+    ibi_mean: float | None = None
+    ibi_std: float | None = None
+    ibi_min: float | None = None
+    ibi_max: float | None = None
+
+    @classmethod
+    def _from_notes(
+        cls, pitches: pd.Series, onsets: pd.Series, offsets: pd.Series, **kwargs
+    ) -> "AnnotationStatistics":
+        """Statistics of notes given by MIDI pitch, onset and offset in seconds."""
+        pitches = pd.to_numeric(pitches, errors="coerce").dropna().to_numpy(float)
+        onsets = pd.to_numeric(onsets, errors="coerce").to_numpy(float)
+        offsets = pd.to_numeric(offsets, errors="coerce").to_numpy(float)
+        durations = offsets - onsets
+
+        statistics = cls(n_notes=len(onsets), **kwargs)
+        if len(pitches):
+            statistics.pitch_min = float(pitches.min())
+            statistics.pitch_max = float(pitches.max())
+            statistics.pitch_histogram = np.bincount(
+                np.clip(np.rint(pitches).astype(int), 0, PITCH_HISTOGRAM_BINS - 1),
+                minlength=PITCH_HISTOGRAM_BINS,
+            ).tolist()
+        if np.isfinite(durations).any():
+            statistics.note_duration_mean = float(np.nanmean(durations))
+            span = np.nanmax(offsets) - np.nanmin(onsets)
+            statistics.note_density = float(len(onsets) / span) if span > 0 else None
+        return statistics
+
+    @classmethod
+    def from_jams_annotation(
+        cls, annotation: JAMSAnnotation
+    ) -> "AnnotationStatistics":
+        """Compute the statistics of a JAMS annotation.
+
+        Args:
+            annotation (JAMSAnnotation): Annotation extracted from a JAMS file.
+
+        Returns:
+            AnnotationStatistics: Statistics of the annotation.
+        """
+        note_midi = annotation.note_midi
+        statistics = cls._from_notes(
+            pitches=note_midi["value"],
+            onsets=note_midi["time"],
+            offsets=note_midi["time"] + note_midi["duration"],
+            n_pitch_contour=len(annotation.pitch_contour),
+            n_beats=len(annotation.beat_position),
+            n_chords=len(annotation.chord),
+            distinct_chords=int(annotation.chord["value"].nunique()),
+        )
+
+        beat_times = np.sort(annotation.beat_position["time"].to_numpy(float))
+        inter_beat_intervals = np.diff(beat_times)
+        if len(inter_beat_intervals):
+            statistics.ibi_mean = _float_or_none(inter_beat_intervals.mean())
+            statistics.ibi_std = _float_or_none(inter_beat_intervals.std())
+            statistics.ibi_min = _float_or_none(inter_beat_intervals.min())
+            statistics.ibi_max = _float_or_none(inter_beat_intervals.max())
+        return statistics
+
+    @classmethod
+    def from_xml_annotation(cls, annotation: XMLAnnotation) -> "AnnotationStatistics":
+        """Compute the statistics of a XML annotation. XML annotations have no beat nor chord.
+
+        Args:
+            annotation (XMLAnnotation): Annotation extracted from a XML file.
+
+        Returns:
+            AnnotationStatistics: Statistics of the annotation.
+        """
+        transcription = annotation.transcription
+        return cls._from_notes(
+            pitches=transcription["pitch"],
+            onsets=transcription["onset"],
+            offsets=transcription["offset"],
+        )
+
+    def to_dict(self) -> dict:
+        """Cast the dataclass to a dictionary whose
+        keys are attributes of the dataclass and
+        values are values of the attributes."""
+        return self.__dict__
@@ -0,0 +1,179 @@
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+
+WAV_HEADER_PROBE_SIZE = 64 * 1024
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# (format_tag, bits_per_sample) -> (subtype, raw numpy dtype, scale to [-1, 1])
+SUBTYPE_MAP = {
+    (WAVE_FORMAT_PCM, 8): ("PCM_U8", np.dtype("u1"), 2.0**7),
+    (WAVE_FORMAT_PCM, 16): ("PCM_16", np.dtype("<i2"), 2.0**15),
+    (WAVE_FORMAT_PCM, 24): ("PCM_24", None, 2.0**23),
+    (WAVE_FORMAT_PCM, 32): ("PCM_32", np.dtype("<i4"), 2.0**31),
+    (WAVE_FORMAT_IEEE_FLOAT, 32): ("FLOAT", np.dtype("<f4"), 1.0),
+    (WAVE_FORMAT_IEEE_FLOAT, 64): ("DOUBLE", np.dtype("<f8"), 1.0),
+}
+
+
+@dataclass(frozen=True)
+class WAVHeader:
+    """Layout of a RIFF/WAVE file, enough to address its frames directly."""
+
+    format_tag: int
+    channels: int
+    sample_rate: int
+    bits_per_sample: int
+    block_align: int
+    data_offset: int
+    data_size: int
+
+    @classmethod
+    def from_bytes(cls, buffer: bytes) -> "WAVHeader":
+        """Parse the RIFF chunks preceding the audio samples.
+
+        Args:
+            buffer (bytes): First bytes of the WAV file. Must contain the 'fmt ' chunk and the 'data' chunk header.
+
+        Raises:
+            ValueError: If the buffer is not a RIFF/WAVE file or if a chunk is missing.
+
+        Returns:
+            WAVHeader: Parsed header.
+        """
+        if len(buffer) < 12 or buffer[:4] != b"RIFF" or buffer[8:12] != b"WAVE":
+            raise ValueError("Not a RIFF/WAVE file")
+
+        fmt = None
+        position = 12
+        while position + 8 <= len(buffer):
+            chunk_id = buffer[position : position + 4]
+            (chunk_size,) = struct.unpack_from("<I", buffer, position + 4)
+            body = position + 8
+
+            if chunk_id == b"fmt ":
+                if body + 16 > len(buffer):
+                    break
+                format_tag, channels, sample_rate, _, block_align, bits = (
+                    struct.unpack_from("<HHIIHH", buffer, body)
+                )
+                if format_tag == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40:
+                    # The real format tag is the first 2 bytes of the sub-format GUID.
+                    (format_tag,) = struct.unpack_from("<H", buffer, body + 24)
+                fmt = (format_tag, channels, sample_rate, bits, block_align)
+
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError("'data' chunk found before 'fmt ' chunk")
+                format_tag, channels, sample_rate, bits, block_align = fmt
+                return cls(
+                    format_tag=format_tag,
+                    channels=channels,
+                    sample_rate=sample_rate,
+                    bits_per_sample=bits,
+                    block_align=block_align,
+                    data_offset=body,
+                    data_size=chunk_size,
+                )
+
+            position = body + chunk_size + (chunk_size & 1)  # Chunks are word aligned
+
+        raise ValueError("No 'data' chunk found in the header buffer")
+
+    @property
+    def subtype(self) -> str | None:
+        """Soundfile-like subtype name ("PCM_16", "PCM_24", "FLOAT", ...) or None if unsupported."""
+        entry = SUBTYPE_MAP.get((self.format_tag, self.bits_per_sample))
+        return entry[0] if entry else None
+
+    @property
+    def dtype(self) -> np.dtype | None:
+        """Numpy dtype of a raw sample or None if samples cannot be mapped directly (e.g. PCM_24)."""
+        entry = SUBTYPE_MAP.get((self.format_tag, self.bits_per_sample))
+        return entry[1] if entry else None
+
+    @property
+    def frames(self) -> int:
+        """Number of frames in the data chunk."""
+        return self.data_size // self.block_align
+
+    def clamp_frames(self, start_frame: int, n_frames: int) -> tuple[int, int]:
+        """Clamp a frame interval to the frames available in the data chunk.
+
+        Args:
+            start_frame (int): First frame.
+            n_frames (int): Number of frames.
+
+        Returns:
+            tuple[int, int]: First frame and number of frames after clamping.
+        """
+        start_frame = min(max(start_frame, 0), self.frames)
+        n_frames = min(max(n_frames, 0), self.frames - start_frame)
+        return start_frame, n_frames
+
+    def byte_range(self, start_frame: int, n_frames: int) -> tuple[int, int]:
+        """Byte range of a frame interval in the file.
+
+        Args:
+            start_frame (int): First frame.
+            n_frames (int): Number of frames.
+
+        Returns:
+            tuple[int, int]: Offset from the beginning of the file and length in bytes.
+        """
+        start_frame, n_frames = self.clamp_frames(start_frame, n_frames)
+        return (
+            self.data_offset + start_frame * self.block_align,
+            n_frames * self.block_align,
+        )
+
+    def decode(self, raw: bytes | np.ndarray, dtype: str = "float64") -> np.ndarray:
+        """Decode raw frames into a (n_frames, n_channels) array scaled to [-1, 1] like 'soundfile.read'.
+
+        Args:
+            raw (bytes | np.ndarray): Raw bytes of whole frames.
+            dtype (str, optional): Output dtype, "float64" or "float32". Defaults to "float64".
+
+        Raises:
+            ValueError: If the subtype is not supported.
+
+        Returns:
+            np.ndarray: Decoded frames.
+        """
+        entry = SUBTYPE_MAP.get((self.format_tag, self.bits_per_sample))
+        if entry is None:
+            raise ValueError(
+                f"Unsupported WAV subtype: format_tag={self.format_tag}, bits_per_sample={self.bits_per_sample}"
+            )
+        subtype, raw_dtype, scale = entry
+
+        samples = np.frombuffer(raw, dtype=np.uint8)
+        if subtype == "PCM_24":
+            samples = self.unpack_pcm24(samples.reshape(-1, 3))
+        else:
+            samples = samples.view(raw_dtype)
+
+        data = samples.astype(dtype)
+        if subtype == "PCM_U8":
+            data -= 128
+        if scale != 1.0:
+            data /= scale
+        return data.reshape(-1, self.channels)
+
+    @staticmethod
+    def unpack_pcm24(raw: np.ndarray) -> np.ndarray:
+        """Unpack little-endian 24-bit samples stored as (..., 3) bytes into int32.
+
+        Args:
+            raw (np.ndarray): uint8 array whose last axis holds the 3 bytes of a sample.
+
+        Returns:
+            np.ndarray: int32 array of shape raw.shape[:-1].
+        """
+        raw = raw.astype(np.int32)
+        samples = raw[..., 0] | (raw[..., 1] << 8) | (raw[..., 2] << 16)
+        return (samples << 8) >> 8  # Sign extension
@@ -1,11 +1,15 @@
 from .abstract_pipeline import AbstractPipeline
+from .abstract_ingestion_pipeline import AbstractIngestionPipeline
 from .guitar_set_ingestion_pipeline import GuitarSetIngestionPipeline
 from .idmt_smt_guitar_ingestion_pipeline import IDMTSMTGuitarIngestionPipeline
+from .parquet_export_pipeline import ParquetExportPipeline
 from .preprocessing_pipeline import PreprocessingPipeline
 
 __all__ = [
+    "AbstractIngestionPipeline",
     "AbstractPipeline",
     "GuitarSetIngestionPipeline",
     "IDMTSMTGuitarIngestionPipeline",
+    "ParquetExportPipeline",
     "PreprocessingPipeline",
 ]
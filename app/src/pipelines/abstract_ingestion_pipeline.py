@@ -0,0 +1,159 @@
+import os
+import socket
+import time
+from abc import abstractmethod
+
+from config import job_queue_config
+
+from src.pipelines import AbstractPipeline
+
+
+class AbstractIngestionPipeline(AbstractPipeline):
+    """
+    Ingestion pipeline which can also run from the ingestion_jobs queue:
+    plan() enumerates its source files as jobs, work() claims and processes them
+    and progress() reports them.
+    """
+
+    @abstractmethod
+    def _plan_jobs(self) -> list[dict]:
+        """Enumerate the source files of the pipeline.
+
+        Returns:
+            list[dict]: Jobs {"kind": str, "file_path": str, "dataset_number": int | None}.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def _process_job(self, job: dict) -> None:
+        """Process a job claimed from the queue.
+
+        Args:
+            job (dict): Row of the ingestion_jobs table.
+        """
+        raise NotImplementedError
+
+    def _prepare_work(self) -> None:
+        """Called once by a worker before claiming its first job."""
+
+    def plan(self) -> int:
+        """Enumerate the source files into the ingestion_jobs table. Files already planned are kept as is.
+
+        Returns:
+            int: Number of jobs inserted.
+        """
+        self.postgres_storage.ensure_jobs_table()
+        jobs = self._plan_jobs()
+        nb_inserted = self.postgres_storage.insert_jobs(
+            pipeline=self.pipeline_name, jobs=jobs
+        )
+        self.logger.info(
+            f"{self.pipeline_name} jobs planned: nb_files={len(jobs)}, nb_inserted={nb_inserted}"
+        )
+        return nb_inserted
+
+    def work(self, worker_id: str | None = None) -> int:
+        """Claim batches of jobs and process them until the queue is drained.
+        The leases of a batch are renewed as each of its jobs completes, so a slow batch is not re-queued
+        while it runs; jobs whose claim was lost meanwhile are left to the worker which holds them.
+        Stale claims of crashed workers are re-queued while waiting for the last claimed jobs.
+
+        Args:
+            worker_id (str | None, optional): Identifier of the worker. Defaults to None ('<host>:<pid>').
+
+        Returns:
+            int: Number of jobs processed.
+        """
+        worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.logger.info(f"{self.pipeline_name} worker start: worker_id={worker_id}")
+        self._prepare_work()
+
+        nb_jobs = 0
+        while True:
+            self.postgres_storage.requeue_stale_jobs(
+                pipeline=self.pipeline_name, max_attempts=job_queue_config.max_attempts
+            )
+            jobs = self.postgres_storage.claim_jobs(
+                pipeline=self.pipeline_name,
+                worker_id=worker_id,
+                batch_size=job_queue_config.batch_size,
+                lease_seconds=job_queue_config.lease_seconds,
+            )
+            if not jobs:
+                if not any(
+                    row["status"] == "claimed"
+                    for row in self.postgres_storage.select_jobs_progress(
+                        pipeline=self.pipeline_name
+                    )
+                ):
+                    break
+                time.sleep(job_queue_config.poll_interval)
+                continue
+
+            id_jobs = [job["id_job"] for job in jobs]
+            lost_jobs: set[int] = set()
+            for job in jobs:
+                if job["id_job"] in lost_jobs:
+                    continue
+                self._current_job_id = job["id_job"]
+                # Errors of the callbacks run meanwhile belong to earlier jobs, see _wait_pending
+                nb_errors = self._nb_errors() - self._nb_callback_errors
+                try:
+                    self._process_job(job)
+                except Exception as exception:
+                    self.logger.error(f"Job processing has failed: {exception}")
+                    self._failed_jobs.add(job["id_job"])
+                if self._nb_errors() - self._nb_callback_errors > nb_errors:
+                    self._failed_jobs.add(job["id_job"])
+                renewed = self.postgres_storage.renew_leases(
+                    id_jobs=id_jobs,
+                    worker_id=worker_id,
+                    lease_seconds=job_queue_config.lease_seconds,
+                )
+                if renewed is not None:
+                    lost_jobs.update(set(id_jobs) - renewed)
+            self._current_job_id = None
+            self._wait_pending()
+
+            for job in jobs:
+                failed = job["id_job"] in self._failed_jobs
+                self._failed_jobs.discard(job["id_job"])
+                if job["id_job"] in lost_jobs:
+                    self.logger.warning(
+                        f"Job claim lost before completion: id_job={job['id_job']}"
+                    )
+                    continue
+                completed = self.postgres_storage.complete_job(
+                    id_job=job["id_job"],
+                    worker_id=worker_id,
+                    error="Processing has failed, see worker logs" if failed else None,
+                )
+                if not completed:
+                    self.logger.warning(
+                        f"Job claim lost before completion: id_job={job['id_job']}"
+                    )
+            nb_jobs += len(jobs) - len(lost_jobs)
+
+        self.logger.info(
+            f"{self.pipeline_name} worker completed: worker_id={worker_id}, nb_jobs={nb_jobs}, {self.statistics.to_string()}"
+        )
+        return nb_jobs
+
+    def progress(self) -> list[dict]:
+        """Number of jobs of the pipeline by kind and status.
+
+        Returns:
+            list[dict]: Rows {"kind": str, "status": str, "nb_jobs": int, "attempts": int, "last_update": datetime}.
+        """
+        rows = self.postgres_storage.select_jobs_progress(pipeline=self.pipeline_name)
+        nb_jobs = sum(row["nb_jobs"] for row in rows)
+        nb_finished = sum(
+            row["nb_jobs"] for row in rows if row["status"] in ("done", "failed")
+        )
+        summary = ", ".join(
+            f"{row['kind']}/{row['status']}={row['nb_jobs']}" for row in rows
+        )
+        self.logger.info(
+            f"{self.pipeline_name} jobs progress: {nb_finished}/{nb_jobs} finished ({summary})"
+        )
+        return rows
@@ -1,22 +1,239 @@
 import logging
+import os
 from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from config import (
+    metrics_config,
+    scheduling_config,
+    tracing_config,
+)
 
 from src.storages import MinIOStorage, MongoStorage, PostgresStorage
-from src.utils import LOGGER_NAME
+from src.utils import ByteBudget, estimate_decoded_bytes, LOGGER_NAME, Schedule
+from src.utils.metrics import (
+    PrometheusTextfileExporter,
+    metrics,
+    summary_table,
+    write_json_report,
+)
+from src.utils.tracing import tracer
 
 
 class AbstractPipeline(ABC):
     def __init__(self):
         self.logger = logging.getLogger(LOGGER_NAME)
+        metrics.reset()  # Metrics and traces of a process cover one pipeline run
+        tracer.reset()
         self.minio_storage = MinIOStorage()
         self.mongo_storage = MongoStorage()
         self.postgres_storage = PostgresStorage()
+        self._pending: dict[Future, Callable[[Any], None]] = {}
+        self.byte_budget = ByteBudget(max_bytes=scheduling_config.max_inflight_bytes)
+        self.bulk_load = False
+        self.pipeline_name = type(self).__name__
+        self._current_job_id: int | None = None
+        self._future_jobs: dict[Future, int] = {}
+        self._failed_jobs: set[int] = set()
+        self._nb_callback_errors = 0
+        self.metrics_suffix = ""
+        self.trace_path: Path | None = None
+        self._metrics_exporter: PrometheusTextfileExporter | None = None
+        if metrics_config.prometheus_textfile:
+            self._metrics_exporter = PrometheusTextfileExporter(
+                registry=metrics,
+                path=Path(metrics_config.prometheus_textfile.format(pid=os.getpid())),
+                labels={"pipeline": type(self).__name__, "pid": str(os.getpid())},
+            ).start()
 
     @abstractmethod
     def run(self) -> None:
         raise NotImplementedError
 
+    @contextmanager
+    def _mongo_bulk_load(self) -> Iterator[None]:
+        """Context in which Mongo documents are bulk-loaded if 'bulk_load' is set.
+        Documents are only counted when their batch is written, so the counts of the bulk writes
+        are added to the pipeline statistics on exit."""
+        if not self.bulk_load:
+            yield
+            return
+        report = None
+        try:
+            with self.mongo_storage.bulk_load() as report:
+                yield
+        finally:
+            if report is not None:
+                self._add_bulk_report(report)
+
+    def _add_bulk_report(self, report: dict) -> None:
+        """Add the counts of a Mongo bulk load to the pipeline statistics.
+
+        Args:
+            report (dict): Report of MongoStorage.bulk_load.
+        """
+
+    def _largest_first(self, file_paths: list[Path]) -> Schedule | None:
+        """Schedule audio files largest-first on the upload workers, if enabled.
+        The makespan is predicted for the current concurrency limit of the uploads. It only models the pool:
+        files are decoded one at a time on the pipeline thread, so the actual makespan is at least their total decode time.
+        Files are only reordered within one call, which ends with a barrier on the pending uploads.
+
+        Args:
+            file_paths (list[Path]): Paths of the audio files.
+
+        Returns:
+            Schedule | None: The schedule, None if largest-first scheduling is disabled.
+        """
+        if not scheduling_config.largest_first or not file_paths:
+            return None
+        schedule = Schedule.largest_first(
+            file_paths=file_paths,
+            nb_workers=self.minio_storage.upload_controller.limit,
+        )
+        self.logger.debug(
+            f"Largest-first schedule: files={len(file_paths)}, predicted_makespan={schedule.predicted_makespan:.3f}s"
+        )
+        return schedule
+
+    def _nb_errors(self) -> int:
+        """Sum of the error counters of the pipeline statistics."""
+        return sum(
+            value
+            for name, value in self.statistics.to_dict().items()
+            if name.endswith("error")
+        )
+
+    def _reserve_audio_bytes(self, file_path: Path) -> int:
+        """Block until the bytes held for an audio file fit in the in-flight byte budget: its decoded size,
+        estimated from its header, and its encoded copy held until the upload is done, estimated by the size
+        of the file (an upper bound for 16-bit PCM, FLAC and OGG objects).
+        The bytes must be released with byte_budget.release, or given to _submit with the upload.
+
+        Args:
+            file_path (Path): Path of the audio file.
+
+        Returns:
+            int: Number of bytes reserved.
+        """
+        nb_bytes = estimate_decoded_bytes(file_path) + file_path.stat().st_size
+        with metrics.timer("pipeline.byte_budget_wait"):
+            self.byte_budget.acquire(nb_bytes)
+        return nb_bytes
+
+    def _submit(
+        self, future: Future, on_done: Callable[[Any], None], nb_bytes: int = 0
+    ) -> None:
+        """Track a task running in a worker pool. 'on_done' is called with its result
+        (None if it raised) from the pipeline thread, so it can update statistics safely.
+        Blocks while too many tasks are pending, to bound the memory held by their inputs:
+        twice the concurrency limit of the uploads, so the upload workers never starve.
+
+        Args:
+            future (Future): Future of the task.
+            on_done (Callable[[Any], None]): Callback receiving the result of the task.
+            nb_bytes (int, optional): Bytes reserved in the byte budget, released by the worker thread
+                as soon as the task is done. Defaults to 0.
+        """
+        if nb_bytes:
+            future.add_done_callback(lambda _: self.byte_budget.release(nb_bytes))
+        self._pending[future] = on_done
+        if self._current_job_id is not None:
+            self._future_jobs[future] = self._current_job_id
+        while len(self._pending) >= 2 * self.minio_storage.upload_controller.limit:
+            self._wait_pending(return_when=FIRST_COMPLETED)
+
+    def _wait_pending(self, return_when: str = "ALL_COMPLETED") -> None:
+        """Wait for pending tasks and call their callbacks.
+
+        Args:
+            return_when (str, optional): FIRST_COMPLETED or ALL_COMPLETED. Defaults to ALL_COMPLETED.
+        """
+        if not self._pending:
+            return
+
+        with metrics.timer("pipeline.upload_wait"):
+            done, _ = wait(self._pending, return_when=return_when)
+        for future in done:
+            on_done = self._pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as exception:
+                self.logger.error(f"Task has failed: {exception}")
+                result = None
+            job_id = self._future_jobs.pop(future, None)
+            if job_id is None:
+                on_done(result)
+                continue
+            # The callback may run while another job is processed: its errors belong to the job of the task
+            nb_errors = self._nb_errors()
+            on_done(result)
+            nb_callback_errors = self._nb_errors() - nb_errors
+            self._nb_callback_errors += nb_callback_errors
+            if result is None or nb_callback_errors:
+                self._failed_jobs.add(job_id)
+
+    def report_metrics(self) -> dict:
+        """Log the metrics of the run as a table and write them as JSON to
+        '<METRICS_DIR>/metrics_<pipeline_name><metrics_suffix>.json'.
+
+        Returns:
+            dict: Snapshot of the metrics.
+        """
+        snapshot = metrics.snapshot()
+        if self._metrics_exporter is not None:
+            self._metrics_exporter.stop()
+            self._metrics_exporter = None
+        if not metrics.enabled or not snapshot["metrics"]:
+            return snapshot
+        path = write_json_report(
+            snapshot=snapshot,
+            path=metrics_config.report_dir
+            / f"metrics_{self.pipeline_name}{self.metrics_suffix}.json",
+        )
+        self.logger.info(
+            f"{self.pipeline_name} metrics ({path.as_posix()}):\n{summary_table(snapshot)}"
+        )
+        return snapshot
+
+    def report_trace(self) -> Path | None:
+        """Write the spans of the run as a Chrome trace to '<TRACING_DIR>/trace_<pipeline_name><metrics_suffix>.json'
+        and log the slowest recordings of each stage, with the time spent in their spans.
+
+        Returns:
+            Path | None: Path of the trace, None if tracing is disabled or no span was recorded.
+        """
+        if not tracer.enabled:
+            return None
+        path = tracer.write(
+            tracing_config.trace_dir
+            / f"trace_{self.pipeline_name}{self.metrics_suffix}.json"
+        )
+        if path is None:
+            return None
+        self.trace_path = path
+        stages = sorted({event["name"] for event in tracer.trace()["traceEvents"]})
+        for stage in (name for name in stages if name.startswith("stage.")):
+            slowest = "\n".join(
+                f"\t{span['recording']}: {span['ms']} ms {span['breakdown_ms']}"
+                for span in tracer.slowest(name=stage, limit=5)
+            )
+            self.logger.info(f"Slowest {stage} spans:\n{slowest}")
+        self.logger.info(
+            f"{self.pipeline_name} trace: path={path.as_posix()}, dropped_events={tracer.nb_dropped}"
+        )
+        return path
+
     def close(self):
         """Close pipeline properly."""
+        self._wait_pending()
+        self.report_metrics()
+        self.report_trace()
+        if self.byte_budget.peak_bytes:
+            self.logger.info(f"In-flight audio bytes: {self.byte_budget.summary()}")
+        self.minio_storage.close()
         self.mongo_storage.close()
         self.postgres_storage.close()
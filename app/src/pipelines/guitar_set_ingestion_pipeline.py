@@ -1,6 +1,8 @@
 import re
+import time
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterator
 
 from config import (
     guitar_set_ingestion_pipeline_config,
@@ -9,7 +11,12 @@ from config import (
 from tqdm import tqdm
 
 from src.extractors import JAMSExtractor, WAVExtractor
-from src.pipelines import AbstractPipeline
+from src.models import AnnotationStatistics
+from src.pipelines import AbstractIngestionPipeline
+from src.utils import Shard, scan_files
+from src.utils.metrics import metrics
+from src.utils.profiler import profiler
+from src.utils.tracing import tracer
 
 TITLE_REGEX = re.compile(
     r"(?P<title>\d{2}_[A-Za-z0-9]+-\d+-[A-G](?:b|\#)?_[A-Za-z]+)",
@@ -25,10 +32,13 @@ class GuitarSetIngestionPipelineStatistics:
     jams_metadata_updated: int = 0
     jams_annotation_inserted: int = 0
     jams_annotation_updated: int = 0
+    jams_statistics_upserted: int = 0
     jams_error: int = 0
+    jams_skipped: int = 0
     wav_loaded: int = 0
     wav_uploaded: int = 0
     wav_error: int = 0
+    wav_skipped: int = 0
 
     def to_dict(self) -> dict:
         """Cast the dataclass to a dictionary whose
@@ -42,17 +52,30 @@ class GuitarSetIngestionPipelineStatistics:
         return ", ".join(strs)
 
 
-class GuitarSetIngestionPipeline(AbstractPipeline):
+class GuitarSetIngestionPipeline(AbstractIngestionPipeline):
     """Ingestion Pipeline."""
 
-    def __init__(self, ingestion_limit: int | None = None):
+    def __init__(
+        self,
+        ingestion_limit: int | None = None,
+        skip_existing: bool = False,
+        bulk_load: bool = False,
+        shard: Shard | None = None,
+        max_inflight_mb: int | None = None,
+    ):
         super().__init__()
+        if max_inflight_mb is not None:
+            self.byte_budget.max_bytes = max_inflight_mb * 1024 * 1024
         self.jams_extractor = JAMSExtractor()
         self.wav_extractor = WAVExtractor()
         self.ingestion_limit = (
             ingestion_limit or guitar_set_ingestion_pipeline_config.ingestion_limit
         )
+        self.skip_existing = skip_existing
+        self.bulk_load = bulk_load
+        self.shard = shard
         self.statistics = GuitarSetIngestionPipelineStatistics()
+        self.pipeline_name = guitar_set_ingestion_pipeline_config.dataset_name
 
     def run(self):
         """Run pipeline.
@@ -61,30 +84,29 @@ class GuitarSetIngestionPipeline(AbstractPipeline):
             RuntimeError: If pipeline failed.
         """
         try:
-            self.logger.info("GuitarSet ingestion pipeline start...")
+            self.logger.info(
+                f"GuitarSet ingestion pipeline start... shard={self.shard or 'all'}"
+            )
+
+            self._prepare_work()
 
             self.logger.info("[1/2] JAMS ingestion")
-            self._jams_ingestion(
-                directory_jams_path=guitar_set_ingestion_pipeline_config.annotation_path
-            )
+            with self._mongo_bulk_load():
+                self._jams_ingestion(
+                    directory_jams_path=guitar_set_ingestion_pipeline_config.annotation_path
+                )
 
             self.logger.info("[2/2] WAV ingestion")
-            self.logger.info("\t[1/4] Directory: audio_hex_pickup_debleeded")
-            self._wav_ingestion(
-                directory_wav_path=guitar_set_ingestion_pipeline_config.audio_hex_pickup_debleeded_path
-            )
-            self.logger.info("\t[2/4] Directory: audio_hex_pickup_original_path")
-            self._wav_ingestion(
-                directory_wav_path=guitar_set_ingestion_pipeline_config.audio_hex_pickup_original_path
-            )
-            self.logger.info("\t[3/4] Directory: audio_mono_mic_path")
-            self._wav_ingestion(
-                directory_wav_path=guitar_set_ingestion_pipeline_config.audio_mono_mic_path
-            )
-            self.logger.info("\t[4/4] Directory: audio_mono_pickup_mix_path")
-            self._wav_ingestion(
-                directory_wav_path=guitar_set_ingestion_pipeline_config.audio_mono_pickup_mix_path
+            directory_wav_paths = [
+                guitar_set_ingestion_pipeline_config.audio_hex_pickup_debleeded_path,
+                guitar_set_ingestion_pipeline_config.audio_hex_pickup_original_path,
+                guitar_set_ingestion_pipeline_config.audio_mono_mic_path,
+                guitar_set_ingestion_pipeline_config.audio_mono_pickup_mix_path,
+            ]
+            self.logger.info(
+                f"\tDirectories: {', '.join(path.name for path in directory_wav_paths)}"
             )
+            self._wav_ingestion(directory_wav_paths=directory_wav_paths)
 
             self.logger.info(
                 f"GuitarSet ingestion pipeline completed: {self.statistics.to_string()}"
@@ -93,28 +115,107 @@ class GuitarSetIngestionPipeline(AbstractPipeline):
             self.logger.info(f"Ingestion pipeline has failed: {exception}")
             raise RuntimeError("Ingestion pipeline has failed") from exception
 
+    def _add_bulk_report(self, report: dict) -> None:
+        """Count the annotation documents written by the Mongo bulk-load mode, whose inserts return "buffered"."""
+        self.statistics.jams_annotation_inserted += report["upserted"]
+        self.statistics.jams_annotation_updated += report["modified"]
+        self.statistics.jams_error += report["errors"]
+
+    def _prepare_work(self) -> None:
+        """Create the statistics table if the database predates it, refresh the object index
+        if files already uploaded are skipped and prefetch metadata titles.
+        The refresh is full, so objects removed outside of this class are not skipped."""
+        self.postgres_storage.ensure_statistics_table()
+        if self.skip_existing and self.minio_storage.index is not None:
+            self.minio_storage.refresh_index(
+                bucket_name=minio_config.bucket_raw, full=True
+            )
+        self.postgres_storage.prefetch_metadata_titles(
+            dataset_names=[guitar_set_ingestion_pipeline_config.dataset_name]
+        )
+
+    def _plan_jobs(self) -> list[dict]:
+        """Enumerate JAMS and WAV files, as run() would ingest them.
+
+        Returns:
+            list[dict]: Jobs {"kind": "jams" | "wav", "file_path": str, "dataset_number": None}.
+        """
+        config = guitar_set_ingestion_pipeline_config
+        directories = [
+            ("jams", config.annotation_path, ".jams"),
+            ("wav", config.audio_hex_pickup_debleeded_path, ".wav"),
+            ("wav", config.audio_hex_pickup_original_path, ".wav"),
+            ("wav", config.audio_mono_mic_path, ".wav"),
+            ("wav", config.audio_mono_pickup_mix_path, ".wav"),
+        ]
+        return [
+            {"kind": kind, "file_path": str(file_path), "dataset_number": None}
+            for kind, directory, suffix in directories
+            for file_path in self._scan_files(directory=directory, suffix=suffix)
+        ]
+
+    @staticmethod
+    def _title_key(file_path: Path) -> str:
+        """Title of the recording of a JAMS or WAV file, used as sharding key and trace correlation ID."""
+        title = TITLE_REGEX.match(file_path.stem)
+        return title.group("title") if title else file_path.stem
+
+    def _scan_files(self, directory: Path, suffix: str) -> Iterator[Path]:
+        """Files of a directory sorted by name, restricted to the shard and to the ingestion limit."""
+        return scan_files(
+            directory=directory,
+            suffix=suffix,
+            limit=self.ingestion_limit,
+            shard=self.shard,
+            key=self._title_key,
+        )
+
+    def _process_job(self, job: dict) -> None:
+        """Process a JAMS or WAV job claimed from the queue.
+
+        Args:
+            job (dict): Row of the ingestion_jobs table.
+        """
+        file_path = Path(job["file_path"])
+        with tracer.recording(self._title_key(file_path)):
+            if job["kind"] == "jams":
+                self._jam_processing(jam_file_path=file_path)
+            elif job["kind"] == "wav":
+                self._wav_processing(wav_file_path=file_path)
+            else:
+                raise ValueError(f"Unknown job kind: kind={job['kind']}")
+
     def _jam_processing(self, jam_file_path: Path) -> None:
         """Processing of a jams.JAMS file.
 
         Args:
             jam_file_path (Path): Path of the JAMS file
         """
+        start = time.perf_counter()
+        nb_errors = self.statistics.jams_error
         try:
             jam = self.jams_extractor.read(file_path=jam_file_path)
             self.statistics.jams_loaded += 1
 
-            self.minio_storage.put_jams(
-                bucket_name=minio_config.bucket_raw,
-                file_name=f"{guitar_set_ingestion_pipeline_config.dataset_name}/{jam_file_path.stem}/annotation.jams",
-                jam=jam,
-            )
-            self.statistics.jams_uploaded += 1
+            file_name = f"{guitar_set_ingestion_pipeline_config.dataset_name}/{jam_file_path.stem}/annotation.jams"
+            if self.skip_existing and self.minio_storage.object_exists(
+                bucket_name=minio_config.bucket_raw, file_name=file_name
+            ):
+                self.statistics.jams_skipped += 1
+            else:
+                self.minio_storage.put_jams(
+                    bucket_name=minio_config.bucket_raw,
+                    file_name=file_name,
+                    jam=jam,
+                )
+                self.statistics.jams_uploaded += 1
 
-            jam_metadata = self.jams_extractor.extract_metadata(jam=jam)
-            jam_metadata = self.jams_extractor.enrich_with_directory_name(
-                jam_metadata=jam_metadata, jam_file_path=jam_file_path
-            )
-            id_metadata = self.postgres_storage.select_metadata_title(
+            with metrics.timer("transform.jams_metadata"):
+                jam_metadata = self.jams_extractor.extract_metadata(jam=jam)
+                jam_metadata = self.jams_extractor.enrich_with_directory_name(
+                    jam_metadata=jam_metadata, jam_file_path=jam_file_path
+                )
+            id_metadata = self.postgres_storage.lookup_metadata_title(
                 title=jam_metadata.title
             )
             if id_metadata:
@@ -130,12 +231,25 @@ class GuitarSetIngestionPipeline(AbstractPipeline):
                     metadata=jam_metadata
                 )
                 if result:
+                    id_metadata = result["id_metadata"]
                     self.statistics.jams_metadata_inserted += 1
                 else:
                     self.statistics.jams_error += 1
 
-            annotations = self.jams_extractor.extract_annotation(jam=jam)
-            dict_annotation = annotations.to_dict()
+            with metrics.timer("transform.jams_annotation"):
+                annotations = self.jams_extractor.extract_annotation(jam=jam)
+                dict_annotation = annotations.to_dict()
+
+            if id_metadata:
+                with metrics.timer("transform.annotation_statistics"):
+                    statistics = AnnotationStatistics.from_jams_annotation(annotations)
+                result = self.postgres_storage.upsert_annotation_statistics(
+                    id_metadata=id_metadata, statistics=statistics
+                )
+                if result:
+                    self.statistics.jams_statistics_upserted += 1
+                else:
+                    self.statistics.jams_error += 1
 
             result = self.mongo_storage.insert_pitch_contour(
                 pitch_contour=dict_annotation["pitch_contour"]
@@ -166,6 +280,12 @@ class GuitarSetIngestionPipeline(AbstractPipeline):
         except Exception as exception:
             self.statistics.jams_error += 1
             self.logger.error(f"JAMS processing has failed: {exception}")
+        finally:
+            metrics.observe(
+                name="stage.jams",
+                seconds=time.perf_counter() - start,
+                error=self.statistics.jams_error > nb_errors,
+            )
 
     def _jams_ingestion(self, directory_jams_path: Path) -> None:
         """Ingestion of jams.JAMS files.
@@ -175,23 +295,16 @@ class GuitarSetIngestionPipeline(AbstractPipeline):
         """
         self.logger.debug("JAMS ingestion...")
 
-        if not directory_jams_path.exists():
-            raise FileNotFoundError(
-                f"Directory does not exist: path={directory_jams_path}"
-            )
-
-        jams_paths = list(directory_jams_path.glob("*.jams"))
-        if self.ingestion_limit is not None:
-            jams_paths = jams_paths[: self.ingestion_limit]
-
-        nb_ingestion = 0
-        for jam_file_path in tqdm(
-            jams_paths,
-            desc="jAMS ingestion",
-            colour="green",
-        ):
-            self._jam_processing(jam_file_path=jam_file_path)
-            nb_ingestion += 1
+        with profiler.stage("jams"):
+            nb_ingestion = 0
+            for jam_file_path in tqdm(
+                self._scan_files(directory=directory_jams_path, suffix=".jams"),
+                desc="jAMS ingestion",
+                colour="green",
+            ):
+                with tracer.recording(self._title_key(jam_file_path)):
+                    self._jam_processing(jam_file_path=jam_file_path)
+                nb_ingestion += 1
 
         self.logger.debug(f"JANS ingestion completed: nb_ingestion={nb_ingestion}")
 
@@ -201,55 +314,98 @@ class GuitarSetIngestionPipeline(AbstractPipeline):
         Args:
             wav_file_path (Path): Path of the WAV file
         """
+        start = time.perf_counter()
+        nb_errors = self.statistics.wav_error
         try:
-            audio_data, sample_rate = self.wav_extractor.extract(
-                file_path=wav_file_path
-            )
-            self.statistics.wav_loaded += 1
-
             title = TITLE_REGEX.match(wav_file_path.stem)
             if not title:
                 raise RuntimeError(f"No title found: title = {title}")
 
-            result = self.minio_storage.put_audio(
+            file_name = self.minio_storage.audio_object_name(
                 bucket_name=minio_config.bucket_raw,
                 file_name=f"{guitar_set_ingestion_pipeline_config.dataset_name}/{title.group('title')}/{wav_file_path.parent.name}.wav",
-                audio_data=audio_data,
-                sample_rate=sample_rate,
             )
-            if result:
-                self.statistics.wav_uploaded += 1
-            else:
-                self.statistics.wav_error += 1
+            if self.skip_existing and self.minio_storage.object_exists(
+                bucket_name=minio_config.bucket_raw, file_name=file_name
+            ):
+                self.statistics.wav_skipped += 1
+                return
+
+            nb_bytes = self._reserve_audio_bytes(file_path=wav_file_path)
+            try:
+                audio_data, sample_rate = self.wav_extractor.extract(
+                    file_path=wav_file_path
+                )
+                self.statistics.wav_loaded += 1
+                future = self.minio_storage.put_audio_async(
+                    bucket_name=minio_config.bucket_raw,
+                    file_name=file_name,
+                    audio_data=audio_data,
+                    sample_rate=sample_rate,
+                )
+            except Exception:
+                self.byte_budget.release(nb_bytes)
+                raise
+            del audio_data  # Only the upload task keeps a reference
+
+            self._submit(
+                future=future, on_done=self._on_wav_uploaded, nb_bytes=nb_bytes
+            )
 
         except Exception as exception:
             self.statistics.wav_error += 1
             self.logger.error(f"WAV processing has failed: {exception}")
+        finally:
+            metrics.observe(
+                name="stage.wav",
+                seconds=time.perf_counter() - start,
+                error=self.statistics.wav_error > nb_errors,
+            )
 
-    def _wav_ingestion(self, directory_wav_path: Path) -> None:
-        """Ingestion of WAV files.
+    def _on_wav_uploaded(self, uri: str | None) -> None:
+        """Update statistics once a WAV file has been uploaded.
 
         Args:
-            directory_wav_path (Path): Path of the directory containing WAV files.
+            uri (str | None): MinIO URI or None if the upload has failed.
+        """
+        if uri:
+            self.statistics.wav_uploaded += 1
+        else:
+            self.statistics.wav_error += 1
+
+    def _wav_ingestion(self, directory_wav_paths: list[Path]) -> None:
+        """Ingestion of WAV files. The directories are scheduled in one pass, so that large hex files
+        and small mono files share the upload pool, largest first if enabled.
+
+        Args:
+            directory_wav_paths (list[Path]): Paths of the directories containing WAV files.
         """
         self.logger.debug("WAV ingestion...")
 
-        if not directory_wav_path.exists():
-            raise FileNotFoundError(
-                f"Directory does not exist: path={directory_wav_path}"
+        with profiler.stage("wav"):
+            wav_paths = [
+                wav_file_path
+                for directory_wav_path in directory_wav_paths
+                for wav_file_path in self._scan_files(
+                    directory=directory_wav_path, suffix=".wav"
+                )
+            ]
+            schedule = self._largest_first(file_paths=wav_paths)
+            start = time.perf_counter()
+
+            nb_ingestion = 0
+            for wav_file_path in tqdm(
+                schedule.file_paths if schedule else wav_paths,
+                desc="WAV ingestion",
+                colour="green",
+            ):
+                with tracer.recording(self._title_key(wav_file_path)):
+                    self._wav_processing(wav_file_path=wav_file_path)
+                nb_ingestion += 1
+            self._wait_pending()
+        if schedule:
+            self.logger.info(
+                f"WAV schedule: {schedule.report(actual_makespan=time.perf_counter() - start)}"
             )
 
-        wav_paths = list(directory_wav_path.glob("*.wav"))
-        if self.ingestion_limit is not None:
-            wav_paths = wav_paths[: self.ingestion_limit]
-
-        nb_ingestion = 0
-        for wav_file_path in tqdm(
-            wav_paths,
-            desc="WAV ingestion",
-            colour="green",
-        ):
-            self._wav_processing(wav_file_path=wav_file_path)
-            nb_ingestion += 1
-
         self.logger.debug(f"WAV ingestion completed: nb_ingestion={nb_ingestion}")
@@ -1,5 +1,7 @@
+import time
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterator
 
 from config import (
     idmt_smt_guitar_ingestion_pipeline_config,
@@ -8,7 +10,12 @@ from config import (
 from tqdm import tqdm
 
 from src.extractors import WAVExtractor, XMLExtractor
-from src.pipelines import AbstractPipeline
+from src.models import AnnotationStatistics
+from src.pipelines import AbstractIngestionPipeline
+from src.utils import Shard, scan_files
+from src.utils.metrics import metrics
+from src.utils.profiler import profiler
+from src.utils.tracing import tracer
 
 
 @dataclass
@@ -19,10 +26,13 @@ class IDMTSMTGuitarIngestionPipelineStatistics:
     xml_metadata_updated: int = 0
     xml_annotation_inserted: int = 0
     xml_annotation_updated: int = 0
+    xml_statistics_upserted: int = 0
     xml_error: int = 0
+    xml_skipped: int = 0
     wav_loaded: int = 0
     wav_uploaded: int = 0
     wav_error: int = 0
+    wav_skipped: int = 0
 
     def to_dict(self) -> dict:
         """Cast the dataclass to a dictionary whose
@@ -36,7 +46,7 @@ class IDMTSMTGuitarIngestionPipelineStatistics:
         return ", ".join(strs)
 
 
-class IDMTSMTGuitarIngestionPipeline(AbstractPipeline):
+class IDMTSMTGuitarIngestionPipeline(AbstractIngestionPipeline):
     """Ingestion Pipeline."""
 
     def __init__(
@@ -46,8 +56,14 @@ class IDMTSMTGuitarIngestionPipeline(AbstractPipeline):
         dataset2: bool = True,
         dataset3: bool = True,
         dataset4: bool = True,
+        skip_existing: bool = False,
+        bulk_load: bool = False,
+        shard: Shard | None = None,
+        max_inflight_mb: int | None = None,
     ):
         super().__init__()
+        if max_inflight_mb is not None:
+            self.byte_budget.max_bytes = max_inflight_mb * 1024 * 1024
         self.xml_extractor = XMLExtractor()
         self.wav_extractor = WAVExtractor()
         self.ingestion_limit = (
@@ -57,7 +73,11 @@ class IDMTSMTGuitarIngestionPipeline(AbstractPipeline):
         self.dataset2 = dataset2
         self.dataset3 = dataset3
         self.dataset4 = dataset4
+        self.skip_existing = skip_existing
+        self.bulk_load = bulk_load
+        self.shard = shard
         self.statistics = IDMTSMTGuitarIngestionPipelineStatistics()
+        self.pipeline_name = idmt_smt_guitar_ingestion_pipeline_config.dataset_name
 
     def run(self):
         """Run pipeline.
@@ -66,29 +86,34 @@ class IDMTSMTGuitarIngestionPipeline(AbstractPipeline):
             RuntimeError: If pipeline failed.
         """
         try:
-            self.logger.info("IDMT SMT Guitar ingestion pipeline start...")
+            self.logger.info(
+                f"IDMT SMT Guitar ingestion pipeline start... shard={self.shard or 'all'}"
+            )
 
-            if self.dataset1:
-                self.logger.info("  Ingestion of subset number 1")
-                self._dataset1_ingestion()
+            self._prepare_work()
 
-            if self.dataset2:
-                self.logger.info("  Ingestion of subset number 2")
-                self._dataset_ingestion(
-                    dataset_path=idmt_smt_guitar_ingestion_pipeline_config.dataset2_path,
-                    dataset_number=2,
-                )
+            with self._mongo_bulk_load():
+                if self.dataset1:
+                    self.logger.info("  Ingestion of subset number 1")
+                    self._dataset1_ingestion()
 
-            if self.dataset3:
-                self.logger.info("  Ingestion of subset number 3")
-                self._dataset_ingestion(
-                    dataset_path=idmt_smt_guitar_ingestion_pipeline_config.dataset3_path,
-                    dataset_number=3,
-                )
+                if self.dataset2:
+                    self.logger.info("  Ingestion of subset number 2")
+                    self._dataset_ingestion(
+                        dataset_path=idmt_smt_guitar_ingestion_pipeline_config.dataset2_path,
+                        dataset_number=2,
+                    )
 
-            if self.dataset4:
-                self.logger.info("  Ingestion of subset number 4")
-                self._dataset4_ingestion()
+                if self.dataset3:
+                    self.logger.info("  Ingestion of subset number 3")
+                    self._dataset_ingestion(
+                        dataset_path=idmt_smt_guitar_ingestion_pipeline_config.dataset3_path,
+                        dataset_number=3,
+                    )
+
+                if self.dataset4:
+                    self.logger.info("  Ingestion of subset number 4")
+                    self._dataset4_ingestion()
 
             self.logger.info(
                 f"IDMT SMT Guitar ingestion pipeline ends successfully: {self.statistics.to_string()}"
@@ -97,6 +122,99 @@ class IDMTSMTGuitarIngestionPipeline(AbstractPipeline):
             self.logger.error("IDMT SMT Guitar ingestion pipeline failed.")
             raise RuntimeError("IDMT SMT Guitar ingestion pipeline failed") from exc
 
+    def _add_bulk_report(self, report: dict) -> None:
+        """Count the annotation documents written by the Mongo bulk-load mode, whose inserts return "buffered"."""
+        self.statistics.xml_annotation_inserted += report["upserted"]
+        self.statistics.xml_annotation_updated += report["modified"]
+        self.statistics.xml_error += report["errors"]
+
+    def _prepare_work(self) -> None:
+        """Create the statistics table if the database predates it, refresh the object index
+        if files already uploaded are skipped and prefetch metadata titles.
+        The refresh is full, so objects removed outside of this class are not skipped."""
+        self.postgres_storage.ensure_statistics_table()
+        if self.skip_existing and self.minio_storage.index is not None:
+            self.minio_storage.refresh_index(
+                bucket_name=minio_config.bucket_raw, full=True
+            )
+        self.postgres_storage.prefetch_metadata_titles(
+            dataset_names=[
+                f"{idmt_smt_guitar_ingestion_pipeline_config.dataset_name}_{dataset_number}"
+                for dataset_number in range(1, 5)
+            ]
+        )
+
+    def _plan_jobs(self) -> list[dict]:
+        """Enumerate XML and WAV files of the selected subsets, as run() would ingest them.
+        File names of the 'Chords' directories of subset 1 are modified beforehand.
+        Subset 4 is not supported yet.
+
+        Returns:
+            list[dict]: Jobs {"kind": "xml" | "wav", "file_path": str, "dataset_number": int}.
+        """
+        config = idmt_smt_guitar_ingestion_pipeline_config
+        dataset_paths: list[tuple[Path, int]] = []
+        if self.dataset1:
+            if not config.dataset1_path.exists():
+                raise FileNotFoundError(
+                    f"Directory does not exist: path={config.dataset1_path}"
+                )
+            for dir_path in sorted(p for p in config.dataset1_path.glob("*") if p.is_dir()):
+                if "Chords" in dir_path.as_posix():
+                    self._modify_file_names(dir_path=dir_path)
+                dataset_paths.append((dir_path, 1))
+        if self.dataset2:
+            dataset_paths.append((config.dataset2_path, 2))
+        if self.dataset3:
+            dataset_paths.append((config.dataset3_path, 3))
+        if self.dataset4:
+            self.logger.warning("Subset number 4 is not supported by the job queue")
+
+        return [
+            {
+                "kind": kind,
+                "file_path": str(file_path),
+                "dataset_number": dataset_number,
+            }
+            for dataset_path, dataset_number in dataset_paths
+            for kind, directory, suffix in (
+                ("xml", dataset_path / "annotation", ".xml"),
+                ("wav", dataset_path / "audio", ".wav"),
+            )
+            for file_path in self._scan_files(directory=directory, suffix=suffix)
+        ]
+
+    def _scan_files(self, directory: Path, suffix: str) -> Iterator[Path]:
+        """Files of a directory sorted by name, restricted to the shard and to the ingestion limit.
+        The annotation and the audio of a recording share their stem, which is the sharding key."""
+        return scan_files(
+            directory=directory,
+            suffix=suffix,
+            limit=self.ingestion_limit,
+            shard=self.shard,
+        )
+
+    def _process_job(self, job: dict) -> None:
+        """Process a XML or WAV job claimed from the queue.
+
+        Args:
+            job (dict): Row of the ingestion_jobs table.
+        """
+        file_path = Path(job["file_path"])
+        with tracer.recording(f"{job['dataset_number']}/{file_path.stem}"):
+            if job["kind"] == "xml":
+                self._xml_processing(
+                    xml_file_path=file_path,
+                    dataset_number=job["dataset_number"],
+                )
+            elif job["kind"] == "wav":
+                self._wav_processing(
+                    wav_file_path=file_path,
+                    dataset_number=job["dataset_number"],
+                )
+            else:
+                raise ValueError(f"Unknown job kind: kind={job['kind']}")
+
     def _xml_processing(
         self,
         xml_file_path: Path,
@@ -108,26 +226,35 @@ class IDMTSMTGuitarIngestionPipeline(AbstractPipeline):
             xml_file_path (Path): Path of the XML file.
             dataset_number (int): The number of the dataset (Between 1 and 4).
         """
+        start = time.perf_counter()
+        nb_errors = self.statistics.xml_error
         try:
             tree = self.xml_extractor.read(file_path=xml_file_path)
             self.statistics.xml_loaded += 1
 
-            self.minio_storage.put_xml(
-                bucket_name=minio_config.bucket_raw,
-                file_name=f"{idmt_smt_guitar_ingestion_pipeline_config.dataset_name}_{dataset_number}/{xml_file_path.stem}/annotation.xml",
-                tree=tree,
-            )
-            self.statistics.xml_uploaded += 1
+            file_name = f"{idmt_smt_guitar_ingestion_pipeline_config.dataset_name}_{dataset_number}/{xml_file_path.stem}/annotation.xml"
+            if self.skip_existing and self.minio_storage.object_exists(
+                bucket_name=minio_config.bucket_raw, file_name=file_name
+            ):
+                self.statistics.xml_skipped += 1
+            else:
+                self.minio_storage.put_xml(
+                    bucket_name=minio_config.bucket_raw,
+                    file_name=file_name,
+                    tree=tree,
+                )
+                self.statistics.xml_uploaded += 1
 
-            xml_metadata = self.xml_extractor.extract_metadata(
-                tree=tree,
-                title=xml_file_path.stem,
-                dataset_name=f"IDMT_SMT_Guitar_{dataset_number}",
-            )
-            xml_metadata = self.xml_extractor.enrich_with_directory_name(
-                xml_metadata=xml_metadata, xml_file_path=xml_file_path
-            )
-            id_metadata = self.postgres_storage.select_metadata_title(
+            with metrics.timer("transform.xml_metadata"):
+                xml_metadata = self.xml_extractor.extract_metadata(
+                    tree=tree,
+                    title=xml_file_path.stem,
+                    dataset_name=f"IDMT_SMT_Guitar_{dataset_number}",
+                )
+                xml_metadata = self.xml_extractor.enrich_with_directory_name(
+                    xml_metadata=xml_metadata, xml_file_path=xml_file_path
+                )
+            id_metadata = self.postgres_storage.lookup_metadata_title(
                 title=xml_metadata.title
             )
             if id_metadata:
@@ -143,16 +270,29 @@ class IDMTSMTGuitarIngestionPipeline(AbstractPipeline):
                     metadata=xml_metadata
                 )
                 if result:
+                    id_metadata = result["id_metadata"]
                     self.statistics.xml_metadata_inserted += 1
                 else:
                     self.statistics.xml_error += 1
 
-            annotations = self.xml_extractor.extract_annotation(
-                tree=tree,
-                title=xml_file_path.stem,
-                dataset_name=f"IDMT_SMT_Guitar_{dataset_number}",
-            )
-            dict_annotation = annotations.to_dict()
+            with metrics.timer("transform.xml_annotation"):
+                annotations = self.xml_extractor.extract_annotation(
+                    tree=tree,
+                    title=xml_file_path.stem,
+                    dataset_name=f"IDMT_SMT_Guitar_{dataset_number}",
+                )
+                dict_annotation = annotations.to_dict()
+
+            if id_metadata:
+                with metrics.timer("transform.annotation_statistics"):
+                    statistics = AnnotationStatistics.from_xml_annotation(annotations)
+                result = self.postgres_storage.upsert_annotation_statistics(
+                    id_metadata=id_metadata, statistics=statistics
+                )
+                if result:
+                    self.statistics.xml_statistics_upserted += 1
+                else:
+                    self.statistics.xml_error += 1
 
             result = self.mongo_storage.insert_note_midi(note_midi=dict_annotation)
             self.statistics.xml_annotation_inserted += 1 if result == "inserted" else 0
@@ -162,6 +302,12 @@ class IDMTSMTGuitarIngestionPipeline(AbstractPipeline):
         except Exception as exception:
             self.statistics.xml_error += 1
             self.logger.error(f"XML processing has failed: {exception}")
+        finally:
+            metrics.observe(
+                name="stage.xml",
+                seconds=time.perf_counter() - start,
+                error=self.statistics.xml_error > nb_errors,
+            )
 
     def _xml_ingestion(
         self,
@@ -176,26 +322,19 @@ class IDMTSMTGuitarIngestionPipeline(AbstractPipeline):
         """
         self.logger.debug("XML Ingestion...")
 
-        if not directory_xml_path.exists():
-            raise FileNotFoundError(
-                f"Directory does not exist: path={directory_xml_path}"
-            )
-
-        xml_paths = list(directory_xml_path.glob("*.xml"))
-        if self.ingestion_limit is not None:
-            xml_paths = xml_paths[: self.ingestion_limit]
-
-        nb_ingestion = 0
-        for xml_file_path in tqdm(
-            xml_paths,
-            desc="XML ingestion",
-            colour="green",
-        ):
-            self._xml_processing(
-                xml_file_path=xml_file_path,
-                dataset_number=dataset_number,
-            )
-            nb_ingestion += 1
+        with profiler.stage(f"xml:dataset{dataset_number}"):
+            nb_ingestion = 0
+            for xml_file_path in tqdm(
+                self._scan_files(directory=directory_xml_path, suffix=".xml"),
+                desc="XML ingestion",
+                colour="green",
+            ):
+                with tracer.recording(f"{dataset_number}/{xml_file_path.stem}"):
+                    self._xml_processing(
+                        xml_file_path=xml_file_path,
+                        dataset_number=dataset_number,
+                    )
+                nb_ingestion += 1
 
         self.logger.debug(
             "XML Ingestion completed successfully: nb_ingestion={nb_ingestion}"
@@ -208,53 +347,92 @@ class IDMTSMTGuitarIngestionPipeline(AbstractPipeline):
             wav_file_path (Path): Path of the WAV file.
             dataset_number (int): The number of the dataset (Between 1 and 4).
         """
+        start = time.perf_counter()
+        nb_errors = self.statistics.wav_error
         try:
-            audio_data, sample_rate = self.wav_extractor.extract(
-                file_path=wav_file_path
-            )
-            self.statistics.wav_loaded += 1
-
-            result = self.minio_storage.put_audio(
+            file_name = self.minio_storage.audio_object_name(
                 bucket_name=minio_config.bucket_raw,
                 file_name=f"{idmt_smt_guitar_ingestion_pipeline_config.dataset_name}_{dataset_number}/{wav_file_path.stem}/audio.wav",
-                audio_data=audio_data,
-                sample_rate=sample_rate,
             )
-            if result:
-                self.statistics.wav_uploaded += 1
-            else:
-                self.statistics.wav_error += 1
+            if self.skip_existing and self.minio_storage.object_exists(
+                bucket_name=minio_config.bucket_raw, file_name=file_name
+            ):
+                self.statistics.wav_skipped += 1
+                return
+
+            nb_bytes = self._reserve_audio_bytes(file_path=wav_file_path)
+            try:
+                audio_data, sample_rate = self.wav_extractor.extract(
+                    file_path=wav_file_path
+                )
+                self.statistics.wav_loaded += 1
+                future = self.minio_storage.put_audio_async(
+                    bucket_name=minio_config.bucket_raw,
+                    file_name=file_name,
+                    audio_data=audio_data,
+                    sample_rate=sample_rate,
+                )
+            except Exception:
+                self.byte_budget.release(nb_bytes)
+                raise
+            del audio_data  # Only the upload task keeps a reference
+
+            self._submit(
+                future=future, on_done=self._on_wav_uploaded, nb_bytes=nb_bytes
+            )
 
         except Exception as exception:
             self.statistics.wav_error += 1
             self.logger.error(f"WAV processing has failed: {exception}")
+        finally:
+            metrics.observe(
+                name="stage.wav",
+                seconds=time.perf_counter() - start,
+                error=self.statistics.wav_error > nb_errors,
+            )
+
+    def _on_wav_uploaded(self, uri: str | None) -> None:
+        """Update statistics once a WAV file has been uploaded.
+
+        Args:
+            uri (str | None): MinIO URI or None if the upload has failed.
+        """
+        if uri:
+            self.statistics.wav_uploaded += 1
+        else:
+            self.statistics.wav_error += 1
 
     def _wav_ingestion(self, directory_wav_path: Path, dataset_number: int) -> None:
-        """Ingestion of XML files.
+        """Ingestion of WAV files. Each subset has one WAV directory, scheduled after its XML files,
+        so largest-first ordering applies within the subset.
 
         Args:
             directory_wav_path (Path): Path of directory containing WAV files.
             dataset_number (int): The number of the dataset (Between 1 and 4).
         """
-        if not directory_wav_path.exists():
-            raise FileNotFoundError(
-                f"Directory does not exist: path={directory_wav_path}"
+        with profiler.stage(f"wav:dataset{dataset_number}"):
+            wav_paths = list(
+                self._scan_files(directory=directory_wav_path, suffix=".wav")
             )
-
-        wav_paths = list(directory_wav_path.glob("*.wav"))
-        if self.ingestion_limit is not None:
-            wav_paths = wav_paths[: self.ingestion_limit]
-
-        nb_ingestion = 0
-        for wav_file_path in tqdm(
-            wav_paths,
-            desc="WAV ingestion",
-            colour="green",
-        ):
-            self._wav_processing(
-                wav_file_path=wav_file_path, dataset_number=dataset_number
+            schedule = self._largest_first(file_paths=wav_paths)
+            start = time.perf_counter()
+
+            nb_ingestion = 0
+            for wav_file_path in tqdm(
+                schedule.file_paths if schedule else wav_paths,
+                desc="WAV ingestion",
+                colour="green",
+            ):
+                with tracer.recording(f"{dataset_number}/{wav_file_path.stem}"):
+                    self._wav_processing(
+                        wav_file_path=wav_file_path, dataset_number=dataset_number
+                    )
+                nb_ingestion += 1
+            self._wait_pending()
+        if schedule:
+            self.logger.info(
+                f"WAV schedule: {schedule.report(actual_makespan=time.perf_counter() - start)}"
             )
-            nb_ingestion += 1
 
     def _modify_file_names(self, dir_path: Path) -> None:
         """Modify file names to avoid doubloon.
@@ -0,0 +1,346 @@
+import math
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from config import minio_config, mongo_config, parquet_export_pipeline_config
+
+from src.pipelines import AbstractPipeline
+from src.storages.mongo_storage import EVENT_FIELDS
+from src.storages.postgresql_storage import METADATA_COLUMNS
+from src.utils.profiler import profiler
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is only required by the Parquet export
+    pa = pq = None
+
+PARQUET_CONTENT_TYPE = "application/vnd.apache.parquet"
+
+# Columns of the flattened annotations, dataset_name being the partition key.
+ANNOTATION_COLUMNS: dict[str, list[tuple[str, str]]] = {
+    mongo_config.collection_pitch_contour: [
+        ("title", "string"),
+        ("data_source", "string"),
+        ("time", "float64"),
+        ("frequency", "float64"),
+    ],
+    mongo_config.collection_note_midi: [
+        ("title", "string"),
+        ("data_source", "string"),
+        ("time", "float64"),
+        ("duration", "float64"),
+        ("value", "float64"),
+        ("fret_number", "int32"),
+        ("string_number", "int32"),
+        ("excitation_style", "string"),
+        ("expression_style", "string"),
+        ("loudness", "string"),
+    ],
+    mongo_config.collection_beat_position: [
+        ("title", "string"),
+        ("time", "float64"),
+        ("position", "int32"),
+        ("beat_units", "int32"),
+        ("measure", "int32"),
+        ("num_beats", "int32"),
+    ],
+    mongo_config.collection_chord: [
+        ("title", "string"),
+        ("time", "float64"),
+        ("duration", "float64"),
+        ("value", "string"),
+    ],
+}
+
+
+@dataclass
+class ParquetExportPipelineStatistics:
+    documents_read: int = 0
+    metadata_read: int = 0
+    rows_written: int = 0
+    row_groups_written: int = 0
+    files_uploaded: int = 0
+    bytes_uploaded: int = 0
+    errors: int = 0
+
+    def to_dict(self) -> dict:
+        """Cast the dataclass to a dictionary whose
+        keys are attributes of the dataclass and
+        values are values of the attributes."""
+        return self.__dict__
+
+    def to_string(self) -> str:
+        """Create a string containing values of all attributes."""
+        strs = [f"{k}={v}" for k, v in self.__dict__.items()]
+        return ", ".join(strs)
+
+
+class PartitionedParquetWriter:
+    """
+    Write rows into one Parquet file per dataset_name, under <directory>/dataset_name=<value>/.
+    Rows are buffered by partition and written as row groups of 'row_group_size' rows, with column statistics.
+    Rows whose values do not fit the schema are left out of their row group and counted in 'rows_rejected'.
+    """
+
+    def __init__(self, directory: Path, schema: "pa.Schema", row_group_size: int):
+        self.directory = directory
+        self.schema = schema
+        self.row_group_size = row_group_size
+        self.writers: dict[str, pq.ParquetWriter] = {}
+        self.buffers: dict[str, dict[str, list]] = {}
+        self.rows_written = 0
+        self.row_groups_written = 0
+        self.rows_rejected = 0
+
+    def append(self, dataset_name: str, row: dict) -> None:
+        """Buffer a row, then write a row group if the buffer of its partition is full."""
+        buffer = self.buffers.setdefault(
+            dataset_name, {name: [] for name in self.schema.names}
+        )
+        for name, values in buffer.items():
+            values.append(row.get(name))
+        if len(buffer["title"]) >= self.row_group_size:
+            self._flush(dataset_name)
+
+    def _to_table(self, buffer: dict[str, list]) -> "pa.Table":
+        """Convert a buffer to a table. If it does not fit the schema, convert its rows one by one
+        and leave out those which do not fit."""
+        try:
+            return pa.Table.from_pydict(buffer, schema=self.schema)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            tables = []
+            for index in range(len(buffer["title"])):
+                row = {name: values[index : index + 1] for name, values in buffer.items()}
+                try:
+                    tables.append(pa.Table.from_pydict(row, schema=self.schema))
+                except (pa.ArrowInvalid, pa.ArrowTypeError):
+                    self.rows_rejected += 1
+            return pa.concat_tables(tables) if tables else self.schema.empty_table()
+
+    def _flush(self, dataset_name: str) -> None:
+        buffer = self.buffers.get(dataset_name)
+        if not buffer or not buffer["title"]:
+            return
+        table = self._to_table(buffer)
+        del self.buffers[dataset_name]
+        if not table.num_rows:
+            return
+        if dataset_name not in self.writers:
+            path = self.directory / f"dataset_name={dataset_name}" / "part-00000.parquet"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.writers[dataset_name] = pq.ParquetWriter(
+                path,
+                self.schema,
+                compression=parquet_export_pipeline_config.compression,
+                write_statistics=True,
+            )
+        self.writers[dataset_name].write_table(table, row_group_size=self.row_group_size)
+        self.rows_written += table.num_rows
+        self.row_groups_written += 1
+
+    def close(self) -> list[Path]:
+        """Write the remaining rows and close the files.
+
+        Returns:
+            list[Path]: Paths of the Parquet files written.
+        """
+        for dataset_name in list(self.buffers):
+            self._flush(dataset_name)
+        for writer in self.writers.values():
+            writer.close()
+        return sorted(self.directory.rglob("*.parquet"))
+
+
+class ParquetExportPipeline(AbstractPipeline):
+    """
+    Export Pipeline.
+    Stream annotations from Mongo and metadata from Postgres into Parquet files
+    partitioned by dataset_name in the output bucket:
+    <prefix>/<table>/dataset_name=<dataset_name>/part-00000.parquet
+    """
+
+    def __init__(self):
+        super().__init__()
+        if pa is None:
+            raise RuntimeError("pyarrow is required by the Parquet export pipeline")
+        self.statistics = ParquetExportPipelineStatistics()
+
+    def run(self):
+        """Run pipeline.
+
+        Raises:
+            RuntimeError: If pipeline failed.
+        """
+        try:
+            self.logger.info("Parquet export pipeline start...")
+
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                tmp_path = Path(tmp_dir)
+                nb_steps = len(ANNOTATION_COLUMNS) + 1
+                for step, collection_name in enumerate(ANNOTATION_COLUMNS, start=1):
+                    self.logger.info(f"[{step}/{nb_steps}] Collection: {collection_name}")
+                    with profiler.stage(f"export:{collection_name}"):
+                        self._export_collection(
+                            collection_name=collection_name, directory=tmp_path
+                        )
+
+                self.logger.info(f"[{nb_steps}/{nb_steps}] Table: metadata")
+                with profiler.stage("export:metadata"):
+                    self._export_metadata(directory=tmp_path)
+
+            self.logger.info(
+                f"Parquet export pipeline completed: {self.statistics.to_string()}"
+            )
+        except Exception as exception:
+            self.logger.error(f"Parquet export pipeline has failed: {exception}")
+            raise RuntimeError("Parquet export pipeline has failed") from exception
+
+    @staticmethod
+    def _schema(columns: list[tuple[str, str]]) -> "pa.Schema":
+        return pa.schema([(name, pa.type_for_alias(type_name)) for name, type_name in columns])
+
+    @staticmethod
+    def _flatten(document: dict) -> list[dict]:
+        """Flatten the events of an annotation document into rows.
+        XML events (pitch, onset, offset) are mapped to (value, time, duration). Their missing optional fields
+        are NaN, as they come from DataFrame.to_dict, and become nulls.
+        With the bucketed layout, an event copied into several buckets is kept from its first bucket only.
+
+        Args:
+            document (dict): Annotation document or bucket document.
+
+        Returns:
+            list[dict]: One row by event.
+        """
+        if "bucket_start" in document:
+            events = document["events"]
+        else:
+            field = next(
+                (f for f in EVENT_FIELDS if isinstance(document.get(f), list)), None
+            )
+            events = document.get(field) or []
+
+        rows = []
+        for event in events:
+            row = {
+                "title": document["title"],
+                **{
+                    key: None if isinstance(value, float) and math.isnan(value) else value
+                    for key, value in event.items()
+                },
+            }
+            if "onset" in row:
+                row["time"] = row["onset"]
+                row["value"] = row.get("pitch")
+                if row["onset"] is not None and row.get("offset") is not None:
+                    row["duration"] = row["offset"] - row["onset"]
+            if "bucket_start" in document:
+                start = row.get("time") or 0.0
+                owner = (
+                    math.floor(start / mongo_config.bucket_duration)
+                    * mongo_config.bucket_duration
+                )
+                if owner != document["bucket_start"]:
+                    continue
+                row["data_source"] = document["data_source"]
+            if row.get("data_source") is not None:
+                row["data_source"] = str(row["data_source"])
+            rows.append(row)
+        return rows
+
+    def _export_collection(self, collection_name: str, directory: Path) -> None:
+        """Stream an annotation collection sorted by title and write it as partitioned Parquet files.
+
+        Args:
+            collection_name (str): Name of the annotation collection.
+            directory (Path): Local directory in which files are written before upload.
+        """
+        source_name = (
+            f"{collection_name}{mongo_config.bucket_suffix}"
+            if mongo_config.bucketed
+            else collection_name
+        )
+        writer = PartitionedParquetWriter(
+            directory=directory / collection_name,
+            schema=self._schema(ANNOTATION_COLUMNS[collection_name]),
+            row_group_size=parquet_export_pipeline_config.row_group_size,
+        )
+        cursor = (
+            self.mongo_storage.collections[source_name]
+            .find({}, {"_id": 0, "inserted_at": 0})
+            .sort("title", 1)
+            .batch_size(parquet_export_pipeline_config.cursor_batch_size)
+        )
+        for document in cursor:
+            self.statistics.documents_read += 1
+            try:
+                for row in self._flatten(document):
+                    writer.append(dataset_name=document["dataset_name"], row=row)
+            except Exception as exception:
+                self.statistics.errors += 1
+                self.logger.error(
+                    f"Document flattening has failed: title={document.get('title')}, {exception}"
+                )
+
+        self._upload(writer=writer, table_name=collection_name, directory=directory)
+
+    def _export_metadata(self, directory: Path) -> None:
+        """Stream the metadata table with a server-side cursor and write it as partitioned Parquet files.
+
+        Args:
+            directory (Path): Local directory in which files are written before upload.
+        """
+        writer = PartitionedParquetWriter(
+            directory=directory / "metadata",
+            schema=self._schema(
+                [
+                    (column, type_name)
+                    for column, type_name in METADATA_COLUMNS.items()
+                    if column != "dataset_name"
+                ]
+            ),
+            row_group_size=parquet_export_pipeline_config.row_group_size,
+        )
+        for rows in self.postgres_storage.stream_metadata():
+            self.statistics.metadata_read += len(rows)
+            for row in rows:
+                writer.append(dataset_name=row["dataset_name"] or "unknown", row=row)
+
+        self._upload(writer=writer, table_name="metadata", directory=directory)
+
+    def _upload(
+        self, writer: PartitionedParquetWriter, table_name: str, directory: Path
+    ) -> None:
+        """Close the files of a writer and upload them to the output bucket."""
+        paths = writer.close()
+        self.statistics.rows_written += writer.rows_written
+        self.statistics.row_groups_written += writer.row_groups_written
+        self.statistics.errors += writer.rows_rejected
+        if writer.rows_rejected:
+            self.logger.error(
+                f"Rows rejected by the Parquet schema: table={table_name}, nb_rows={writer.rows_rejected}"
+            )
+
+        for path in paths:
+            file_name = f"{parquet_export_pipeline_config.prefix}/{path.relative_to(directory).as_posix()}"
+            data = path.read_bytes()
+            result = self.minio_storage.put_object(
+                bucket_name=minio_config.bucket_output,
+                file_name=file_name,
+                data=data,
+                content_type=PARQUET_CONTENT_TYPE,
+                compression=False,
+            )
+            if result is None:
+                self.statistics.errors += 1
+                continue
+            self.statistics.files_uploaded += 1
+            self.statistics.bytes_uploaded += len(data)
+            self.logger.debug(
+                "Parquet file uploaded: uri=minio://%s/%s, bytes=%d",
+                minio_config.bucket_output,
+                file_name,
+                len(data),
+            )
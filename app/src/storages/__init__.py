@@ -1,5 +1,17 @@
+from .disk_cache import DiskCache, DiskCacheStatistics
 from .minio_storage import MinIOStorage
 from .mongo_storage import MongoStorage
+from .object_index import ObjectIndex
 from .postgresql_storage import PostgresStorage
+from .shared_audio_cache import SharedAudio, SharedAudioCache
 
-__all__ = ["MinIOStorage", "MongoStorage", "PostgresStorage"]
+__all__ = [
+    "DiskCache",
+    "DiskCacheStatistics",
+    "MinIOStorage",
+    "MongoStorage",
+    "ObjectIndex",
+    "PostgresStorage",
+    "SharedAudio",
+    "SharedAudioCache",
+]
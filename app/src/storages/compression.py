@@ -0,0 +1,82 @@
+import gzip
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip is always available
+    zstandard = None
+
+GZIP = "gzip"
+ZSTD = "zstd"
+
+MAGIC_NUMBERS = {
+    GZIP: b"\x1f\x8b",
+    ZSTD: b"\x28\xb5\x2f\xfd",
+}
+
+COMPRESSIBLE_CONTENT_TYPES = {
+    "application/jams",
+    "application/json",
+    "application/xml",
+    "text/csv",
+    "text/plain",
+    "text/xml",
+}
+
+
+def resolve_codec(codec: str | None) -> str | None:
+    """Return the codec to use: zstd falls back to gzip if 'zstandard' is not installed.
+
+    Args:
+        codec (str | None): "gzip", "zstd" or None.
+
+    Raises:
+        ValueError: If the codec is unknown.
+
+    Returns:
+        str | None: "gzip", "zstd" or None.
+    """
+    if not codec:
+        return None
+    if codec not in MAGIC_NUMBERS:
+        raise ValueError(f"Unknown compression codec: {codec}")
+    if codec == ZSTD and zstandard is None:
+        return GZIP
+    return codec
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    """Compress bytes.
+
+    Args:
+        data (bytes): Bytes to compress.
+        codec (str): "gzip" or "zstd".
+
+    Returns:
+        bytes: Compressed bytes.
+    """
+    if codec == ZSTD:
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    """Decompress bytes. Bytes which do not start with the magic number of the codec are returned as is,
+    since the HTTP client may already have decoded them according to 'Content-Encoding'.
+
+    Args:
+        data (bytes): Bytes to decompress.
+        codec (str): "gzip" or "zstd".
+
+    Raises:
+        RuntimeError: If the bytes are compressed with zstd and 'zstandard' is not installed.
+
+    Returns:
+        bytes: Decompressed bytes.
+    """
+    if not data.startswith(MAGIC_NUMBERS.get(codec, b"\x00\x00")):
+        return data
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to decompress zstd objects")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
@@ -0,0 +1,193 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from src.utils import LOGGER_NAME
+
+
+@dataclass
+class DiskCacheStatistics:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    def to_dict(self) -> dict:
+        """Cast the dataclass to a dictionary whose
+        keys are attributes of the dataclass and
+        values are values of the attributes."""
+        return self.__dict__
+
+    def to_string(self) -> str:
+        """Create a string containing values of all attributes."""
+        strs = [f"{k}={v}" for k, v in self.__dict__.items()]
+        return ", ".join(strs)
+
+
+class DiskCache:
+    """
+    Read-through disk cache of MinIO objects keyed by bucket, object name and ETag.
+
+    Layout: <cache_dir>/<hash[:2]>/<hash>/<etag>, where hash identifies (bucket, object name).
+    The modification time of an entry is the time of its last validation (TTL),
+    its access time is the time of its last hit (LRU eviction).
+    Entries are written to a temporary file then renamed, so several processes can share the cache.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int, ttl: float = 0.0):
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.statistics = DiskCacheStatistics()
+        self._lock = threading.Lock()
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._size = sum(size for _, _, size in self._entries())
+
+    def _key_dir(self, bucket_name: str, file_name: str) -> Path:
+        digest = hashlib.sha256(f"{bucket_name}/{file_name}".encode("utf-8")).hexdigest()
+        return self.cache_dir / digest[:2] / digest
+
+    def _entries(self) -> list[tuple[Path, float, int]]:
+        """List (path, access time, size) of all the entries of the cache."""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.startswith("."):
+                    continue  # Temporary file being written
+                path = Path(root) / name
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue  # Evicted by another process
+                entries.append((path, stat.st_atime, stat.st_size))
+        return entries
+
+    def get(
+        self, bucket_name: str, file_name: str, get_etag: Callable[[], str]
+    ) -> bytes | None:
+        """Read an object from the cache.
+
+        Args:
+            bucket_name (str): Bucket name.
+            file_name (str): File name.
+            get_etag (Callable[[], str]): Return the current ETag of the object. Only called when the entry must be validated.
+
+        Returns:
+            bytes | None: Content of the object or None on miss.
+        """
+        key_dir = self._key_dir(bucket_name, file_name)
+        try:
+            entries = {
+                p: p.stat().st_mtime
+                for p in key_dir.iterdir()
+                if not p.name.startswith(".")
+            }
+            if not entries:
+                raise FileNotFoundError(key_dir)
+
+            now = time.time()
+            path = max(entries, key=entries.get)
+            if self.ttl <= 0 or now - entries[path] > self.ttl:
+                path = key_dir / get_etag()
+                for stale_path in entries:
+                    if stale_path != path:
+                        self._remove(stale_path)
+                os.utime(path, (now, now))  # Validated
+
+            data = path.read_bytes()
+            os.utime(path, (time.time(), path.stat().st_mtime))  # Accessed
+        except FileNotFoundError:
+            with self._lock:
+                self.statistics.misses += 1
+            return None
+
+        with self._lock:
+            self.statistics.hits += 1
+        self.logger.debug(
+            "Cache hit: uri=minio://%s/%s, bytes=%d", bucket_name, file_name, len(data)
+        )
+        return data
+
+    def put(self, bucket_name: str, file_name: str, etag: str, data: bytes) -> None:
+        """Write an object into the cache then evict least recently used entries over budget.
+
+        Args:
+            bucket_name (str): Bucket name.
+            file_name (str): File name.
+            etag (str): ETag of the object.
+            data (bytes): Content of the object.
+        """
+        if not etag or len(data) > self.max_bytes:
+            return
+
+        key_dir = self._key_dir(bucket_name, file_name)
+        try:
+            key_dir.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                dir=key_dir, prefix=".", delete=False
+            ) as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_file.name, key_dir / etag)
+        except OSError as exception:
+            self.logger.warning(f"Cache write has failed: {exception}")
+            return
+
+        with self._lock:
+            self._size += len(data)
+            over_budget = self._size > self.max_bytes
+        if over_budget:
+            self._evict()
+
+    def invalidate(self, bucket_name: str, file_name: str) -> None:
+        """Remove every entry of an object.
+
+        Args:
+            bucket_name (str): Bucket name.
+            file_name (str): File name.
+        """
+        key_dir = self._key_dir(bucket_name, file_name)
+        if key_dir.exists():
+            for path in key_dir.iterdir():
+                self._remove(path)
+
+    def clear(self) -> None:
+        """Remove all the entries of the cache."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._size = 0
+
+    def _remove(self, path: Path) -> int:
+        """Remove an entry, returns the number of bytes freed."""
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return 0
+        with self._lock:
+            self._size -= size
+        return size
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits in its budget."""
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        size = sum(entry_size for _, _, entry_size in entries)
+        evictions = 0
+        for path, _, _ in entries:
+            if size <= self.max_bytes:
+                break
+            size -= self._remove(path)
+            evictions += 1
+
+        with self._lock:
+            self._size = size  # Resynchronise with entries written by other processes
+            self.statistics.evictions += evictions
+        self.logger.debug(f"Cache eviction: evictions={evictions}, bytes={size}")
@@ -1,38 +1,146 @@
+import contextvars
 import io
 import json
 import logging
 import xml.etree.ElementTree as etree
-from datetime import timedelta
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from typing import Iterator
 
+import certifi
 import jams
 import numpy as np
 import soundfile as sf
-from config import minio_config
-from minio.datatypes import Object
+import urllib3
+from config import adaptive_concurrency_config, minio_config
+from minio.datatypes import Object, Part
 from minio.error import S3Error
+from minio.helpers import MIN_PART_SIZE, genheaders
+from tenacity import Retrying, stop_after_attempt, wait_exponential
+from urllib3.exceptions import HTTPError
 
 from minio import Minio
-from src.utils import LOGGER_NAME
+from src.models import WAV_HEADER_PROBE_SIZE, WAVHeader
+from src.storages.compression import (
+    COMPRESSIBLE_CONTENT_TYPES,
+    MAGIC_NUMBERS,
+    compress,
+    decompress,
+    resolve_codec,
+)
+from src.storages.disk_cache import DiskCache
+from src.storages.object_index import ObjectIndex, ObjectRow
+from src.utils import AIMDController, LOGGER_NAME
+from src.utils.metrics import metrics
+
+# format -> (extension, content type, soundfile subtype)
+AUDIO_FORMATS = {
+    "WAV": (".wav", "audio/wav", None),
+    "FLAC": (".flac", "audio/flac", None),
+    "OGG": (".ogg", "audio/ogg", "VORBIS"),  # Lossy, for preview-only copies
+}
 
 
 class MinIOStorage:
-    def __init__(self):
+    def __init__(
+        self, cache_dir: Path | None = None, index_path: Path | None = None
+    ):
         self.logger = logging.getLogger(LOGGER_NAME)
         self.client = self._get_client()
         self._ensure_buckets()
+        # (bucket_name, file_name) -> (ETag of the object, header)
+        self._wav_headers: dict[tuple[str, str], tuple[str, WAVHeader]] = {}
+        self.cache = self._get_cache(cache_dir=cache_dir)
+        self.index = self._get_index(index_path=index_path)
+        # _upload admits at most 'upload_controller.limit' concurrent uploads, the pool is sized for its maximum
+        self.upload_controller = AIMDController(
+            name="put_object",
+            initial=minio_config.upload_workers,
+            maximum=max(
+                minio_config.upload_workers,
+                adaptive_concurrency_config.upload_max_concurrency,
+            ),
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=(
+                self.upload_controller.maximum
+                if self.upload_controller.enabled
+                else minio_config.upload_workers
+            ),
+            thread_name_prefix="minio",
+        )
+        self.part_executor = ThreadPoolExecutor(
+            max_workers=minio_config.multipart_workers, thread_name_prefix="minio-part"
+        )
+        self.codec = resolve_codec(minio_config.compression)
+        if self.codec != minio_config.compression:
+            self.logger.warning(
+                f"Compression codec unavailable, fallback: codec={minio_config.compression}, fallback={self.codec}"
+            )
 
     def _get_client(self) -> Minio:
         self.logger.info("Connexion to the MinIO service...")
+        # Same settings as the default pool of the client, sized for concurrent uploads and parts.
+        http_client = urllib3.PoolManager(
+            timeout=urllib3.Timeout(connect=300, read=300),
+            maxsize=minio_config.upload_workers + minio_config.multipart_workers,
+            cert_reqs="CERT_REQUIRED",
+            ca_certs=certifi.where(),
+            retries=urllib3.Retry(
+                total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]
+            ),
+        )
         client = Minio(
             endpoint=minio_config.minio_endpoint,
             access_key=minio_config.minio_user,
             secret_key=minio_config.minio_password,
             secure=minio_config.minio_secure,
+            http_client=http_client,
         )
         self.logger.info("Connecting to the MinIO service")
         return client
 
+    def _get_cache(self, cache_dir: Path | None = None) -> DiskCache | None:
+        """Create the disk cache of get_object if a cache directory is configured."""
+        cache_dir = cache_dir or minio_config.cache_dir
+        if not cache_dir:
+            return None
+
+        self.logger.info(f"MinIO disk cache enabled: cache_dir={cache_dir}")
+        return DiskCache(
+            cache_dir=Path(cache_dir),
+            max_bytes=minio_config.cache_max_bytes,
+            ttl=minio_config.cache_ttl,
+        )
+
+    def _get_index(self, index_path: Path | None = None) -> ObjectIndex | None:
+        """Open the local object index if an index path is configured."""
+        index_path = index_path or minio_config.index_path
+        if not index_path:
+            return None
+
+        self.logger.info(f"MinIO object index enabled: index_path={index_path}")
+        return ObjectIndex(index_path=Path(index_path))
+
+    def _invalidate(self, bucket_name: str, file_name: str) -> None:
+        """Drop cached data of an object which has been overwritten or removed."""
+        self._wav_headers.pop((bucket_name, file_name), None)
+        if self.cache is not None:
+            self.cache.invalidate(bucket_name=bucket_name, file_name=file_name)
+
+    def _on_object_written(
+        self, bucket_name: str, file_name: str, size: int, etag: str | None
+    ) -> None:
+        """Invalidate cached data of an uploaded object and record it in the index."""
+        self._invalidate(bucket_name=bucket_name, file_name=file_name)
+        if self.index is not None:
+            self.index.upsert(
+                bucket_name=bucket_name,
+                rows=[(file_name, size, etag, datetime.now(timezone.utc).isoformat())],
+            )
+
     def _ensure_buckets(self) -> None:
         """Check if buckets exist; if not, create them."""
         bucket_names = [
@@ -51,35 +159,178 @@ class MinIOStorage:
         except Exception as e:
             self.logger.error(f" Error MinIO make buckets: {e}.")
 
+    def _upload(
+        self,
+        bucket_name: str,
+        file_name: str,
+        data: bytes,
+        content_type: str,
+        metadata: dict | None = None,
+    ) -> str:
+        """Upload bytes with a single PUT, or with a parallel multipart upload above the multipart threshold.
+
+        Args:
+            bucket_name (str): Bucket name.
+            file_name (str): File name.
+            data (bytes): File content.
+            content_type (str): MIME type.
+            metadata (dict | None, optional): Headers and user metadata. Defaults to None.
+
+        Raises:
+            S3Error: If the upload fails.
+
+        Returns:
+            str: ETag of the object.
+        """
+        with (
+            self.upload_controller.slot() as request,
+            metrics.timer("minio.upload") as call,
+        ):
+            request["units"] = call["bytes_written"] = len(data)
+            if len(data) >= max(minio_config.multipart_threshold, MIN_PART_SIZE):
+                etag = self._upload_multipart(
+                    bucket_name=bucket_name,
+                    file_name=file_name,
+                    data=data,
+                    content_type=content_type,
+                    metadata=metadata,
+                )
+            else:
+                etag = self.client.put_object(
+                    bucket_name=bucket_name,
+                    object_name=file_name,
+                    data=io.BytesIO(data),
+                    length=len(data),
+                    content_type=content_type,
+                    metadata=metadata,
+                ).etag
+
+        self._on_object_written(
+            bucket_name=bucket_name, file_name=file_name, size=len(data), etag=etag
+        )
+        return etag
+
+    def _upload_multipart(
+        self,
+        bucket_name: str,
+        file_name: str,
+        data: bytes,
+        content_type: str,
+        metadata: dict | None = None,
+    ) -> str:
+        """Upload bytes with a multipart upload whose parts are sent concurrently
+        over the connection pool of the client. Each part is retried on its own.
+        The multipart upload is aborted if a part still fails after its retries.
+
+        Args:
+            bucket_name (str): Bucket name.
+            file_name (str): File name.
+            data (bytes): File content.
+            content_type (str): MIME type.
+            metadata (dict | None, optional): Headers and user metadata. Defaults to None.
+
+        Raises:
+            S3Error: If the upload fails.
+
+        Returns:
+            str: ETag of the object.
+        """
+        part_size = max(minio_config.multipart_part_size, MIN_PART_SIZE)
+        view = memoryview(data)
+        headers = genheaders(metadata, None, None, None, False)
+        headers["Content-Type"] = content_type
+
+        # The minio client does not expose the multipart API publicly.
+        upload_id = self.client._create_multipart_upload(
+            bucket_name, file_name, headers
+        )
+
+        def upload_part(part_number: int) -> Part:
+            offset = (part_number - 1) * part_size
+            part_data = bytes(view[offset : offset + part_size])
+            for attempt in Retrying(
+                stop=stop_after_attempt(minio_config.multipart_retries),
+                wait=wait_exponential(multiplier=0.5, min=0.5, max=8),
+                reraise=True,
+            ):
+                with attempt:
+                    etag = self.client._upload_part(
+                        bucket_name, file_name, part_data, None, upload_id, part_number
+                    )
+            return Part(part_number, etag)
+
+        nb_parts = -(-len(data) // part_size)
+        try:
+            parts = list(
+                self.part_executor.map(upload_part, range(1, nb_parts + 1))
+            )
+            result = self.client._complete_multipart_upload(
+                bucket_name, file_name, upload_id, parts
+            )
+        except (S3Error, HTTPError, OSError):
+            try:
+                self.client._abort_multipart_upload(bucket_name, file_name, upload_id)
+            except (S3Error, HTTPError, OSError) as exception:
+                self.logger.warning(f"Multipart upload abort has failed: {exception}")
+            raise
+
+        self.logger.debug(
+            "Multipart upload completed: uri=minio://%s/%s, nb_parts=%d, bytes=%d",
+            bucket_name,
+            file_name,
+            nb_parts,
+            len(data),
+        )
+        return result.etag
+
     def put_object(
         self,
         bucket_name: str,
         file_name: str,
         data: bytes,
         content_type: str = "application/octet-stream",
+        compression: bool = True,
     ) -> str | None:
         """Upload a file.
+        Text content (JSON, JAMS, XML...) is compressed with the configured codec,
+        which is recorded in 'Content-Encoding' and in the 'codec' user metadata.
 
         Args:
             bucket_name (str): Bucket name.
             file_name (str): File name.
             data (bytes): File content.
             content_type (str, optional): MIME type. Defaults to "application/octet-stream".
+            compression (bool, optional): Allow compression of the content. Defaults to True.
 
         Returns:
             str | None: URI MinIO or None.
         """
         try:
-            self.client.put_object(
+            metadata = None
+            raw_size = len(data)
+            if (
+                compression
+                and self.codec
+                and content_type in COMPRESSIBLE_CONTENT_TYPES
+                and raw_size >= minio_config.compression_min_bytes
+            ):
+                data = compress(data, codec=self.codec)
+                metadata = {"Content-Encoding": self.codec, "codec": self.codec}
+
+            self._upload(
                 bucket_name=bucket_name,
-                object_name=file_name,
-                data=io.BytesIO(data),
-                length=len(data),
+                file_name=file_name,
+                data=data,
                 content_type=content_type,
+                metadata=metadata,
             )
-
             uri = f"minio://{bucket_name}/{file_name}"
-            self.logger.debug(f"Uploaded completed: uri={uri}, bytes={len(data)}")
+            self.logger.debug(
+                "Uploaded completed: uri=%s, bytes=%d, raw_bytes=%d",
+                uri,
+                len(data),
+                raw_size,
+            )
             return uri
 
         except S3Error as exception:
@@ -178,79 +429,129 @@ class MinIOStorage:
         """
         try:
             self.logger.debug("Upload image...")
-            self.client.put_object(
+            self._upload(
                 bucket_name=bucket_name,
-                object_name=file_name,
-                data=io.BytesIO(image_data),
-                length=len(image_data),
+                file_name=file_name,
+                data=image_data,
                 content_type=content_type,
             )
-
             uri = f"minio://{bucket_name}/{file_name}"
-            self.logger.debug(f"Image uploaded: {uri}")
+            self.logger.debug("Image uploaded: %s", uri)
             return uri
 
         except S3Error as exception:
             self.logger.error(f"Image upload failed: {exception}")
             return None
 
+    def audio_object_name(
+        self, bucket_name: str, file_name: str, audio_format: str | None = None
+    ) -> str:
+        """Name of the object written by put_audio: the extension matches the audio format of the bucket.
+
+        Args:
+            bucket_name (str): Bucket name.
+            file_name (str): File name, with or without extension.
+            audio_format (str | None, optional): "WAV", "FLAC" or "OGG". Defaults to the format configured for the bucket.
+
+        Returns:
+            str: Object name.
+        """
+        audio_format = (
+            audio_format or minio_config.audio_formats.get(bucket_name, "WAV")
+        ).upper()
+        extension = AUDIO_FORMATS[audio_format][0]
+        stem, dot, suffix = file_name.rpartition(".")
+        if dot and f".{suffix.lower()}" in {ext for ext, _, _ in AUDIO_FORMATS.values()}:
+            file_name = stem
+        return f"{file_name}{extension}"
+
     def put_audio(
         self,
         bucket_name: str,
         file_name: str,
         audio_data: np.ndarray,
         sample_rate: int,
-        content_type: str = "audio/wav",
+        content_type: str | None = None,
+        audio_format: str | None = None,
     ) -> str | None:
-        """Upload audio data as a WAV object to a MinIO bucket.
+        """Upload audio data as a WAV, FLAC or OGG object to a MinIO bucket.
+        The format is recorded in the 'audio-format' user metadata and the extension of the file name is adapted.
 
         Args:
             bucket_name (str): Target MinIO bucket name.
-            file_name (str): Object name in the bucket (must end with .wav).
+            file_name (str): Object name in the bucket.
             audio_data (np.ndarray): Audio signal data. Shape must be (n_samples,) or (n_samples, n_channels).
             sample_rate (int): Sampling rate in Hz.
-            content_type (str | None): MINE type. Defaults to "audio/wav".
+            content_type (str | None): MINE type. Defaults to the MINE type of the audio format.
+            audio_format (str | None, optional): "WAV", "FLAC" or "OGG". Defaults to the format configured for the bucket.
 
         Returns:
             str | None: MinIO URI or None.
         """
         try:
-            if not file_name.lower().endswith(".wav"):
-                file_name = f"{file_name}.wav"
+            audio_format = (
+                audio_format or minio_config.audio_formats.get(bucket_name, "WAV")
+            ).upper()
+            _, default_content_type, subtype = AUDIO_FORMATS[audio_format]
+            file_name = self.audio_object_name(
+                bucket_name=bucket_name, file_name=file_name, audio_format=audio_format
+            )
 
-            self.logger.debug("Upload WAV...")
+            self.logger.debug("Upload %s...", audio_format)
             buffer = io.BytesIO()
 
-            sf.write(
-                file=buffer,
-                data=audio_data,
-                samplerate=sample_rate,
-                format="WAV",
-            )
+            with metrics.timer(f"minio.encode_{audio_format.lower()}"):
+                sf.write(
+                    file=buffer,
+                    data=audio_data,
+                    samplerate=sample_rate,
+                    format=audio_format,
+                    subtype=subtype,
+                )
 
-            buffer.seek(0)  # Moves the buffer cursor to the beginning.
-            data_size = buffer.getbuffer().nbytes
+            data = buffer.getvalue()
+            data_size = len(data)
 
-            self.client.put_object(
+            self._upload(
                 bucket_name=bucket_name,
-                object_name=file_name,
-                data=buffer,
-                length=data_size,
-                content_type=content_type,
+                file_name=file_name,
+                data=data,
+                content_type=content_type or default_content_type,
+                metadata={"audio-format": audio_format.lower()},
             )
-
             uri = f"minio://{bucket_name}/{file_name}"
-            self.logger.debug(
-                f"Uploading audio data to MinIO: uri={uri}, sample_rate={sample_rate}, shape={audio_data.shape}, bytes={data_size}"
-            )
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "Uploading audio data to MinIO: uri=%s, sample_rate=%d, shape=%s, bytes=%d",
+                    uri,
+                    sample_rate,
+                    audio_data.shape,
+                    data_size,
+                )
             return uri
 
         except S3Error as exception:
             self.logger.error(f"Audio upload failed: {exception}")
             return None
 
+    def put_audio_async(self, **kwargs) -> Future:
+        """Encode and upload audio data in the worker pool of the storage.
+        The task runs in the context of the caller, so its spans keep the correlation ID of the recording.
+
+        Args:
+            **kwargs: Keyword arguments forwarded to 'put_audio'.
+
+        Returns:
+            Future: Future of the MinIO URI or None.
+        """
+        return self.executor.submit(
+            contextvars.copy_context().run, self.put_audio, **kwargs
+        )
+
     def get_object(self, bucket_name: str, file_name: str) -> bytes | None:
         """Gets an object from a bucket using its file name.
+        Objects compressed by put_object are decompressed.
+        If the disk cache is enabled, the object is read from the cache when its ETag has not changed.
 
         Args:
             bucket_name (str): Bucket name.
@@ -260,12 +561,40 @@ class MinIOStorage:
             bytes | None: Object get or None.
         """
         try:
-            response = self.client.get_object(bucket_name, file_name)
-            data = response.read()
-            response.close()
-            response.release_conn()  # To reuse the connection
+            if self.cache is not None:
+                data = self.cache.get(
+                    bucket_name=bucket_name,
+                    file_name=file_name,
+                    get_etag=lambda: self.client.stat_object(
+                        bucket_name, file_name
+                    ).etag,
+                )
+                if data is not None:
+                    return data
+
+            with metrics.timer("minio.get_object") as call:
+                response = self.client.get_object(bucket_name, file_name)
+                data = response.read()
+                etag = response.headers.get("ETag", "").strip('"')
+                codec = response.headers.get(
+                    "Content-Encoding"
+                ) or response.headers.get("x-amz-meta-codec")
+                response.close()
+                response.release_conn()  # To reuse the connection
+                call["bytes_read"] = len(data)
+
+            if codec in MAGIC_NUMBERS:
+                data = decompress(data, codec=codec)
+
+            if self.cache is not None:
+                self.cache.put(
+                    bucket_name=bucket_name, file_name=file_name, etag=etag, data=data
+                )
             self.logger.debug(
-                f"Object get: uri=minio://{bucket_name}/{file_name}, bytes={len(data)}"
+                "Object get: uri=minio://%s/%s, bytes=%d",
+                bucket_name,
+                file_name,
+                len(data),
             )
             return data
         except S3Error as exception:
@@ -275,7 +604,7 @@ class MinIOStorage:
     def get_audio(
         self, bucket_name: str, file_name: str
     ) -> tuple[np.ndarray, int] | None:
-        """Gets an audio from a bucket using its file name.
+        """Gets an audio from a bucket using its file name. The format (WAV, FLAC or OGG) is detected from the content.
 
         Args:
             bucket_name (str): Bucket name.
@@ -288,10 +617,209 @@ class MinIOStorage:
             bucket_name=bucket_name,
             file_name=file_name,
         )
-        if len(audio_bytes) > 0:
+        if audio_bytes:
             return sf.read(io.BytesIO(audio_bytes))
         return None
 
+    def get_audio_async(self, **kwargs) -> Future:
+        """Download and decode audio data in the worker pool of the storage.
+
+        Args:
+            **kwargs: Keyword arguments forwarded to 'get_audio'.
+
+        Returns:
+            Future: Future of the tuple (audio_data, sample_rate) or None.
+        """
+        return self.executor.submit(
+            contextvars.copy_context().run, self.get_audio, **kwargs
+        )
+
+    def _get_range(
+        self, bucket_name: str, file_name: str, offset: int, length: int
+    ) -> tuple[bytes, int | None, str]:
+        """Gets a byte range of an object with a ranged GET.
+
+        Args:
+            bucket_name (str): Bucket name.
+            file_name (str): File name.
+            offset (int): Start of the range in bytes.
+            length (int): Length of the range in bytes.
+
+        Returns:
+            tuple[bytes, int | None, str]: Bytes of the range, total size of the object (None if unknown) and its ETag.
+        """
+        response = self.client.get_object(
+            bucket_name, file_name, offset=offset, length=length
+        )
+        try:
+            data = response.read()
+            content_range = response.headers.get("Content-Range", "")
+            total_size = content_range.rpartition("/")[2]
+            etag = response.headers.get("ETag", "").strip('"')
+            return data, int(total_size) if total_size.isdigit() else None, etag
+        finally:
+            response.close()
+            response.release_conn()  # To reuse the connection
+
+    def get_wav_header(self, bucket_name: str, file_name: str) -> WAVHeader:
+        """Gets the header of a WAV object. Headers are fetched with a small ranged GET and cached.
+
+        Args:
+            bucket_name (str): Bucket name.
+            file_name (str): File name.
+
+        Raises:
+            S3Error: If the object cannot be fetched.
+            ValueError: If the object is not a WAV file.
+
+        Returns:
+            WAVHeader: Header of the WAV object.
+        """
+        header, _ = self._get_wav_header(bucket_name=bucket_name, file_name=file_name)
+        return header
+
+    def _get_wav_header(
+        self, bucket_name: str, file_name: str
+    ) -> tuple[WAVHeader, str]:
+        """Gets the header of a WAV object with the ETag of the object it was read from,
+        to be checked against the ETag of later ranged reads."""
+        key = (bucket_name, file_name)
+        cached = self._wav_headers.get(key)
+        if cached is not None:
+            etag, header = cached
+            return header, etag
+
+        data, total_size, etag = self._get_range(
+            bucket_name=bucket_name,
+            file_name=file_name,
+            offset=0,
+            length=WAV_HEADER_PROBE_SIZE,
+        )
+        header = WAVHeader.from_bytes(data)
+        if total_size is not None:
+            data_size = total_size - header.data_offset
+            if header.data_size > data_size or header.data_size == 0:
+                header = replace(header, data_size=data_size)
+        self._wav_headers[key] = (etag, header)
+        self.logger.debug(
+            "WAV header cached: uri=minio://%s/%s, subtype=%s, frames=%d, etag=%s",
+            bucket_name,
+            file_name,
+            header.subtype,
+            header.frames,
+            etag,
+        )
+        return header, etag
+
+    def get_audio_segment(
+        self,
+        bucket_name: str,
+        file_name: str,
+        start_s: float,
+        duration_s: float,
+    ) -> tuple[np.ndarray, int] | None:
+        """Gets a segment of an audio from a bucket. Only the bytes of the requested frames are fetched.
+        If the object has been overwritten since its header was cached, which the ETag of the ranged GET tells,
+        the header is fetched again and the segment read again.
+
+        Args:
+            bucket_name (str): Bucket name.
+            file_name (str): File name.
+            start_s (float): Start of the segment in seconds.
+            duration_s (float): Duration of the segment in seconds.
+
+        Returns:
+            tuple[np.ndarray, int] | None: A tuple containing audio_data, a numpy array of shape (n_samples,) or (n_samples, n_channels), and sample_rate, a sampling rate in Hz or None.
+        """
+        for attempt in range(2):
+            try:
+                header, header_etag = self._get_wav_header(
+                    bucket_name=bucket_name, file_name=file_name
+                )
+                if header.subtype is None:
+                    raise ValueError(f"Unsupported WAV subtype: {header}")
+            except ValueError as exception:
+                self.logger.debug(
+                    "Ranged read not available, fallback to full download: uri=minio://%s/%s, reason=%s",
+                    bucket_name,
+                    file_name,
+                    exception,
+                )
+                return self._get_audio_segment_from_object(
+                    bucket_name=bucket_name,
+                    file_name=file_name,
+                    start_s=start_s,
+                    duration_s=duration_s,
+                )
+            except S3Error as exception:
+                self.logger.error(f"Get WAV header failed: {exception}")
+                return None
+
+            offset, length = header.byte_range(
+                start_frame=int(round(max(start_s, 0.0) * header.sample_rate)),
+                n_frames=int(round(max(duration_s, 0.0) * header.sample_rate)),
+            )
+            if length <= 0:
+                data, etag = b"", header_etag
+            else:
+                try:
+                    data, _, etag = self._get_range(
+                        bucket_name=bucket_name,
+                        file_name=file_name,
+                        offset=offset,
+                        length=length,
+                    )
+                except S3Error as exception:
+                    self.logger.error(f"Get audio segment failed: {exception}")
+                    return None
+
+            if etag == header_etag:
+                break
+            self._wav_headers.pop((bucket_name, file_name), None)
+            self.logger.debug(
+                "WAV object changed since its header was cached: uri=minio://%s/%s, attempt=%d",
+                bucket_name,
+                file_name,
+                attempt + 1,
+            )
+        else:
+            self.logger.error(
+                f"Get audio segment failed, object changed while reading: uri=minio://{bucket_name}/{file_name}"
+            )
+            return None
+
+        audio_data = header.decode(data)
+        if header.channels == 1:
+            audio_data = audio_data[:, 0]  # Same shape as soundfile.read
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "Audio segment get: uri=minio://%s/%s, shape=%s, bytes=%d",
+                bucket_name,
+                file_name,
+                audio_data.shape,
+                len(data),
+            )
+        return audio_data, header.sample_rate
+
+    def _get_audio_segment_from_object(
+        self,
+        bucket_name: str,
+        file_name: str,
+        start_s: float,
+        duration_s: float,
+    ) -> tuple[np.ndarray, int] | None:
+        """Gets a segment of an audio by downloading the whole object."""
+        audio_bytes = self.get_object(bucket_name=bucket_name, file_name=file_name)
+        if not audio_bytes:
+            return None
+
+        with sf.SoundFile(io.BytesIO(audio_bytes)) as sound_file:
+            sample_rate = sound_file.samplerate
+            sound_file.seek(min(int(round(start_s * sample_rate)), sound_file.frames))
+            audio_data = sound_file.read(frames=int(round(duration_s * sample_rate)))
+        return audio_data, sample_rate
+
     def list_objects(self, bucket_name: str, prefix: str = "") -> Iterator[Object]:
         """List of information about the objects in a bucket based on a prefix.
 
@@ -350,6 +878,9 @@ class MinIOStorage:
         try:
             self.logger.debug("Remove object...")
             self.client.remove_object(bucket_name, file_name)
+            self._invalidate(bucket_name=bucket_name, file_name=file_name)
+            if self.index is not None:
+                self.index.remove(bucket_name=bucket_name, file_name=file_name)
             self.logger.warning(
                 f"Object removed: uri=minio://{bucket_name}/{file_name}"
             )
@@ -386,8 +917,111 @@ class MinIOStorage:
             self.logger.error(f"Get presigned URL has failed: {exception}")
             return None
 
+    @staticmethod
+    def _to_row(obj: Object) -> ObjectRow:
+        last_modified = obj.last_modified.isoformat() if obj.last_modified else None
+        return obj.object_name, obj.size, obj.etag, last_modified
+
+    def _refresh_prefix(self, bucket_name: str, prefix: str, full: bool) -> int:
+        """List a prefix recursively into the index.
+
+        Args:
+            bucket_name (str): Bucket name.
+            prefix (str): Prefix.
+            full (bool): If True, replace the indexed objects of the prefix. Otherwise, only list objects after the last indexed name.
+
+        Returns:
+            int: Number of objects listed.
+        """
+        if full:
+            rows = map(self._to_row, self.list_objects(bucket_name, prefix=prefix))
+            return self.index.replace_prefix(
+                bucket_name=bucket_name, prefix=prefix, rows=rows
+            )
+
+        objects = self.client.list_objects(
+            bucket_name,
+            prefix=prefix,
+            recursive=True,
+            start_after=self.index.last_name(bucket_name=bucket_name, prefix=prefix),
+        )
+        return self.index.upsert(
+            bucket_name=bucket_name, rows=map(self._to_row, objects)
+        )
+
+    def refresh_index(self, bucket_name: str, full: bool = False) -> int:
+        """Refresh the object index of a bucket.
+        Top-level prefixes (datasets) are listed in parallel.
+        An incremental refresh only lists objects whose name sorts after the last indexed name of each prefix,
+        objects uploaded through this class are indexed as they are written. Objects removed outside of this class
+        are only dropped from the index by a full refresh.
+
+        Args:
+            bucket_name (str): Bucket name.
+            full (bool, optional): Re-list every object and drop removed ones. Defaults to False.
+
+        Returns:
+            int: Number of objects listed.
+        """
+        if self.index is None:
+            raise RuntimeError("MinIO object index is not enabled")
+
+        self.logger.debug(f"Refresh object index: bucket={bucket_name}, full={full}")
+        prefixes = []
+        top_level_rows = []
+        for obj in self.client.list_objects(bucket_name, recursive=False):
+            if obj.is_dir:
+                prefixes.append(obj.object_name)
+            else:
+                top_level_rows.append(self._to_row(obj))
+
+        if full:
+            indexed_names = self.index.names(bucket_name=bucket_name)
+            listed_prefixes = tuple(prefixes)
+            for name in indexed_names:
+                if "/" not in name or not name.startswith(listed_prefixes):
+                    self.index.remove(bucket_name=bucket_name, file_name=name)
+        nb_objects = self.index.upsert(bucket_name=bucket_name, rows=top_level_rows)
+
+        with ThreadPoolExecutor(max_workers=minio_config.index_workers) as executor:
+            nb_objects += sum(
+                executor.map(
+                    lambda prefix: self._refresh_prefix(bucket_name, prefix, full),
+                    prefixes,
+                )
+            )
+
+        self.index.mark_refreshed(bucket_name=bucket_name)
+        self.logger.debug(f"Object index refreshed: nb_objects={nb_objects}")
+        return nb_objects
+
+    def _ensure_index(self, bucket_name: str) -> None:
+        """Populate the index of a bucket which has never been listed."""
+        if not self.index.is_refreshed(bucket_name=bucket_name):
+            self.refresh_index(bucket_name=bucket_name, full=True)
+
+    def object_exists(self, bucket_name: str, file_name: str) -> bool:
+        """Check if an object exists. Answers from the object index if it is enabled.
+
+        Args:
+            bucket_name (str): Bucket name.
+            file_name (str): File name.
+
+        Returns:
+            bool: True if the object exists, false otherwise.
+        """
+        if self.index is not None:
+            self._ensure_index(bucket_name=bucket_name)
+            return self.index.exists(bucket_name=bucket_name, file_name=file_name)
+
+        try:
+            self.client.stat_object(bucket_name, file_name)
+            return True
+        except S3Error:
+            return False
+
     def get_storage_stats(self) -> dict:
-        """Storage statistics.
+        """Storage statistics. Answers from the object index if it is enabled.
 
         Returns:
             dict: {"bucket_name": {"nb_objects": (int) number of objects, "total_size": (int) sum of objects size in bytes}, ...}
@@ -401,10 +1035,26 @@ class MinIOStorage:
         ]
 
         for bucket_name in bucket_names:
-            list_objects = list(self.list_objects(bucket_name))
+            if self.index is not None:
+                self._ensure_index(bucket_name=bucket_name)
+                stats[bucket_name] = self.index.stats(bucket_name=bucket_name)
+                continue
+
+            nb_objects, total_size = 0, 0
+            for obj in self.list_objects(bucket_name):
+                nb_objects += 1
+                total_size += obj.size
             stats[bucket_name] = {
-                "nb_objects": len(list_objects),
-                "total_size": sum(obj.size for obj in list_objects),
+                "nb_objects": nb_objects,
+                "total_size": total_size,
             }
 
         return stats
+
+    def close(self) -> None:
+        """Wait for pending uploads and close the object index."""
+        self.executor.shutdown(wait=True)
+        self.part_executor.shutdown(wait=True)
+        self.logger.info(f"Adaptive concurrency: {self.upload_controller.summary()}")
+        if self.index is not None:
+            self.index.close()
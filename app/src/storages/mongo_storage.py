@@ -1,12 +1,64 @@
 import logging
+import math
+import time
+from contextlib import contextmanager
 from datetime import datetime, timezone
+from typing import Iterator
 
-from config import mongo_config
-from pymongo import MongoClient
-from pymongo.errors import PyMongoError
+from config import adaptive_concurrency_config, mongo_config
+from pymongo import ASCENDING, DeleteMany, IndexModel, MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from pymongo.write_concern import WriteConcern
 
 from src.models import BeatPositionDict, ChordDict, NoteMidiDict, PitchContourDict
-from src.utils import LOGGER_NAME
+from src.utils import AIMDController, LOGGER_NAME
+from src.utils.metrics import metrics
+
+# Same index as the 'unique_title_dataset' indexes of mongo/initdb/01_collections.js, for databases created
+# before them. Used by every upsert filter.
+UNIQUE_TITLE_DATASET = IndexModel(
+    [("title", ASCENDING), ("dataset_name", ASCENDING)],
+    unique=True,
+    name="unique_title_dataset",
+)
+
+INDEXES: dict[str, list[IndexModel]] = {
+    mongo_config.collection_pitch_contour: [UNIQUE_TITLE_DATASET],
+    mongo_config.collection_note_midi: [UNIQUE_TITLE_DATASET],
+    mongo_config.collection_beat_position: [UNIQUE_TITLE_DATASET],
+    mongo_config.collection_chord: [UNIQUE_TITLE_DATASET],
+}
+
+# Bucketed layout: one document per (dataset_name, title, data_source, time bucket).
+# Its collections are not created by the init script, their indexes only come from ensure_indexes.
+UNIQUE_TITLE_DATASET_BUCKET = IndexModel(
+    [
+        ("title", ASCENDING),
+        ("dataset_name", ASCENDING),
+        ("data_source", ASCENDING),
+        ("bucket_start", ASCENDING),
+    ],
+    unique=True,
+    name="unique_title_dataset_bucket",
+)
+TITLE_BUCKET_START = IndexModel(
+    [("title", ASCENDING), ("bucket_start", ASCENDING)], name="title_bucket_start"
+)
+
+if mongo_config.bucketed:
+    for _collection_name in list(INDEXES):
+        INDEXES[f"{_collection_name}{mongo_config.bucket_suffix}"] = [
+            UNIQUE_TITLE_DATASET_BUCKET,
+            TITLE_BUCKET_START,
+        ]
+
+# Fields holding the list of events of an annotation document.
+EVENT_FIELDS = ("pitch_contour", "note_midi", "beat_position", "chord", "transcription")
+
+# Filters run on the hot path, checked by the index self-check.
+HOT_FILTERS: dict[str, dict] = {
+    "upsert": {"dataset_name": "", "title": ""},
+}
 
 
 class MongoStorage:
@@ -24,6 +76,25 @@ class MongoStorage:
             "beat_position": self.beat_position,
             "chord": self.chord,
         }
+        if mongo_config.bucketed:
+            for collection_name in list(self.collections):
+                bucket_collection_name = self._bucket_collection_name(collection_name)
+                self.collections[bucket_collection_name] = self.db[
+                    bucket_collection_name
+                ]
+        self._bulk_operations: dict[str, list[UpdateOne | DeleteMany]] | None = None
+        self._bulk_report: dict | None = None
+        # In bulk-load mode, the number of operations by bulk_write follows this controller
+        self.bulk_controller = AIMDController(
+            name="bulk_write",
+            initial=mongo_config.bulk_batch_size,
+            minimum=adaptive_concurrency_config.bulk_min_batch_size,
+            maximum=adaptive_concurrency_config.bulk_max_batch_size,
+            step=adaptive_concurrency_config.bulk_batch_size_step,
+            wall_clock=False,
+        )
+        if mongo_config.ensure_indexes:
+            self.ensure_indexes()
 
     def _get_client(self) -> MongoClient:
         self.logger.info("Connexion to the Mongo service...")
@@ -31,15 +102,261 @@ class MongoStorage:
         self.logger.info("Connecting to the Mongo service")
         return client
 
+    # INDEXES
+
+    def ensure_indexes(self) -> dict[str, list[str]]:
+        """Create the indexes declared in INDEXES. Existing indexes are left untouched.
+
+        Returns:
+            dict[str, list[str]]: Names of the indexes ensured by collection name.
+        """
+        ensured = {}
+        for collection_name, index_models in INDEXES.items():
+            try:
+                ensured[collection_name] = self.db[collection_name].create_indexes(
+                    index_models
+                )
+            except PyMongoError as exception:
+                self.logger.error(
+                    f"Index creation has failed: collection={collection_name}, {exception}"
+                )
+        self.logger.debug(f"Indexes ensured: {ensured}")
+        return ensured
+
+    def _plan_summary(self, explain: dict) -> dict:
+        """Summarise the winning plan of an explain output.
+
+        Args:
+            explain (dict): Output of an explain command.
+
+        Returns:
+            dict: {"stages": (list[str]) stages of the winning plan, "index_names": (list[str]) indexes used, "docs_examined": (int | None) number of documents examined}
+        """
+        stages, index_names = [], []
+
+        def walk(node):
+            if isinstance(node, dict):
+                if "stage" in node:
+                    stages.append(node["stage"])
+                if "indexName" in node:
+                    index_names.append(node["indexName"])
+                for value in node.values():
+                    walk(value)
+            elif isinstance(node, list):
+                for value in node:
+                    walk(value)
+
+        walk(explain.get("queryPlanner", {}).get("winningPlan", {}))
+        return {
+            "stages": stages,
+            "index_names": index_names,
+            "docs_examined": explain.get("executionStats", {}).get(
+                "totalDocsExamined"
+            ),
+        }
+
+    def check_indexes(self) -> dict[str, bool]:
+        """Check with explain() that the hot filters of every collection use an index.
+
+        Returns:
+            dict[str, bool]: True by collection name if no hot filter needs a collection scan.
+        """
+        results = {}
+        for collection_name in INDEXES:
+            results[collection_name] = True
+            for filter_name, filter in HOT_FILTERS.items():
+                explain = self.db[collection_name].find(filter).limit(1).explain()
+                plan = self._plan_summary(explain)
+                if "COLLSCAN" in plan["stages"] or not plan["index_names"]:
+                    results[collection_name] = False
+                    self.logger.warning(
+                        f"Hot filter does not use an index: collection={collection_name}, filter={filter_name}, stages={plan['stages']}"
+                    )
+        return results
+
+    def index_report(self) -> dict[str, dict]:
+        """Report the index sizes and the query plans of the hot filters of every collection.
+
+        Returns:
+            dict[str, dict]: {collection_name: {"index_sizes": {index_name: bytes}, "plans": {filter_name: plan summary}}}
+        """
+        report = {}
+        for collection_name in INDEXES:
+            collection = self.db[collection_name]
+            stats = next(
+                collection.aggregate([{"$collStats": {"storageStats": {}}}]), {}
+            )
+            report[collection_name] = {
+                "index_sizes": stats.get("storageStats", {}).get("indexSizes", {}),
+                "plans": {
+                    filter_name: self._plan_summary(
+                        collection.find(filter).limit(1).explain()
+                    )
+                    for filter_name, filter in HOT_FILTERS.items()
+                },
+            }
+        return report
+
+    # BULK LOAD
+
+    @contextmanager
+    def bulk_load(self) -> Iterator[dict]:
+        """Bulk-load mode for a cold ingestion.
+
+        While the context is open, inserted documents are buffered and written in unordered
+        batches of upserts with a relaxed write concern (w=1, no journal), schema validation is off
+        and secondary indexes are dropped. Unique indexes are kept since upserts filter on them:
+        in the default layout every declared index is unique, so only the 'title_bucket_start' indexes
+        of the bucketed layout are dropped and rebuilt. On exit, batches are flushed, validation settings
+        and secondary indexes are restored, then every document is checked against the validator of its collection.
+
+        Yields:
+            Iterator[dict]: Report filled on exit. {"upserted": int, "modified": int, "errors": int, "violations": {collection_name: {"violations": int, "titles": list[str]}}}
+        """
+        self.logger.info("Mongo bulk-load mode start...")
+        report = {"upserted": 0, "modified": 0, "errors": 0, "violations": {}}
+        self._bulk_operations = {name: [] for name in self.collections}
+        self._bulk_report = report
+        validation_settings = self._set_validation_off()
+        self._drop_secondary_indexes()
+        try:
+            yield report
+        finally:
+            for collection_name in self.collections:
+                self._flush_bulk(collection_name=collection_name)
+            self._bulk_operations = None
+            self._bulk_report = None
+            self._restore_validation(validation_settings=validation_settings)
+            self.ensure_indexes()
+            report["violations"] = self.validate_documents()
+            self.logger.info(f"Mongo bulk-load mode completed: {report}")
+
+    def _set_validation_off(self) -> dict[str, dict]:
+        """Turn schema validation off, returns the previous validation settings by collection name."""
+        validation_settings = {}
+        for collection_name in self.collections:
+            try:
+                options = self.db[collection_name].options()
+                if "validator" not in options:
+                    continue
+                validation_settings[collection_name] = {
+                    "validationLevel": options.get("validationLevel", "strict"),
+                    "validationAction": options.get("validationAction", "error"),
+                }
+                self.db.command("collMod", collection_name, validationLevel="off")
+            except PyMongoError as exception:
+                self.logger.error(
+                    f"Validation relaxation has failed: collection={collection_name}, {exception}"
+                )
+        return validation_settings
+
+    def _restore_validation(self, validation_settings: dict[str, dict]) -> None:
+        """Restore the validation settings returned by _set_validation_off."""
+        for collection_name, settings in validation_settings.items():
+            try:
+                self.db.command("collMod", collection_name, **settings)
+            except PyMongoError as exception:
+                self.logger.error(
+                    f"Validation restoration has failed: collection={collection_name}, {exception}"
+                )
+
+    def _drop_secondary_indexes(self) -> None:
+        """Drop the declared indexes which are not unique. Collections without any are not queried."""
+        for collection_name, index_models in INDEXES.items():
+            names = [
+                index_model.document["name"]
+                for index_model in index_models
+                if not index_model.document.get("unique")
+            ]
+            if not names:
+                continue
+            existing = set(self.db[collection_name].index_information())
+            for name in names:
+                if name in existing:
+                    self.db[collection_name].drop_index(name)
+
+    def _flush_bulk(self, collection_name: str) -> None:
+        """Write the buffered upserts of a collection."""
+        operations = self._bulk_operations[collection_name]
+        if not operations:
+            return
+        self._bulk_operations[collection_name] = []
+
+        collection = self.collections[collection_name].with_options(
+            write_concern=WriteConcern(w=1, j=False)
+        )
+        start = time.perf_counter()
+        error = True
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+            self._bulk_report["upserted"] += result.upserted_count
+            self._bulk_report["modified"] += result.modified_count
+            error = False
+        except BulkWriteError as exception:
+            details = exception.details
+            self._bulk_report["upserted"] += details.get("nUpserted", 0)
+            self._bulk_report["modified"] += details.get("nModified", 0)
+            self._bulk_report["errors"] += len(details.get("writeErrors", []))
+            self.logger.error(
+                f"Bulk write has failed: collection={collection_name}, errors={len(details.get('writeErrors', []))}"
+            )
+        except PyMongoError as exception:
+            self._bulk_report["errors"] += len(operations)
+            self.logger.error(f"Bulk write has failed: {exception}")
+        latency = time.perf_counter() - start
+        self.bulk_controller.observe(latency=latency, units=len(operations), error=error)
+        metrics.observe(name="mongo.bulk_write", seconds=latency, error=error)
+        self.logger.debug(
+            "Bulk write completed: collection=%s, operations=%d",
+            collection_name,
+            len(operations),
+        )
+
+    def validate_documents(self, sample_size: int = 10) -> dict[str, dict]:
+        """Find the documents which do not match the validator of their collection.
+
+        Args:
+            sample_size (int, optional): Number of violating titles reported by collection. Defaults to 10.
+
+        Returns:
+            dict[str, dict]: {collection_name: {"violations": (int) number of violating documents, "titles": (list[str]) sample of violating titles}}
+        """
+        violations = {}
+        for collection_name in self.collections:
+            validator = self.db[collection_name].options().get("validator")
+            if not validator:
+                continue
+            filter = {"$nor": [validator]}
+            collection = self.collections[collection_name]
+            nb_violations = collection.count_documents(filter)
+            violations[collection_name] = {
+                "violations": nb_violations,
+                "titles": [
+                    document.get("title")
+                    for document in collection.find(filter, {"title": 1}).limit(
+                        sample_size
+                    )
+                ],
+            }
+            if nb_violations:
+                self.logger.warning(
+                    f"Documents violate the validator: collection={collection_name}, violations={nb_violations}"
+                )
+        return violations
+
+    # DOCUMENTS
+
     def _insert_document(self, collection_name: str, document: dict) -> str | None:
         """Insert or update a document. The update is based on 'dataset_name' and 'title'.
+        With the bucketed layout, the document is also written as bucket documents,
+        so readers of the original collections keep finding it.
 
         Args:
             collection_name (str): Name of the collection in which to insert the document.
             document (dict): Dictionary representing document.
 
         Returns:
-            str | None: "inserted", "updated" or None
+            str | None: "inserted", "updated", "buffered" (bulk-load mode) or None
         """
         try:
             if document.get("dataset_name", None) is None:
@@ -50,21 +367,47 @@ class MongoStorage:
 
             document["inserted_at"] = datetime.now(timezone.utc)
 
+            if mongo_config.bucketed:
+                self._insert_bucketed_document(
+                    collection_name=collection_name, document=document
+                )
+
+            if self._bulk_operations is not None:
+                operations = self._bulk_operations[collection_name]
+                operations.append(
+                    UpdateOne(
+                        {
+                            "dataset_name": document["dataset_name"],
+                            "title": document["title"],
+                        },
+                        {"$set": document},
+                        upsert=True,
+                    )
+                )
+                if len(operations) >= self.bulk_controller.limit:
+                    self._flush_bulk(collection_name=collection_name)
+                return "buffered"
+
             # Upsert based on dataset_name and title
-            result = self.collections[collection_name].update_one(
-                {"dataset_name": document["dataset_name"], "title": document["title"]},
-                {"$set": document},
-                upsert=True,
-            )
+            with metrics.timer("mongo.update_one"):
+                result = self.collections[collection_name].update_one(
+                    {"dataset_name": document["dataset_name"], "title": document["title"]},
+                    {"$set": document},
+                    upsert=True,
+                )
 
             if result.did_upsert:
                 self.logger.debug(
-                    f"Document inserted: dataset_name={document['dataset_name']}, title={document['title']}"
+                    "Document inserted: dataset_name=%s, title=%s",
+                    document["dataset_name"],
+                    document["title"],
                 )
                 return "inserted"
 
             self.logger.debug(
-                f"Document updated: dataset_name={document['dataset_name']}, title={document['title']}"
+                "Document updated: dataset_name=%s, title=%s",
+                document["dataset_name"],
+                document["title"],
             )
             return "updated"
 
@@ -72,6 +415,244 @@ class MongoStorage:
             self.logger.error(f"Document insert failed: {exception}")
             return None
 
+    # BUCKETED LAYOUT
+
+    def _bucket_collection_name(self, collection_name: str) -> str:
+        return f"{collection_name}{mongo_config.bucket_suffix}"
+
+    @staticmethod
+    def _event_interval(event: dict) -> tuple[float, float]:
+        """Start and end in seconds of a JAMS event (time, duration) or of an XML event (onset, offset)."""
+        start = event.get("time", event.get("onset")) or 0.0
+        if event.get("duration") is not None:
+            return start, start + event["duration"]
+        return start, max(event.get("offset") or start, start)
+
+    def _bucket_starts(self, start: float, end: float) -> range:
+        """Indexes of the buckets overlapped by an interval. A point event belongs to a single bucket."""
+        first = math.floor(start / mongo_config.bucket_duration)
+        last = max(math.ceil(end / mongo_config.bucket_duration) - 1, first)
+        return range(first, last + 1)
+
+    def _to_buckets(self, document: dict) -> list[dict]:
+        """Split an annotation document into bucket documents.
+        An event lasting over several buckets is copied into each of them.
+
+        Args:
+            document (dict): {dataset_name: str, title: str, <event field>: list[dict], ...}
+
+        Returns:
+            list[dict]: [{dataset_name, title, data_source, field, bucket_start, bucket_end, events, inserted_at}, ...]
+        """
+        field = next(
+            (field for field in EVENT_FIELDS if isinstance(document.get(field), list)),
+            None,
+        )
+        if field is None:
+            raise RuntimeError(f"No event field in document: {list(document)}")
+
+        buckets: dict[tuple[str, int], list[dict]] = {}
+        for event in document[field]:
+            event = dict(event)
+            data_source = str(event.pop("data_source", ""))
+            start, end = self._event_interval(event)
+            for index in self._bucket_starts(start, end):
+                buckets.setdefault((data_source, index), []).append(event)
+
+        return [
+            {
+                "dataset_name": document["dataset_name"],
+                "title": document["title"],
+                "data_source": data_source,
+                "field": field,
+                "bucket_start": index * mongo_config.bucket_duration,
+                "bucket_end": (index + 1) * mongo_config.bucket_duration,
+                "events": events,
+                "inserted_at": document["inserted_at"],
+            }
+            for (data_source, index), events in buckets.items()
+        ]
+
+    def _insert_bucketed_document(self, collection_name: str, document: dict) -> None:
+        """Insert or update an annotation document as bucket documents.
+        Buckets of a previous ingestion which no longer exist are deleted.
+
+        Args:
+            collection_name (str): Name of the collection of the annotation document.
+            document (dict): Dictionary representing document, with 'inserted_at' set.
+        """
+        bucket_collection_name = self._bucket_collection_name(collection_name)
+        title_filter = {
+            "dataset_name": document["dataset_name"],
+            "title": document["title"],
+        }
+        operations = [
+            UpdateOne(
+                {
+                    **title_filter,
+                    "data_source": bucket["data_source"],
+                    "bucket_start": bucket["bucket_start"],
+                },
+                {"$set": bucket},
+                upsert=True,
+            )
+            for bucket in self._to_buckets(document)
+        ]
+        # Buckets written by this call share 'inserted_at', so the order of the operations does not matter.
+        operations.append(
+            DeleteMany({**title_filter, "inserted_at": {"$lt": document["inserted_at"]}})
+        )
+
+        if self._bulk_operations is not None:
+            self._bulk_operations[bucket_collection_name].extend(operations)
+            if (
+                len(self._bulk_operations[bucket_collection_name])
+                >= self.bulk_controller.limit
+            ):
+                self._flush_bulk(collection_name=bucket_collection_name)
+            return
+
+        with metrics.timer("mongo.bulk_write"):
+            self.collections[bucket_collection_name].bulk_write(
+                operations, ordered=False
+            )
+        self.logger.debug(
+            "Bucketed document written: dataset_name=%s, title=%s, buckets=%d",
+            document["dataset_name"],
+            document["title"],
+            len(operations) - 1,
+        )
+
+    def find_range(
+        self,
+        title: str,
+        t0: float,
+        t1: float,
+        collection_name: str = mongo_config.collection_note_midi,
+        dataset_name: str | None = None,
+        data_source: str | None = None,
+    ) -> list[dict]:
+        """Find the events of a recording overlapping the time window [t0, t1).
+        With the bucketed layout, only the buckets overlapping the window are read.
+
+        Args:
+            title (str): Title of the recording.
+            t0 (float): Start of the window in seconds.
+            t1 (float): End of the window in seconds.
+            collection_name (str, optional): Name of the annotation collection. Defaults to note_midi.
+            dataset_name (str | None, optional): Name of the dataset. Defaults to None (any dataset).
+            data_source (str | None, optional): Source of annotation data. Defaults to None (any source).
+
+        Returns:
+            list[dict]: Events sorted by start time. Events having a source carry their 'data_source'.
+        """
+        filter = {"title": title}
+        if dataset_name is not None:
+            filter["dataset_name"] = dataset_name
+
+        def overlaps(event: dict) -> bool:
+            start, end = self._event_interval(event)
+            return start < t1 and (end > t0 if end > start else start >= t0)
+
+        events = []
+        if not mongo_config.bucketed:
+            for document in self.collections[collection_name].find(filter):
+                field = next(
+                    (f for f in EVENT_FIELDS if isinstance(document.get(f), list)), None
+                )
+                events.extend(
+                    event
+                    for event in document.get(field) or []
+                    if overlaps(event)
+                    and (data_source is None or str(event.get("data_source")) == data_source)
+                )
+            return sorted(events, key=lambda event: self._event_interval(event)[0])
+
+        if data_source is not None:
+            filter["data_source"] = data_source
+        first_bucket_start = (
+            math.floor(t0 / mongo_config.bucket_duration) * mongo_config.bucket_duration
+        )
+        filter["bucket_start"] = {"$gte": first_bucket_start, "$lt": t1}
+
+        cursor = self.collections[self._bucket_collection_name(collection_name)].find(
+            filter, {"_id": 0, "data_source": 1, "bucket_start": 1, "events": 1}
+        )
+        for bucket in cursor:
+            for event in bucket["events"]:
+                start, _ = self._event_interval(event)
+                # An event copied into several buckets is kept from the first bucket read.
+                owner = max(
+                    math.floor(start / mongo_config.bucket_duration)
+                    * mongo_config.bucket_duration,
+                    first_bucket_start,
+                )
+                if owner == bucket["bucket_start"] and overlaps(event):
+                    if bucket["data_source"]:
+                        event["data_source"] = bucket["data_source"]
+                    events.append(event)
+        return sorted(events, key=lambda event: self._event_interval(event)[0])
+
+    def find_annotations(
+        self,
+        collection_name: str,
+        titles: list[str],
+        fields: list[str] | None = None,
+    ) -> dict[str, list[dict]]:
+        """Find the events of many recordings with a single $in query, whatever the layout.
+
+        Args:
+            collection_name (str): Name of the annotation collection.
+            titles (list[str]): Titles of the recordings.
+            fields (list[str] | None, optional): Event fields to project, e.g. ["time", "value"]. Defaults to None (every field).
+
+        Returns:
+            dict[str, list[dict]]: Events by title, sorted by start time for the bucketed layout.
+        """
+        if mongo_config.bucketed:
+            event_fields = ["events"]
+            projection = {"_id": 0, "title": 1, "data_source": 1, "bucket_start": 1}
+            collection = self.collections[self._bucket_collection_name(collection_name)]
+        else:
+            event_fields = list(EVENT_FIELDS)
+            projection = {"_id": 0, "title": 1}
+            collection = self.collections[collection_name]
+        for event_field in event_fields:
+            if fields:
+                projection.update(
+                    {f"{event_field}.{field}": 1 for field in {*fields, "time", "onset"}}
+                )
+            else:
+                projection[event_field] = 1
+
+        start = time.perf_counter()
+        events_by_title: dict[str, list[dict]] = {title: [] for title in titles}
+        for document in collection.find({"title": {"$in": titles}}, projection):
+            events = events_by_title.setdefault(document["title"], [])
+            if not mongo_config.bucketed:
+                field = next(
+                    (f for f in EVENT_FIELDS if isinstance(document.get(f), list)), None
+                )
+                events.extend(document.get(field) or [])
+                continue
+            for event in document.get("events", []):
+                start, _ = self._event_interval(event)
+                # An event copied into several buckets is kept from its first bucket.
+                if (
+                    math.floor(start / mongo_config.bucket_duration)
+                    * mongo_config.bucket_duration
+                    == document["bucket_start"]
+                ):
+                    if document["data_source"]:
+                        event["data_source"] = document["data_source"]
+                    events.append(event)
+
+        if mongo_config.bucketed:
+            for events in events_by_title.values():
+                events.sort(key=lambda event: self._event_interval(event)[0])
+        metrics.observe(name="mongo.find_annotations", seconds=time.perf_counter() - start)
+        return events_by_title
+
     def insert_pitch_contour(
         self, pitch_contour: dict[str, str | list[PitchContourDict]]
     ) -> str | None:
@@ -148,10 +729,11 @@ class MongoStorage:
             {
                 "inserted": (int) Number of documents inserted,
                 "updated": (int) Number of documents updated,
+                "buffered": (int) Number of documents buffered (bulk-load mode),
                 "errors": (int) Number of errors
             }
         """
-        results = {"inserted": 0, "updated": 0, "errors": 0}
+        results = {"inserted": 0, "updated": 0, "buffered": 0, "errors": 0}
 
         for document in documents:
             result = self._insert_document(
@@ -162,6 +744,8 @@ class MongoStorage:
                     results["updated"] += 1
                 case "inserted":
                     results["inserted"] += 1
+                case "buffered":
+                    results["buffered"] += 1
                 case _:
                     results["errors"] += 1
 
@@ -242,5 +826,7 @@ class MongoStorage:
 
     def close(self) -> None:
         """Close the connection"""
+        if self.bulk_controller.decisions:
+            self.logger.info(f"Adaptive concurrency: {self.bulk_controller.summary()}")
         self.client.close()
         self.logger.info("Mongo connection closed")
@@ -0,0 +1,184 @@
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable
+
+from src.utils import LOGGER_NAME
+
+ObjectRow = tuple[str, int, str, str | None]  # (name, size, etag, last_modified)
+
+
+class ObjectIndex:
+    """
+    Local SQLite index of MinIO objects (name, size, ETag, last_modified).
+    The database uses WAL journaling so that several processes can read it while one refreshes it.
+    """
+
+    def __init__(self, index_path: Path):
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.index_path = index_path
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            index_path, check_same_thread=False, timeout=30
+        )
+        self._create_tables()
+
+    def _create_tables(self) -> None:
+        with self._lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL;")
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS objects (
+                    bucket TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    PRIMARY KEY (bucket, name)
+                ) WITHOUT ROWID;
+                """
+            )
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS buckets (
+                    bucket TEXT PRIMARY KEY,
+                    refreshed_at TEXT NOT NULL
+                );
+                """
+            )
+
+    @staticmethod
+    def _prefix_range(prefix: str) -> tuple[str, str | None]:
+        """Bounds of the names starting with the prefix, usable with the primary key."""
+        if not prefix:
+            return "", None
+        return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+    def _where_prefix(self, prefix: str) -> tuple[str, tuple]:
+        lower, upper = self._prefix_range(prefix)
+        if upper is None:
+            return "bucket=?", ()
+        return "bucket=? AND name>=? AND name<?", (lower, upper)
+
+    def upsert(self, bucket_name: str, rows: Iterable[ObjectRow]) -> int:
+        """Insert or update objects.
+
+        Args:
+            bucket_name (str): Bucket name.
+            rows (Iterable[ObjectRow]): Tuples (name, size, etag, last_modified).
+
+        Returns:
+            int: Number of objects upserted.
+        """
+        rows = [(bucket_name, *row) for row in rows]
+        with self._lock, self.connection:
+            self.connection.executemany(
+                """
+                INSERT INTO objects (bucket, name, size, etag, last_modified)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (bucket, name) DO UPDATE SET
+                    size=excluded.size, etag=excluded.etag, last_modified=excluded.last_modified;
+                """,
+                rows,
+            )
+        return len(rows)
+
+    def replace_prefix(
+        self, bucket_name: str, prefix: str, rows: Iterable[ObjectRow]
+    ) -> int:
+        """Replace every object of a prefix, removing objects which no longer exist.
+
+        Args:
+            bucket_name (str): Bucket name.
+            prefix (str): Prefix.
+            rows (Iterable[ObjectRow]): Tuples (name, size, etag, last_modified).
+
+        Returns:
+            int: Number of objects indexed.
+        """
+        rows = [(bucket_name, *row) for row in rows]
+        where, params = self._where_prefix(prefix)
+        with self._lock, self.connection:
+            self.connection.execute(
+                f"DELETE FROM objects WHERE {where};", (bucket_name, *params)
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?);", rows
+            )
+        return len(rows)
+
+    def remove(self, bucket_name: str, file_name: str) -> None:
+        """Remove an object.
+
+        Args:
+            bucket_name (str): Bucket name.
+            file_name (str): File name.
+        """
+        with self._lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM objects WHERE bucket=? AND name=?;",
+                (bucket_name, file_name),
+            )
+
+    def mark_refreshed(self, bucket_name: str) -> None:
+        """Record that a bucket has been listed at least once."""
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO buckets VALUES (?, ?);",
+                (bucket_name, datetime.now(timezone.utc).isoformat()),
+            )
+
+    def is_refreshed(self, bucket_name: str) -> bool:
+        """True if the bucket has been listed at least once."""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM buckets WHERE bucket=?;", (bucket_name,)
+            ).fetchone()
+        return row is not None
+
+    def last_name(self, bucket_name: str, prefix: str = "") -> str | None:
+        """Greatest object name indexed under a prefix, used as 'start_after' for incremental listings."""
+        where, params = self._where_prefix(prefix)
+        with self._lock:
+            row = self.connection.execute(
+                f"SELECT MAX(name) FROM objects WHERE {where};", (bucket_name, *params)
+            ).fetchone()
+        return row[0]
+
+    def exists(self, bucket_name: str, file_name: str) -> bool:
+        """True if the object is indexed."""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM objects WHERE bucket=? AND name=?;",
+                (bucket_name, file_name),
+            ).fetchone()
+        return row is not None
+
+    def names(self, bucket_name: str, prefix: str = "") -> set[str]:
+        """Names of the objects indexed under a prefix."""
+        where, params = self._where_prefix(prefix)
+        with self._lock:
+            rows = self.connection.execute(
+                f"SELECT name FROM objects WHERE {where};", (bucket_name, *params)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def stats(self, bucket_name: str) -> dict:
+        """Number of objects and sum of objects size in bytes of a bucket.
+
+        Returns:
+            dict: {"nb_objects": (int) number of objects, "total_size": (int) sum of objects size in bytes}
+        """
+        with self._lock:
+            nb_objects, total_size = self.connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects WHERE bucket=?;",
+                (bucket_name,),
+            ).fetchone()
+        return {"nb_objects": nb_objects, "total_size": total_size}
+
+    def close(self) -> None:
+        """Close the connection"""
+        self.connection.close()
@@ -1,10 +1,99 @@
+import itertools
 import logging
+import time
+from typing import Iterator
 
+import numpy as np
 import psycopg
 from config import postgres_config
+from psycopg import sql
 
-from src.models import JAMSMetadata, XMLMetadata
+from src.models import AnnotationStatistics, JAMSMetadata, XMLMetadata
 from src.utils import LOGGER_NAME
+from src.utils.metrics import metrics
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is only required by the 'arrow' batch format
+    pa = None
+
+# Columns of postgres/initdb/01_tables.sql with their Arrow/NumPy type.
+METADATA_COLUMNS: dict[str, str] = {
+    "id_metadata": "int32",
+    "dataset_name": "string",
+    "guitarist_id": "int32",
+    "title": "string",
+    "style": "string",
+    "tempo": "int32",
+    "scale": "string",
+    "mode": "string",
+    "playing_version": "string",
+    "duration": "float64",
+    "instrument": "string",
+    "instrument_model": "string",
+    "pick_up_setting": "string",
+    "instrument_tuning": "string",
+    "audio_effects": "string",
+    "recording_date": "string",
+    "recording_artist": "string",
+    "instrument_body_material": "string",
+    "instrument_string_material": "string",
+    "composer": "string",
+    "recording_source": "string",
+}
+
+# Same table as postgres/initdb/01_tables.sql, for databases created before it.
+STATISTICS_TABLE: list[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS annotation_statistics (
+        id_metadata INTEGER PRIMARY KEY REFERENCES metadata (id_metadata) ON DELETE CASCADE,
+        n_pitch_contour INTEGER,
+        n_notes INTEGER,
+        n_beats INTEGER,
+        n_chords INTEGER,
+        pitch_min FLOAT,
+        pitch_max FLOAT,
+        pitch_histogram INTEGER[],
+        note_duration_mean FLOAT,
+        note_density FLOAT,
+        distinct_chords INTEGER,
+        ibi_mean FLOAT,
+        ibi_std FLOAT,
+        ibi_min FLOAT,
+        ibi_max FLOAT
+    );
+    """,
+]
+
+# Same table as postgres/initdb/01_tables.sql, for databases created before it.
+JOBS_TABLE: list[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS ingestion_jobs (
+        id_job SERIAL PRIMARY KEY,
+        pipeline VARCHAR(255) NOT NULL,
+        kind VARCHAR(15) NOT NULL,
+        file_path TEXT NOT NULL,
+        dataset_number INTEGER,
+        status VARCHAR(15) NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        claimed_by VARCHAR(255),
+        lease_expires_at TIMESTAMPTZ,
+        error TEXT,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        UNIQUE (pipeline, file_path)
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_status ON ingestion_jobs (pipeline, status, id_job);",
+]
+
+# Same indexes as postgres/initdb/01_tables.sql, for databases created before them.
+INDEXES: list[str] = [
+    "CREATE INDEX IF NOT EXISTS idx_metadata_dataset_name ON metadata (dataset_name);",
+    "CREATE INDEX IF NOT EXISTS idx_metadata_style ON metadata (style);",
+    "CREATE INDEX IF NOT EXISTS idx_metadata_guitarist_id ON metadata (guitarist_id);",
+    "CREATE INDEX IF NOT EXISTS idx_metadata_playing_version ON metadata (playing_version);",
+]
 
 
 class PostgresStorage:
@@ -12,6 +101,10 @@ class PostgresStorage:
         self.logger = logging.getLogger(LOGGER_NAME)
         self.connection = self._get_connection()
         self.cursor = self.connection.cursor()
+        self._cursor_ids = itertools.count()
+        self._title_ids: dict[str, int] | None = None
+        if postgres_config.ensure_indexes:
+            self.ensure_indexes()
 
     def _get_connection(self) -> psycopg.Connection:
         self.logger.info("Connexion to the Postgres service...")
@@ -21,6 +114,19 @@ class PostgresStorage:
         self.logger.info("Connecting to the Postgres service")
         return connection
 
+    # INDEXES
+
+    def ensure_indexes(self) -> None:
+        """Create the indexes declared in INDEXES. Existing indexes are left untouched."""
+        try:
+            for statement in INDEXES:
+                self.cursor.execute(statement)
+            self.connection.commit()
+            self.logger.debug(f"Indexes ensured: {len(INDEXES)}")
+        except Exception as exception:
+            self.connection.rollback()
+            self.logger.error(f"Index creation has failed: {exception}")
+
     # CRUD Metadata
 
     def select_metadata(self, id_metadata: int) -> dict | None:
@@ -61,9 +167,9 @@ class PostgresStorage:
 
     def select_metadata_title(self, title: str) -> dict | None:
         try:
-            self.logger.debug(f"Executing metadata query: title={title}")
+            self.logger.debug("Executing metadata query: title=%s", title)
             self.cursor.execute(
-                "SELECT * FROM metadata WHERE title=%s;",
+                "SELECT id_metadata FROM metadata WHERE title=%s;",
                 (title,),
             )
             result = self.cursor.fetchone()
@@ -77,9 +183,67 @@ class PostgresStorage:
             self.logger.error(f"Metadata selection has failed: {exception}")
             return None
 
+    def prefetch_metadata_titles(self, dataset_names: list[str] | None = None) -> int:
+        """Load title -> id_metadata in one query, so that lookup_metadata_title needs no round trip.
+        The map is a hint, updated by insert_into_metadata: a title inserted by another writer since the
+        prefetch is missing from it, so its insert hits the unique title and updates the existing row instead.
+
+        Args:
+            dataset_names (list[str] | None, optional): Datasets to load. Defaults to None (every dataset).
+
+        Returns:
+            int: Number of titles loaded.
+        """
+        try:
+            self.logger.debug(f"Executing metadata query: dataset_names={dataset_names}")
+            query = "SELECT title, id_metadata FROM metadata"
+            if dataset_names is None:
+                self.cursor.execute(f"{query};")
+            else:
+                self.cursor.execute(
+                    f"{query} WHERE dataset_name = ANY(%s);", (dataset_names,)
+                )
+            rows = self.cursor.fetchall()
+            self._title_ids = {row["title"]: row["id_metadata"] for row in rows}
+            self.logger.debug(f"Metadata titles prefetched: titles={len(rows)}")
+            return len(rows)
+        except Exception as exception:
+            self.connection.rollback()
+            self._title_ids = None
+            self.logger.error(f"Metadata titles prefetch has failed: {exception}")
+            return 0
+
+    def lookup_metadata_title(self, title: str) -> int | None:
+        """id_metadata of a title from the prefetched map, or from the database if no map is loaded.
+
+        Args:
+            title (str): Title of the recording.
+
+        Returns:
+            int | None: id_metadata or None if the title does not exist.
+        """
+        if self._title_ids is None:
+            return self.select_metadata_title(title=title)
+        return self._title_ids.get(title)
+
+    def _on_metadata_inserted(self, title: str, id_metadata: int) -> None:
+        """Record an inserted or concurrently inserted row in the prefetched map."""
+        if self._title_ids is not None:
+            self._title_ids[title] = id_metadata
+
     def insert_into_metadata(self, metadata: JAMSMetadata | XMLMetadata) -> dict | None:
+        """Insert the metadata of a recording. If another writer inserted its title concurrently,
+        the existing row is updated instead.
+
+        Args:
+            metadata (JAMSMetadata | XMLMetadata): Metadata of the recording.
+
+        Returns:
+            dict | None: Inserted or updated row, None if it has failed.
+        """
+        start = time.perf_counter()
         try:
-            self.logger.debug(f"Executing metadata query: title={metadata.title}")
+            self.logger.debug("Executing metadata query: title=%s", metadata.title)
             if isinstance(metadata, JAMSMetadata):
                 self.cursor.execute(
                     """
@@ -146,17 +310,43 @@ class PostgresStorage:
                 )
             self.connection.commit()
             result = self.cursor.fetchone()
+            self._on_metadata_inserted(
+                title=metadata.title, id_metadata=result["id_metadata"]
+            )
+            latency = time.perf_counter() - start
+            metrics.observe(name="postgres.insert_metadata", seconds=latency)
             self.logger.debug("Metadata inserted successfully")
             return result
+        except psycopg.errors.UniqueViolation as exception:
+            self.connection.rollback()
+            metrics.observe(
+                name="postgres.insert_metadata",
+                seconds=time.perf_counter() - start,
+                error=True,
+            )
+            # Another writer inserted the title since it was looked up: update its row instead
+            id_metadata = self.select_metadata_title(title=metadata.title)
+            if id_metadata is None:
+                self.logger.error(f"Metadata insertion has failed: {exception}")
+                return None
+            self.logger.debug(
+                "Metadata inserted by another writer, updating it: title=%s", metadata.title
+            )
+            self._on_metadata_inserted(title=metadata.title, id_metadata=id_metadata)
+            return self.update_metadata(id_metadata=id_metadata, metadata=metadata)
         except Exception as exception:
+            self.connection.rollback()
+            latency = time.perf_counter() - start
+            metrics.observe(name="postgres.insert_metadata", seconds=latency, error=True)
             self.logger.error(f"Metadata insertion has failed: {exception}")
             return None
 
     def update_metadata(
         self, id_metadata: int, metadata: JAMSMetadata | XMLMetadata
     ) -> dict | None:
+        start = time.perf_counter()
         try:
-            self.logger.debug(f"Executing metadata query: title={metadata.title}")
+            self.logger.debug("Executing metadata query: title=%s", metadata.title)
             if isinstance(metadata, JAMSMetadata):
                 self.cursor.execute(
                     """
@@ -226,9 +416,13 @@ class PostgresStorage:
                 )
             self.connection.commit()
             result = self.cursor.fetchone()
+            latency = time.perf_counter() - start
+            metrics.observe(name="postgres.update_metadata", seconds=latency)
             self.logger.debug("Metadata updated successfully")
             return result
         except Exception as exception:
+            latency = time.perf_counter() - start
+            metrics.observe(name="postgres.update_metadata", seconds=latency, error=True)
             self.logger.error(f"Metadata updating has failed: {exception}")
             return None
 
@@ -247,6 +441,422 @@ class PostgresStorage:
             self.logger.error(f"Metadata deleting has failed: {exception}")
             return None
 
+    def stream_metadata(
+        self,
+        columns: list[str] | None = None,
+        filters: dict | None = None,
+        itersize: int | None = None,
+        batch_format: str = "rows",
+    ) -> Iterator["list[dict] | dict[str, np.ndarray] | pa.RecordBatch"]:
+        """Stream the metadata table in batches with a server-side cursor, in constant memory.
+
+        Args:
+            columns (list[str] | None, optional): Columns to select. Defaults to None (every column).
+            filters (dict | None, optional): Filters {column: value}, a list value matching any of its items, e.g. {"dataset_name": "GuitarSet", "style": ["jazz", "rock"]}. Defaults to None.
+            itersize (int | None, optional): Number of rows fetched by round trip and yielded by batch. Defaults to postgres_config.itersize.
+            batch_format (str, optional): "rows" (list of dicts), "numpy" (dict of column arrays) or "arrow" (pyarrow.RecordBatch). Defaults to "rows".
+
+        Raises:
+            ValueError: If a column or the batch format is unknown.
+
+        Yields:
+            Iterator[list[dict] | dict[str, np.ndarray] | pa.RecordBatch]: Batches of rows ordered by id_metadata.
+        """
+        itersize = itersize or postgres_config.itersize
+        filters = filters or {}
+        unknown = (set(columns or []) | set(filters)) - set(METADATA_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown metadata columns: {sorted(unknown)}")
+        if batch_format not in ("rows", "numpy", "arrow"):
+            raise ValueError(f"Unknown batch format: {batch_format}")
+        if batch_format == "arrow" and pa is None:
+            raise RuntimeError("pyarrow is required by the 'arrow' batch format")
+
+        columns = columns or list(METADATA_COLUMNS)
+        where = sql.SQL("")
+        if filters:
+            where = sql.SQL(" WHERE ") + sql.SQL(" AND ").join(
+                sql.SQL("{}=ANY(%s)" if isinstance(value, (list, tuple)) else "{}=%s").format(
+                    sql.Identifier(column)
+                )
+                for column, value in filters.items()
+            )
+        query = sql.SQL("SELECT {} FROM metadata{} ORDER BY id_metadata;").format(
+            sql.SQL(", ").join(map(sql.Identifier, columns)), where
+        )
+        self.logger.debug(
+            f"Streaming metadata: columns={columns}, filters={filters}, itersize={itersize}"
+        )
+        with self.connection.transaction():
+            with self.connection.cursor(
+                name=f"stream_metadata_{next(self._cursor_ids)}"
+            ) as cursor:
+                cursor.itersize = itersize
+                cursor.execute(
+                    query,
+                    tuple(
+                        list(value) if isinstance(value, tuple) else value
+                        for value in filters.values()
+                    ),
+                )
+                while rows := cursor.fetchmany(itersize):
+                    if batch_format == "numpy":
+                        yield {
+                            column: self._numpy_column(
+                                [row[column] for row in rows],
+                                type_name=METADATA_COLUMNS[column],
+                                nullable=column != "id_metadata",
+                            )
+                            for column in columns
+                        }
+                    elif batch_format == "arrow":
+                        yield pa.RecordBatch.from_pylist(
+                            rows,
+                            schema=pa.schema(
+                                [
+                                    (column, pa.type_for_alias(METADATA_COLUMNS[column]))
+                                    for column in columns
+                                ]
+                            ),
+                        )
+                    else:
+                        yield rows
+
+    @staticmethod
+    def _numpy_column(values: list, type_name: str, nullable: bool = True) -> np.ndarray:
+        """Text columns become object arrays. Nullable numeric columns become float64 arrays with NaN,
+        so that every batch of a column has the same dtype."""
+        if type_name == "string":
+            return np.array(values, dtype=object)
+        if nullable:
+            return np.array(
+                [np.nan if value is None else value for value in values],
+                dtype=np.float64,
+            )
+        return np.array(values, dtype=type_name)
+
+    # CRUD Annotation statistics
+
+    def ensure_statistics_table(self) -> None:
+        """Create the annotation_statistics table declared in STATISTICS_TABLE if it does not exist."""
+        try:
+            for statement in STATISTICS_TABLE:
+                self.cursor.execute(statement)
+            self.connection.commit()
+        except Exception as exception:
+            self.connection.rollback()
+            self.logger.error(f"Statistics table creation has failed: {exception}")
+
+    def upsert_annotation_statistics(
+        self, id_metadata: int, statistics: AnnotationStatistics
+    ) -> dict | None:
+        start = time.perf_counter()
+        try:
+            self.logger.debug(
+                "Executing annotation statistics query: id_metadata=%s", id_metadata
+            )
+            columns = list(statistics.to_dict())
+            self.cursor.execute(
+                f"""
+                INSERT INTO annotation_statistics (id_metadata, {", ".join(columns)})
+                VALUES (%s, {", ".join(["%s"] * len(columns))})
+                ON CONFLICT (id_metadata) DO UPDATE SET
+                    {", ".join(f"{column}=EXCLUDED.{column}" for column in columns)}
+                RETURNING *;
+                """,
+                (id_metadata, *statistics.to_dict().values()),
+            )
+            self.connection.commit()
+            result = self.cursor.fetchone()
+            latency = time.perf_counter() - start
+            metrics.observe(
+                name="postgres.upsert_annotation_statistics", seconds=latency
+            )
+            self.logger.debug("Annotation statistics upserted successfully")
+            return result
+        except Exception as exception:
+            self.connection.rollback()
+            latency = time.perf_counter() - start
+            metrics.observe(
+                name="postgres.upsert_annotation_statistics", seconds=latency, error=True
+            )
+            self.logger.error(f"Annotation statistics upsert has failed: {exception}")
+            return None
+
+    def select_annotation_statistics(self, dataset_name: str) -> list[dict] | None:
+        try:
+            self.logger.debug(
+                f"Executing annotation statistics query: dataset_name={dataset_name}"
+            )
+            self.cursor.execute(
+                """
+                SELECT m.title, s.*
+                FROM annotation_statistics s
+                JOIN metadata m USING (id_metadata)
+                WHERE m.dataset_name=%s;
+                """,
+                (dataset_name,),
+            )
+            return self.cursor.fetchall()
+        except Exception as exception:
+            self.logger.error(f"Annotation statistics selection has failed: {exception}")
+            return None
+
+    def select_dataset_statistics(self, dataset_name: str) -> dict | None:
+        """Aggregate the annotation statistics of every recording of a dataset.
+
+        Args:
+            dataset_name (str): Name of the dataset.
+
+        Returns:
+            dict | None: Dataset-wide statistics, the pitch histogram being the sum of the recordings histograms.
+        """
+        try:
+            self.logger.debug(
+                f"Executing dataset statistics query: dataset_name={dataset_name}"
+            )
+            self.cursor.execute(
+                """
+                SELECT
+                    COUNT(*) AS n_recordings,
+                    SUM(s.n_notes) AS n_notes,
+                    SUM(s.n_beats) AS n_beats,
+                    SUM(s.n_chords) AS n_chords,
+                    MIN(s.pitch_min) AS pitch_min,
+                    MAX(s.pitch_max) AS pitch_max,
+                    SUM(s.n_notes * s.note_duration_mean) / NULLIF(SUM(s.n_notes), 0) AS note_duration_mean,
+                    AVG(s.note_density) AS note_density,
+                    MAX(s.distinct_chords) AS distinct_chords_max,
+                    AVG(s.ibi_mean) AS ibi_mean,
+                    MIN(s.ibi_min) AS ibi_min,
+                    MAX(s.ibi_max) AS ibi_max,
+                    (
+                        SELECT array_agg(total ORDER BY bin)
+                        FROM (
+                            SELECT bin, SUM(count) AS total
+                            FROM annotation_statistics s2
+                            JOIN metadata m2 USING (id_metadata),
+                            unnest(s2.pitch_histogram) WITH ORDINALITY AS h (count, bin)
+                            WHERE m2.dataset_name=%s
+                            GROUP BY bin
+                        ) bins
+                    ) AS pitch_histogram
+                FROM annotation_statistics s
+                JOIN metadata m USING (id_metadata)
+                WHERE m.dataset_name=%s;
+                """,
+                (dataset_name, dataset_name),
+            )
+            return self.cursor.fetchone()
+        except Exception as exception:
+            self.logger.error(f"Dataset statistics selection has failed: {exception}")
+            return None
+
+    # JOB QUEUE
+
+    def ensure_jobs_table(self) -> None:
+        """Create the ingestion_jobs table declared in JOBS_TABLE if it does not exist."""
+        try:
+            for statement in JOBS_TABLE:
+                self.cursor.execute(statement)
+            self.connection.commit()
+        except Exception as exception:
+            self.connection.rollback()
+            self.logger.error(f"Jobs table creation has failed: {exception}")
+            raise
+
+    def insert_jobs(self, pipeline: str, jobs: list[dict]) -> int:
+        """Insert jobs. Jobs already planned for the same file are left untouched.
+
+        Args:
+            pipeline (str): Name of the pipeline, e.g. "GuitarSet".
+            jobs (list[dict]): Jobs {"kind": "jams" | "xml" | "wav", "file_path": str, "dataset_number": int | None}.
+
+        Returns:
+            int: Number of jobs inserted.
+        """
+        try:
+            self.cursor.executemany(
+                """
+                INSERT INTO ingestion_jobs (pipeline, kind, file_path, dataset_number)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (pipeline, file_path) DO NOTHING;
+                """,
+                [
+                    (pipeline, job["kind"], job["file_path"], job.get("dataset_number"))
+                    for job in jobs
+                ],
+            )
+            nb_inserted = self.cursor.rowcount
+            self.connection.commit()
+            return nb_inserted
+        except Exception as exception:
+            self.connection.rollback()
+            self.logger.error(f"Jobs insertion has failed: {exception}")
+            return 0
+
+    def claim_jobs(
+        self, pipeline: str, worker_id: str, batch_size: int, lease_seconds: int
+    ) -> list[dict]:
+        """Claim pending jobs. Rows locked by other workers are skipped, so workers never wait for each other.
+
+        Args:
+            pipeline (str): Name of the pipeline.
+            worker_id (str): Identifier of the worker, e.g. "<host>:<pid>".
+            batch_size (int): Maximum number of jobs claimed.
+            lease_seconds (int): Duration of the claim. Jobs still claimed after it are re-queued.
+
+        Returns:
+            list[dict]: Jobs claimed.
+        """
+        try:
+            self.cursor.execute(
+                """
+                UPDATE ingestion_jobs
+                SET status='claimed', claimed_by=%s, attempts=attempts + 1,
+                    lease_expires_at=now() + make_interval(secs => %s), updated_at=now()
+                WHERE id_job IN (
+                    SELECT id_job FROM ingestion_jobs
+                    WHERE pipeline=%s AND status='pending'
+                    ORDER BY id_job
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING *;
+                """,
+                (worker_id, lease_seconds, pipeline, batch_size),
+            )
+            jobs = self.cursor.fetchall()
+            self.connection.commit()
+            return sorted(jobs, key=lambda job: job["id_job"])
+        except Exception as exception:
+            self.connection.rollback()
+            self.logger.error(f"Jobs claim has failed: {exception}")
+            return []
+
+    def renew_leases(
+        self, id_jobs: list[int], worker_id: str, lease_seconds: int
+    ) -> set[int] | None:
+        """Extend the lease of jobs still claimed by the worker, as a heartbeat of a batch being processed.
+
+        Args:
+            id_jobs (list[int]): Job identifiers.
+            worker_id (str): Identifier of the worker.
+            lease_seconds (int): Duration of the lease from now.
+
+        Returns:
+            set[int] | None: Identifiers of the jobs whose lease was extended, None if the renewal has failed.
+        """
+        try:
+            self.cursor.execute(
+                """
+                UPDATE ingestion_jobs
+                SET lease_expires_at=now() + make_interval(secs => %s), updated_at=now()
+                WHERE id_job = ANY(%s) AND claimed_by=%s AND status='claimed'
+                RETURNING id_job;
+                """,
+                (lease_seconds, id_jobs, worker_id),
+            )
+            renewed = {row["id_job"] for row in self.cursor.fetchall()}
+            self.connection.commit()
+            return renewed
+        except Exception as exception:
+            self.connection.rollback()
+            self.logger.error(f"Jobs lease renewal has failed: {exception}")
+            return None
+
+    def complete_job(self, id_job: int, worker_id: str, error: str | None = None) -> bool:
+        """Record the result of a job, if the worker still holds its claim.
+
+        Args:
+            id_job (int): Job identifier.
+            worker_id (str): Identifier of the worker.
+            error (str | None, optional): Error message, None if the job succeeded. Defaults to None.
+
+        Returns:
+            bool: False if the claim has been lost (lease expired and job re-queued).
+        """
+        try:
+            self.cursor.execute(
+                """
+                UPDATE ingestion_jobs
+                SET status=%s, error=%s, lease_expires_at=NULL, updated_at=now()
+                WHERE id_job=%s AND claimed_by=%s AND status='claimed';
+                """,
+                ("failed" if error else "done", error, id_job, worker_id),
+            )
+            completed = self.cursor.rowcount == 1
+            self.connection.commit()
+            return completed
+        except Exception as exception:
+            self.connection.rollback()
+            self.logger.error(f"Job completion has failed: {exception}")
+            return False
+
+    def requeue_stale_jobs(self, pipeline: str, max_attempts: int) -> dict:
+        """Re-queue the jobs whose lease has expired, or fail them after max_attempts claims.
+
+        Args:
+            pipeline (str): Name of the pipeline.
+            max_attempts (int): Maximum number of claims of a job.
+
+        Returns:
+            dict: {"requeued": int, "failed": int}
+        """
+        try:
+            self.cursor.execute(
+                """
+                UPDATE ingestion_jobs
+                SET status=CASE WHEN attempts < %s THEN 'pending' ELSE 'failed' END,
+                    error=CASE WHEN attempts < %s THEN error ELSE 'Lease expired' END,
+                    claimed_by=NULL, lease_expires_at=NULL, updated_at=now()
+                WHERE pipeline=%s AND status='claimed' AND lease_expires_at < now()
+                RETURNING status;
+                """,
+                (max_attempts, max_attempts, pipeline),
+            )
+            statuses = [row["status"] for row in self.cursor.fetchall()]
+            self.connection.commit()
+            result = {
+                "requeued": statuses.count("pending"),
+                "failed": statuses.count("failed"),
+            }
+            if statuses:
+                self.logger.warning(f"Stale jobs: {result}")
+            return result
+        except Exception as exception:
+            self.connection.rollback()
+            self.logger.error(f"Stale jobs re-queueing has failed: {exception}")
+            return {"requeued": 0, "failed": 0}
+
+    def select_jobs_progress(self, pipeline: str) -> list[dict]:
+        """Number of jobs by kind and status, with the age of the oldest update.
+
+        Args:
+            pipeline (str): Name of the pipeline.
+
+        Returns:
+            list[dict]: Rows {"kind": str, "status": str, "nb_jobs": int, "attempts": int, "last_update": datetime}.
+        """
+        try:
+            self.cursor.execute(
+                """
+                SELECT kind, status, COUNT(*) AS nb_jobs, SUM(attempts) AS attempts, MAX(updated_at) AS last_update
+                FROM ingestion_jobs
+                WHERE pipeline=%s
+                GROUP BY kind, status
+                ORDER BY kind, status;
+                """,
+                (pipeline,),
+            )
+            result = self.cursor.fetchall()
+            self.connection.commit()
+            return result
+        except Exception as exception:
+            self.connection.rollback()
+            self.logger.error(f"Jobs progress selection has failed: {exception}")
+            return []
+
     # UTILS
 
     def close(self) -> None:
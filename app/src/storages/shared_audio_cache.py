@@ -0,0 +1,287 @@
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Iterator
+
+import numpy as np
+from config import minio_config
+
+from src.utils import LOGGER_NAME
+
+AudioLoader = Callable[[], tuple[np.ndarray, int] | None]
+
+
+def _open_shared_memory(
+    name: str | None = None, create: bool = False, size: int = 0
+) -> shared_memory.SharedMemory:
+    """Open a shared memory block which is not unlinked when the process exits.
+    Blocks are unlinked by the cache on eviction, whichever process created them."""
+    try:
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+    except TypeError:  # Python < 3.13 has no 'track' parameter
+        shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def _process_alive(pid: int) -> bool:
+    """Whether a process of this host is alive. Always True on Windows, where os.kill would terminate it."""
+    if os.name == "nt":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Alive, owned by another user
+    return True
+
+
+@dataclass
+class SharedAudio:
+    """Decoded audio attached from a shared memory block, without copy. The array is read-only."""
+
+    key: str
+    audio_data: np.ndarray
+    sample_rate: int
+    _shm: shared_memory.SharedMemory
+
+    def close(self) -> None:
+        """Detach from the shared memory block. The array must not be used afterwards."""
+        self.audio_data = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # A view of the array is still alive, the block is detached when it is collected
+
+
+class SharedAudioCache:
+    """
+    Decoded-audio cache shared by processes, built on multiprocessing.shared_memory.
+
+    The process creating the cache is the coordinator: it owns a multiprocessing.Manager holding the entries
+    {key: shared memory name, shape, sample rate, reference count, last access}. The cache can be passed
+    to worker processes. The first process requesting a key decodes it once into a float32 block,
+    other processes wait for it then attach to the block by name with zero copies.
+    Blocks are reference counted; unreferenced blocks are evicted in LRU order beyond the byte budget.
+    A key being decoded records the pid of its loader and a deadline: if the loader dies or misses the deadline,
+    a waiting process reclaims the key and decodes it itself.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = minio_config.shared_audio_cache_max_bytes,
+        load_timeout: float = minio_config.shared_audio_cache_load_timeout,
+    ):
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.max_bytes = max_bytes
+        self.load_timeout = load_timeout
+        self._manager = multiprocessing.Manager()
+        self._entries = self._manager.dict()
+        self._statistics = self._manager.dict(
+            hits=0, misses=0, evictions=0, resident_bytes=0
+        )
+        self._condition = self._manager.Condition()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_manager"] = None  # Only the coordinator owns the manager
+        state["logger"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.logger = logging.getLogger(LOGGER_NAME)
+
+    def _attach(self, key: str, entry: dict) -> SharedAudio:
+        shm = _open_shared_memory(name=entry["shm_name"])
+        audio_data = np.ndarray(entry["shape"], dtype=np.float32, buffer=shm.buf)
+        audio_data.flags.writeable = False
+        return SharedAudio(
+            key=key, audio_data=audio_data, sample_rate=entry["sample_rate"], _shm=shm
+        )
+
+    def acquire(self, key: str, loader: AudioLoader) -> SharedAudio | None:
+        """Attach to the decoded audio of a key, decoding it with the loader on the first request.
+        Each acquire must be followed by a release.
+
+        Args:
+            key (str): Key of the audio, e.g. 'raw/GuitarSet/<title>/audio_mono-mic.wav'.
+            loader (AudioLoader): Return (audio_data, sample_rate) or None. Only called on a miss.
+
+        Returns:
+            SharedAudio | None: Attached audio or None if the loader returned None.
+        """
+        token = uuid.uuid4().hex
+        loading = {
+            "state": "loading",
+            "refcount": 1,
+            "token": token,
+            "pid": os.getpid(),
+            "deadline": time.monotonic() + self.load_timeout,
+        }
+        with self._condition:
+            while True:
+                entry = self._entries.get(key)
+                if entry is None:
+                    self._entries[key] = loading
+                    self._statistics["misses"] += 1
+                    break
+                if entry["state"] == "ready":
+                    entry["refcount"] += 1
+                    entry["last_access"] = time.monotonic()
+                    self._entries[key] = entry
+                    self._statistics["hits"] += 1
+                    return self._attach(key, entry)
+                if not _process_alive(entry["pid"]) or time.monotonic() > entry["deadline"]:
+                    self.logger.warning(
+                        f"Shared audio loader lost, reclaiming: key={key}, pid={entry['pid']}"
+                    )
+                    self._entries[key] = loading
+                    self._statistics["misses"] += 1
+                    break
+                self._condition.wait(timeout=1.0)  # Another process is decoding the key
+
+        try:
+            result = loader()
+        except Exception:
+            result = None
+            self.logger.exception(f"Shared audio loading has failed: key={key}")
+        if result is None:
+            with self._condition:
+                entry = self._entries.get(key)
+                if entry is not None and entry.get("token") == token:
+                    del self._entries[key]
+                self._condition.notify_all()
+            return None
+
+        audio_data, sample_rate = result
+        audio_data = np.asarray(audio_data, dtype=np.float32)
+        shm = _open_shared_memory(create=True, size=max(audio_data.nbytes, 1))
+        shared = np.ndarray(audio_data.shape, dtype=np.float32, buffer=shm.buf)
+        shared[...] = audio_data
+        del shared
+        shm.close()
+
+        entry = {
+            "state": "ready",
+            "refcount": 1,
+            "shm_name": shm.name,
+            "shape": audio_data.shape,
+            "sample_rate": sample_rate,
+            "nbytes": audio_data.nbytes,
+            "last_access": time.monotonic(),
+        }
+        with self._condition:
+            current = self._entries.get(key)
+            if current is not None and current["state"] == "ready":
+                # The key was reclaimed from this process and decoded by another one first
+                self._unlink(shm.name)
+                current["refcount"] += 1
+                current["last_access"] = time.monotonic()
+                self._entries[key] = current
+                self._condition.notify_all()
+                return self._attach(key, current)
+            self._entries[key] = entry
+            self._statistics["resident_bytes"] += audio_data.nbytes
+            self._evict()
+            self._condition.notify_all()
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "Shared audio decoded: key=%s, shape=%s, bytes=%d",
+                key,
+                audio_data.shape,
+                audio_data.nbytes,
+            )
+        return self._attach(key, entry)
+
+    def release(self, audio: SharedAudio) -> None:
+        """Detach from an audio and drop its reference.
+
+        Args:
+            audio (SharedAudio): Audio returned by acquire.
+        """
+        audio.close()
+        with self._condition:
+            entry = self._entries.get(audio.key)
+            if entry is not None:
+                entry["refcount"] = max(entry["refcount"] - 1, 0)
+                self._entries[audio.key] = entry
+                self._evict()
+
+    @contextmanager
+    def audio(
+        self, key: str, loader: AudioLoader
+    ) -> Iterator[tuple[np.ndarray, int] | None]:
+        """Context in which the decoded audio of a key is attached.
+
+        Args:
+            key (str): Key of the audio.
+            loader (AudioLoader): Return (audio_data, sample_rate) or None. Only called on a miss.
+
+        Yields:
+            Iterator[tuple[np.ndarray, int] | None]: Read-only float32 audio_data and sample_rate, or None.
+        """
+        audio = self.acquire(key=key, loader=loader)
+        try:
+            yield None if audio is None else (audio.audio_data, audio.sample_rate)
+        finally:
+            if audio is not None:
+                self.release(audio)
+
+    def _evict(self) -> None:
+        """Unlink unreferenced blocks in LRU order until the cache fits in its budget. The condition must be held."""
+        if self._statistics["resident_bytes"] <= self.max_bytes:
+            return
+        candidates = sorted(
+            (
+                (entry["last_access"], key, entry)
+                for key, entry in self._entries.items()
+                if entry["state"] == "ready" and entry["refcount"] == 0
+            ),
+            key=lambda candidate: candidate[0],
+        )
+        for _, key, entry in candidates:
+            if self._statistics["resident_bytes"] <= self.max_bytes:
+                break
+            self._unlink(entry["shm_name"])
+            del self._entries[key]
+            self._statistics["resident_bytes"] -= entry["nbytes"]
+            self._statistics["evictions"] += 1
+
+    def _unlink(self, shm_name: str) -> None:
+        try:
+            # Tracked on purpose: unlink() untracks the block.
+            shm = shared_memory.SharedMemory(name=shm_name)
+        except FileNotFoundError:
+            return
+        shm.close()
+        shm.unlink()
+
+    def statistics(self) -> dict:
+        """Hits, misses, evictions, hit rate and resident bytes of the cache.
+
+        Returns:
+            dict: {"hits": int, "misses": int, "evictions": int, "hit_rate": float, "resident_bytes": int, "entries": int}
+        """
+        statistics = dict(self._statistics)
+        requests = statistics["hits"] + statistics["misses"]
+        statistics["hit_rate"] = statistics["hits"] / requests if requests else 0.0
+        statistics["entries"] = len(self._entries)
+        return statistics
+
+    def close(self) -> None:
+        """Unlink every block and stop the manager. Only the coordinator can close the cache."""
+        if self._manager is None:
+            return
+        for entry in self._entries.values():
+            if entry["state"] == "ready":
+                self._unlink(entry["shm_name"])
+        self.logger.info(f"Shared audio cache closed: {self.statistics()}")
+        self._manager.shutdown()
+        self._manager = None
@@ -1,8 +1,20 @@
+from .adaptive_concurrency import AIMDController
+from .byte_budget import ByteBudget, estimate_decoded_bytes
 from .dataset_downloader import download_and_extract_dataset
-from .logger import LOGGER_NAME, initialize_logger
+from .file_scanner import Shard, scan_files
+from .logger import LOGGER_NAME, initialize_logger, shutdown_logger
+from .work_scheduler import Schedule, probe_audio_cost
 
 __all__ = [
+    "AIMDController",
+    "ByteBudget",
     "download_and_extract_dataset",
+    "estimate_decoded_bytes",
     "initialize_logger",
     "LOGGER_NAME",
+    "probe_audio_cost",
+    "Schedule",
+    "scan_files",
+    "Shard",
+    "shutdown_logger",
 ]
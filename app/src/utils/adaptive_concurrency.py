@@ -0,0 +1,195 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from config import adaptive_concurrency_config
+
+from src.utils.logger import LOGGER_NAME
+
+
+class AIMDController:
+    """
+    Additive-increase / multiplicative-decrease controller of a concurrency limit.
+
+    Requests are observed with their latency, their units of work (bytes, operations...) and their outcome.
+    Every 'window' requests, a decision is taken on the throughput and the mean latency of the window.
+    Throughput is measured in units per second of wall time, or per second spent in requests if 'wall_clock'
+    is False (for a limit read as a batch size by a single writer). Latency is the mean latency of a unit,
+    as the latency of a request grows with its size (a batch, or the bytes of an upload):
+    - errors, or a latency above 'latency_spike_factor' times the reference latency: limit x decrease_factor;
+    - throughput improved by more than 'throughput_tolerance', or 'probe_after' holds in a row: limit + step;
+    - otherwise: hold.
+    The reference latency is the best latency seen, reset to the latency of a spike after its decrease:
+    a lasting change of the request mix (e.g. small JAMS, then large WAV uploads) costs at most one decrease.
+    The limit is used either through slot(), which admits at most 'limit' concurrent requests,
+    or read by the caller as a size (e.g. a batch size). Controllers are thread-safe.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 64,
+        step: int = 1,
+        wall_clock: bool = True,
+        enabled: bool = adaptive_concurrency_config.enabled,
+    ):
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.name = name
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.step = step
+        self.wall_clock = wall_clock
+        self.enabled = enabled
+        self._limit = min(max(initial, self.minimum), self.maximum)
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._window_start = time.perf_counter()
+        self._window: list[tuple[float, int, bool]] = []
+        self._previous_throughput: float | None = None
+        self._best_latency: float | None = None
+        self._holds = 0
+        self.decisions: list[dict] = []
+        self._totals = {"requests": 0, "units": 0, "errors": 0, "latency": 0.0}
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @contextmanager
+    def slot(self) -> Iterator[dict]:
+        """Context of a request, entered once fewer than 'limit' requests are in flight.
+        The caller may set "units" and "error" in the yielded dictionary; exceptions count as errors.
+
+        Yields:
+            Iterator[dict]: {"units": 1, "error": False}
+        """
+        with self._condition:
+            while self.enabled and self._in_flight >= self._limit:
+                self._condition.wait()
+            self._in_flight += 1
+        request = {"units": 1, "error": False}
+        start = time.perf_counter()
+        try:
+            yield request
+        except Exception:
+            request["error"] = True
+            raise
+        finally:
+            latency = time.perf_counter() - start
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify()
+            self.observe(latency=latency, units=request["units"], error=request["error"])
+
+    def observe(self, latency: float, units: int = 1, error: bool = False) -> None:
+        """Record a request, then take a decision if the window is full.
+
+        Args:
+            latency (float): Latency of the request in seconds.
+            units (int, optional): Units of work of the request. Defaults to 1.
+            error (bool, optional): Whether the request has failed. Defaults to False.
+        """
+        with self._condition:
+            self._window.append((latency, units, error))
+            self._totals["requests"] += 1
+            self._totals["units"] += units
+            self._totals["errors"] += int(error)
+            self._totals["latency"] += latency
+            if len(self._window) >= adaptive_concurrency_config.window:
+                self._decide()
+                self._condition.notify_all()
+
+    def _decide(self) -> None:
+        """Update the limit from the current window. The condition must be held."""
+        now = time.perf_counter()
+        nb_errors = sum(error for _, _, error in self._window)
+        busy = sum(latency for latency, _, _ in self._window)
+        nb_units = sum(units for _, units, _ in self._window)
+        mean_latency = busy / len(self._window)
+        latency = busy / max(nb_units, 1)
+        elapsed = max(now - self._window_start if self.wall_clock else busy, 1e-9)
+        throughput = nb_units / elapsed
+        self._window = []
+        self._window_start = now
+
+        previous_limit = self._limit
+        if nb_errors:
+            action = "decrease:errors"
+        elif (
+            self._best_latency is not None
+            and latency
+            > adaptive_concurrency_config.latency_spike_factor * self._best_latency
+        ):
+            action = "decrease:latency"
+        elif (
+            self._previous_throughput is None
+            or throughput
+            > self._previous_throughput
+            * (1 + adaptive_concurrency_config.throughput_tolerance)
+            or self._holds >= adaptive_concurrency_config.probe_after
+        ):
+            action = "increase"
+        else:
+            action = "hold"
+        self._holds = self._holds + 1 if action == "hold" else 0
+
+        if action.startswith("decrease"):
+            self._limit = max(
+                self.minimum,
+                int(self._limit * adaptive_concurrency_config.decrease_factor),
+            )
+        elif action == "increase":
+            self._limit = min(self.maximum, self._limit + self.step)
+        if not self.enabled:
+            self._limit = previous_limit
+
+        if action == "decrease:latency":
+            self._best_latency = latency
+        elif not nb_errors:
+            self._best_latency = (
+                latency
+                if self._best_latency is None
+                else min(self._best_latency, latency)
+            )
+        self._previous_throughput = throughput
+
+        decision = {
+            "controller": self.name,
+            "action": action,
+            "limit_before": previous_limit,
+            "limit": self._limit,
+            "throughput": round(throughput, 3),
+            "mean_latency_ms": round(mean_latency * 1000, 3),
+            "errors": nb_errors,
+        }
+        self.decisions.append(decision)
+        self.logger.debug("AIMD decision: %s", decision)
+
+    def summary(self) -> dict:
+        """Totals of the requests observed and decisions taken by the controller.
+
+        Returns:
+            dict: {"controller", "limit", "requests", "units", "errors", "mean_latency_ms", "increases", "decreases", "holds"}
+        """
+        with self._condition:
+            requests = self._totals["requests"]
+            actions = [decision["action"] for decision in self.decisions]
+            return {
+                "controller": self.name,
+                "limit": self._limit,
+                "requests": requests,
+                "units": self._totals["units"],
+                "errors": self._totals["errors"],
+                "mean_latency_ms": (
+                    round(self._totals["latency"] / requests * 1000, 3)
+                    if requests
+                    else None
+                ),
+                "increases": actions.count("increase"),
+                "decreases": sum(action.startswith("decrease") for action in actions),
+                "holds": actions.count("hold"),
+            }
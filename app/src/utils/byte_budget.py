@@ -0,0 +1,78 @@
+import threading
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+
+def estimate_decoded_bytes(path: Path, dtype: str = "float64") -> int:
+    """Estimate the size of a decoded audio file from its header: frames x channels x dtype size.
+
+    Args:
+        path (Path): Path of the audio file.
+        dtype (str, optional): Dtype of the decoded samples. Defaults to "float64", the default of sf.read.
+
+    Returns:
+        int: Estimated size in bytes. Files whose header is unreadable are estimated from their size.
+    """
+    try:
+        info = sf.info(path)
+        return info.frames * info.channels * np.dtype(dtype).itemsize
+    except Exception:
+        return path.stat().st_size * np.dtype(dtype).itemsize // 2  # Assume 16-bit PCM
+
+
+class ByteBudget:
+    """
+    Semaphore counting bytes instead of tasks: a task is admitted once its bytes fit in the budget,
+    and releases them when it is done, possibly from another thread.
+    A task larger than the whole budget is admitted alone, so it cannot wait forever.
+    """
+
+    def __init__(self, max_bytes: int | None):
+        self.max_bytes = max_bytes
+        self.in_flight_bytes = 0
+        self.peak_bytes = 0
+        self.nb_waits = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, nb_bytes: int) -> None:
+        """Block until 'nb_bytes' fit in the budget, then reserve them.
+
+        Args:
+            nb_bytes (int): Number of bytes to reserve.
+        """
+        with self._condition:
+            if self.max_bytes and self._exceeds(nb_bytes):
+                self.nb_waits += 1
+                self._condition.wait_for(lambda: not self._exceeds(nb_bytes))
+            self.in_flight_bytes += nb_bytes
+            self.peak_bytes = max(self.peak_bytes, self.in_flight_bytes)
+
+    def _exceeds(self, nb_bytes: int) -> bool:
+        return (
+            self.in_flight_bytes > 0
+            and self.in_flight_bytes + nb_bytes > self.max_bytes
+        )
+
+    def release(self, nb_bytes: int) -> None:
+        """Give back bytes reserved by acquire.
+
+        Args:
+            nb_bytes (int): Number of bytes to release.
+        """
+        with self._condition:
+            self.in_flight_bytes = max(self.in_flight_bytes - nb_bytes, 0)
+            self._condition.notify_all()
+
+    def summary(self) -> dict:
+        """Budget, peak of reserved bytes and number of admissions which had to wait.
+
+        Returns:
+            dict: {"max_mb": float | None, "peak_mb": float, "waits": int}
+        """
+        return {
+            "max_mb": round(self.max_bytes / 2**20, 1) if self.max_bytes else None,
+            "peak_mb": round(self.peak_bytes / 2**20, 1),
+            "waits": self.nb_waits,
+        }
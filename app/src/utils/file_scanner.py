@@ -0,0 +1,85 @@
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator
+
+
+@dataclass(frozen=True)
+class Shard:
+    """Static shard i of N. Files are assigned by a stable hash of their key (the title of the recording),
+    so every file of a recording lands on the same shard and N invocations cover the dataset exactly once."""
+
+    index: int
+    count: int
+
+    def __post_init__(self):
+        if self.count < 1 or not 0 <= self.index < self.count:
+            raise ValueError(f"Invalid shard: shard={self.index}/{self.count}")
+
+    @classmethod
+    def parse(cls, value: str) -> "Shard":
+        """Parse a shard given as 'i/N', with 0 <= i < N.
+
+        Args:
+            value (str): Shard, e.g. "0/4".
+
+        Raises:
+            ValueError: If the shard is malformed.
+
+        Returns:
+            Shard: The shard.
+        """
+        try:
+            index, count = (int(part) for part in value.split("/"))
+        except ValueError as exception:
+            raise ValueError(f"Shard must be 'i/N': shard={value}") from exception
+        return cls(index=index, count=count)
+
+    def owns(self, key: str) -> bool:
+        """Whether a key belongs to the shard. The hash does not depend on the process, unlike hash()."""
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big") % self.count == self.index
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+
+def scan_files(
+    directory: Path,
+    suffix: str,
+    limit: int | None = None,
+    shard: Shard | None = None,
+    key: Callable[[Path], str] = lambda path: path.stem,
+) -> Iterator[Path]:
+    """Iterate over the files of a directory sorted by name, without statting them.
+    Iteration stops as soon as 'limit' files have been yielded.
+
+    Args:
+        directory (Path): Path of the directory.
+        suffix (str): Suffix of the files, e.g. ".wav".
+        limit (int | None, optional): Maximum number of files yielded. Defaults to None.
+        shard (Shard | None, optional): Only yield the files of the shard. Defaults to None.
+        key (Callable[[Path], str], optional): Sharding key of a file. Defaults to its stem.
+
+    Raises:
+        FileNotFoundError: If the directory does not exist.
+
+    Yields:
+        Iterator[Path]: Paths of the files.
+    """
+    if not directory.exists():
+        raise FileNotFoundError(f"Directory does not exist: path={directory}")
+
+    with os.scandir(directory) as entries:
+        names = sorted(entry.name for entry in entries if entry.name.endswith(suffix))
+
+    nb_files = 0
+    for name in names:
+        if limit is not None and nb_files >= limit:
+            return
+        path = directory / name
+        if shard is not None and not shard.owns(key(path)):
+            continue
+        nb_files += 1
+        yield path
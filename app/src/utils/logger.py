@@ -1,26 +1,123 @@
+import atexit
+import json
 import logging
 import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
+from config import logging_config
+
 LOGGER_DIR_PATH = Path("./app/logs")  # /app/logs in container
 LOGGER_NAME = os.getenv("LOGGER_NAME", "app")
 
+# Listener of the process, writing the records queued by the application threads, and its rate limit
+_listener: QueueListener | None = None
+_rate_limit: tuple[logging.Logger, "RateLimitFilter"] | None = None
+# Attributes of every record, the others come from the 'extra' argument of the logging calls
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """Format a record as a JSON object on one line, with the fields given as 'extra' to the logging call."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S")
+            + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+            "process": record.process,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        line.update(
+            (key, value)
+            for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES
+        )
+        if record.exc_info:
+            line["exception"] = self.formatException(record.exc_info)
+        return json.dumps(line, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Keep at most 'burst' records by call site and period of 'period' seconds, at or above 'level'.
+    ERROR and CRITICAL records are never suppressed, each of them names a failed file.
+    The first record kept after a period with suppressed records tells how many were suppressed.
+    """
+
+    def __init__(self, burst: int, period: float, level: int = logging.WARNING):
+        super().__init__()
+        self.burst = burst
+        self.period = period
+        self.level = level
+        self._lock = threading.Lock()
+        # (pathname, lineno) -> [start of the period, records kept, records suppressed]
+        self._sites: dict[tuple[str, int], list] = {}
+        self.nb_suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self.burst or not self.level <= record.levelno < logging.ERROR:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            site = self._sites.setdefault(
+                (record.pathname, record.lineno), [now, 0, 0]
+            )
+            if now - site[0] >= self.period:
+                suppressed = site[2]
+                site[:] = [now, 0, 0]
+                if suppressed:
+                    record.msg = f"{record.getMessage()} [{suppressed} similar messages suppressed]"
+                    record.args = None
+            if site[1] >= self.burst:
+                site[2] += 1
+                self.nb_suppressed += 1
+                return False
+            site[1] += 1
+            return True
+
+
+class _LazyQueueHandler(QueueHandler):
+    """Queue handler leaving the formatting of records to the listener thread.
+    Arguments of the logging calls are formatted later, so they must not be mutated after the call."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
 
 def set_up_logger(
-    name: str, logger_file_path: Path = None, level=logging.DEBUG
+    name: str,
+    logger_file_path: Path = None,
+    level=logging.DEBUG,
+    json_lines: bool = logging_config.json_lines,
 ) -> logging.Logger:
-    """Set up a logger.
+    """Set up a logger whose handlers run in a listener thread: logging calls only put records in a queue,
+    so formatting and file I/O happen outside the calling threads. Repetitive records are rate-limited
+    before being queued.
 
     Args:
         name (str): Name of the logger.
-        log_path (Path, optional): Path of the logger file. Defaults to None.
-        level (_type_, optional): Level of the logger. Defaults to logging.INFO.
+        logger_file_path (Path, optional): Path of the logger file. Defaults to None.
+        level (_type_, optional): Level of the logger file. Defaults to logging.DEBUG.
+        json_lines (bool, optional): Write the logger file as JSON lines. Defaults to LOG_JSON_LINES.
 
     Returns:
         logging.Logger: A configured logger.
     """
+    global _listener, _rate_limit
+    shutdown_logger()
+
     logger = logging.getLogger(name)
     logger.setLevel(level)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
 
     formatter = logging.Formatter(
         "{asctime} - {levelname} - {module} - {funcName} - {message}",
@@ -31,7 +128,7 @@ def set_up_logger(
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers: list[logging.Handler] = [console_handler]
 
     if logger_file_path:
         file_handler = logging.FileHandler(
@@ -39,17 +136,61 @@ def set_up_logger(
             mode="wt",
             encoding="utf-8",
         )
-        file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        file_handler.setLevel(level)
+        file_handler.setFormatter(JSONLinesFormatter() if json_lines else formatter)
+        handlers.append(file_handler)
+    else:
+        logger.setLevel(max(level, logging.INFO))  # Skip records nobody would write
 
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    rate_limit_filter = RateLimitFilter(
+        burst=logging_config.rate_limit_burst,
+        period=logging_config.rate_limit_period,
+        level=logging.getLevelName(logging_config.rate_limit_level),
+    )
+    queue_handler = _LazyQueueHandler(records)
+    queue_handler.addFilter(rate_limit_filter)
+    logger.addHandler(queue_handler)
+    _rate_limit = (logger, rate_limit_filter)
+
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
     return logger
 
 
-def initialize_logger() -> bool:
+def shutdown_logger() -> None:
+    """Write the records still queued and stop the listener thread.
+    Spawned processes must call it before exiting, as they do not run atexit handlers."""
+    global _listener, _rate_limit
+    if _listener is None:
+        return
+    logger, rate_limit_filter = _rate_limit
+    if rate_limit_filter.nb_suppressed:
+        logger.info(
+            f"Log records suppressed by rate limiting: {rate_limit_filter.nb_suppressed}"
+        )
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _rate_limit = None
+
+
+atexit.register(shutdown_logger)
+
+
+def initialize_logger(suffix: str = "") -> bool:
+    """Set up the application logger.
+
+    Args:
+        suffix (str, optional): Suffix of the logger file name, e.g. "_worker1" for worker processes. Defaults to "".
+    """
     if not LOGGER_DIR_PATH.exists():
         LOGGER_DIR_PATH.mkdir(parents=True, exist_ok=True)
 
+    extension = "jsonl" if logging_config.json_lines else "log"
     set_up_logger(
-        name=LOGGER_NAME, logger_file_path=LOGGER_DIR_PATH / f"{LOGGER_NAME}.log"
+        name=LOGGER_NAME,
+        logger_file_path=LOGGER_DIR_PATH / f"{LOGGER_NAME}{suffix}.{extension}",
+        level=logging.getLevelName(logging_config.file_level),
     )
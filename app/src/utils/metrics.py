@@ -0,0 +1,372 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from config import metrics_config
+
+from src.utils.tracing import tracer
+
+# Upper bounds of the latency histogram buckets in seconds, by factors of sqrt(2): 0.1 ms to ~105 s, then +Inf.
+# Buckets are fixed so that histograms of several processes can be merged.
+LATENCY_BUCKETS: list[float] = [0.0001 * 2 ** (i / 2) for i in range(41)]
+
+
+def _new_metric() -> dict:
+    return {
+        "count": 0,
+        "errors": 0,
+        "seconds": 0.0,
+        "min_seconds": None,
+        "max_seconds": None,
+        "bytes_read": 0,
+        "bytes_written": 0,
+        "buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+    }
+
+
+def percentile(metric: dict, q: float) -> float | None:
+    """Estimate a latency percentile of a metric from its histogram, interpolating within the bucket.
+
+    Args:
+        metric (dict): Metric of a snapshot.
+        q (float): Percentile between 0 and 1, e.g. 0.95.
+
+    Returns:
+        float | None: Latency in seconds, None if the metric has no observation.
+    """
+    if not metric["count"]:
+        return None
+    rank = q * metric["count"]
+    cumulated = 0
+    for index, count in enumerate(metric["buckets"]):
+        if count and cumulated + count >= rank:
+            lower = LATENCY_BUCKETS[index - 1] if index else 0.0
+            upper = (
+                LATENCY_BUCKETS[index]
+                if index < len(LATENCY_BUCKETS)
+                else metric["max_seconds"]
+            )
+            lower = max(lower, metric["min_seconds"])
+            upper = min(upper, metric["max_seconds"])
+            return lower + (upper - lower) * (rank - cumulated) / count
+        cumulated += count
+    return metric["max_seconds"]
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of the timings of the pipeline stages and storage calls of a process.
+
+    Each metric, named '<component>.<operation>' (e.g. 'minio.put_object'), records the number of calls,
+    errors, wall time, bytes read and written, and a latency histogram. A snapshot is a plain dictionary:
+    snapshots of worker processes are merged by merge_snapshots, so reports cover every process.
+    Calls observed while tracing is enabled are also recorded as spans by the tracer.
+    """
+
+    def __init__(self, enabled: bool = metrics_config.enabled):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._metrics: dict[str, dict] = {}
+        self._start = time.time()
+
+    def observe(
+        self,
+        name: str,
+        seconds: float,
+        bytes_read: int = 0,
+        bytes_written: int = 0,
+        error: bool = False,
+    ) -> None:
+        """Record a call.
+
+        Args:
+            name (str): Name of the metric, e.g. "postgres.insert_metadata".
+            seconds (float): Wall time of the call.
+            bytes_read (int, optional): Bytes read by the call. Defaults to 0.
+            bytes_written (int, optional): Bytes written by the call. Defaults to 0.
+            error (bool, optional): Whether the call has failed. Defaults to False.
+        """
+        if tracer.enabled:
+            tracer.record(
+                name=name,
+                start=time.perf_counter() - seconds,
+                seconds=seconds,
+                bytes_read=bytes_read,
+                bytes_written=bytes_written,
+                error=error,
+            )
+        if not self.enabled:
+            return
+        index = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = _new_metric()
+            metric["count"] += 1
+            metric["errors"] += int(error)
+            metric["seconds"] += seconds
+            metric["min_seconds"] = (
+                seconds
+                if metric["min_seconds"] is None
+                else min(metric["min_seconds"], seconds)
+            )
+            metric["max_seconds"] = (
+                seconds
+                if metric["max_seconds"] is None
+                else max(metric["max_seconds"], seconds)
+            )
+            metric["bytes_read"] += bytes_read
+            metric["bytes_written"] += bytes_written
+            metric["buckets"][index] += 1
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[dict]:
+        """Context recording its wall time under a metric. The caller may set "bytes_read",
+        "bytes_written" and "error" in the yielded dictionary; exceptions count as errors.
+
+        Args:
+            name (str): Name of the metric.
+
+        Yields:
+            Iterator[dict]: {"bytes_read": 0, "bytes_written": 0, "error": False}
+        """
+        call = {"bytes_read": 0, "bytes_written": 0, "error": False}
+        start = time.perf_counter()
+        try:
+            yield call
+        except Exception:
+            call["error"] = True
+            raise
+        finally:
+            self.observe(name=name, seconds=time.perf_counter() - start, **call)
+
+    def snapshot(self) -> dict:
+        """Copy of the metrics of the process.
+
+        Returns:
+            dict: {"start": float, "end": float, "metrics": {name: metric}}
+        """
+        with self._lock:
+            return {
+                "start": self._start,
+                "end": time.time(),
+                "metrics": {
+                    name: {**metric, "buckets": list(metric["buckets"])}
+                    for name, metric in self._metrics.items()
+                },
+            }
+
+    def reset(self) -> None:
+        """Drop every metric and restart the wall clock."""
+        with self._lock:
+            self._metrics = {}
+            self._start = time.time()
+
+
+def merge_snapshots(snapshots: list[dict]) -> dict:
+    """Merge snapshots of several processes: counts, times, bytes and histograms are summed.
+
+    Args:
+        snapshots (list[dict]): Snapshots returned by MetricsRegistry.snapshot.
+
+    Returns:
+        dict: Merged snapshot, spanning from the first start to the last end.
+    """
+    merged = {
+        "start": min((s["start"] for s in snapshots), default=time.time()),
+        "end": max((s["end"] for s in snapshots), default=time.time()),
+        "metrics": {},
+    }
+    for snapshot in snapshots:
+        for name, metric in snapshot["metrics"].items():
+            target = merged["metrics"].setdefault(name, _new_metric())
+            for key in ("count", "errors", "seconds", "bytes_read", "bytes_written"):
+                target[key] += metric[key]
+            for key, pick in (("min_seconds", min), ("max_seconds", max)):
+                values = [v for v in (target[key], metric[key]) if v is not None]
+                target[key] = pick(values) if values else None
+            target["buckets"] = [a + b for a, b in zip(target["buckets"], metric["buckets"])]
+    return merged
+
+
+def report(snapshot: dict) -> dict:
+    """Derive rates and percentiles from a snapshot.
+
+    Args:
+        snapshot (dict): Snapshot, possibly merged.
+
+    Returns:
+        dict: {"wall_seconds": float, "metrics": {name: {"count", "errors", "seconds", "calls_per_second",
+            "mb_read", "mb_written", "mb_per_second", "p50_ms", "p95_ms", "p99_ms", "max_ms"}}}
+    """
+    wall_seconds = max(snapshot["end"] - snapshot["start"], 1e-9)
+
+    def ms(value: float | None) -> float | None:
+        return None if value is None else round(value * 1000, 3)
+
+    metrics = {}
+    for name, metric in sorted(snapshot["metrics"].items()):
+        nb_bytes = metric["bytes_read"] + metric["bytes_written"]
+        metrics[name] = {
+            "count": metric["count"],
+            "errors": metric["errors"],
+            "seconds": round(metric["seconds"], 3),
+            "calls_per_second": round(metric["count"] / wall_seconds, 3),
+            "mb_read": round(metric["bytes_read"] / 2**20, 3),
+            "mb_written": round(metric["bytes_written"] / 2**20, 3),
+            "mb_per_second": (
+                round(nb_bytes / 2**20 / metric["seconds"], 3)
+                if nb_bytes and metric["seconds"]
+                else None
+            ),
+            "p50_ms": ms(percentile(metric, 0.50)),
+            "p95_ms": ms(percentile(metric, 0.95)),
+            "p99_ms": ms(percentile(metric, 0.99)),
+            "max_ms": ms(metric["max_seconds"]),
+        }
+    return {"wall_seconds": round(wall_seconds, 3), "metrics": metrics}
+
+
+def summary_table(snapshot: dict) -> str:
+    """Format a snapshot as a text table, one row by metric."""
+    columns = [
+        ("metric", "{}"),
+        ("count", "{}"),
+        ("errors", "{}"),
+        ("seconds", "{:.3f}"),
+        ("calls_per_second", "{:.2f}"),
+        ("mb_per_second", "{:.2f}"),
+        ("p50_ms", "{:.2f}"),
+        ("p95_ms", "{:.2f}"),
+        ("p99_ms", "{:.2f}"),
+    ]
+    result = report(snapshot)
+    rows = [[name for name, _ in columns]]
+    for name, metric in result["metrics"].items():
+        values = {"metric": name, **metric}
+        rows.append(
+            [
+                "-" if values[column] is None else fmt.format(values[column])
+                for column, fmt in columns
+            ]
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    lines = [
+        "  ".join(cell.ljust(width) for cell, width in zip(row, widths))
+        for row in rows
+    ]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    lines.append(f"wall_seconds={result['wall_seconds']}")
+    return "\n".join(lines)
+
+
+def write_json_report(snapshot: dict, path: Path) -> Path:
+    """Write the report and the raw snapshot of a run as JSON.
+
+    Args:
+        snapshot (dict): Snapshot, possibly merged.
+        path (Path): Path of the JSON file.
+
+    Returns:
+        Path: Path of the JSON file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps({**report(snapshot), "snapshot": snapshot}, indent=2),
+        encoding="utf-8",
+    )
+    return path
+
+
+def prometheus_text(snapshot: dict, labels: dict[str, str] | None = None) -> str:
+    """Format a snapshot in the Prometheus text exposition format.
+
+    Args:
+        snapshot (dict): Snapshot.
+        labels (dict[str, str] | None, optional): Labels added to every sample, e.g. {"pipeline": "GuitarSet"}.
+
+    Returns:
+        str: Prometheus text.
+    """
+
+    def format_labels(**extra: str) -> str:
+        items = {**(labels or {}), **extra}
+        return "{" + ",".join(f'{k}="{v}"' for k, v in items.items()) + "}"
+
+    lines = [
+        "# TYPE pipeline_call_seconds histogram",
+        "# TYPE pipeline_call_errors_total counter",
+        "# TYPE pipeline_bytes_read_total counter",
+        "# TYPE pipeline_bytes_written_total counter",
+    ]
+    for name, metric in sorted(snapshot["metrics"].items()):
+        cumulated = 0
+        for bound, count in zip(LATENCY_BUCKETS + [float("inf")], metric["buckets"]):
+            cumulated += count
+            le = "+Inf" if bound == float("inf") else f"{bound:.6g}"
+            lines.append(
+                f"pipeline_call_seconds_bucket{format_labels(metric=name, le=le)} {cumulated}"
+            )
+        lines.append(f"pipeline_call_seconds_sum{format_labels(metric=name)} {metric['seconds']}")
+        lines.append(f"pipeline_call_seconds_count{format_labels(metric=name)} {metric['count']}")
+        lines.append(f"pipeline_call_errors_total{format_labels(metric=name)} {metric['errors']}")
+        lines.append(f"pipeline_bytes_read_total{format_labels(metric=name)} {metric['bytes_read']}")
+        lines.append(
+            f"pipeline_bytes_written_total{format_labels(metric=name)} {metric['bytes_written']}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+class PrometheusTextfileExporter:
+    """Rewrite a Prometheus textfile (node_exporter textfile collector) every 'interval' seconds
+    from a background thread, so long runs can be scraped while they progress."""
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        path: Path,
+        interval: float = metrics_config.prometheus_interval,
+        labels: dict[str, str] | None = None,
+    ):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.labels = labels
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="metrics-textfile", daemon=True
+        )
+
+    def start(self) -> "PrometheusTextfileExporter":
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def write(self) -> None:
+        """Write the textfile atomically, the collector never reads a partial file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(
+            prometheus_text(self.registry.snapshot(), labels=self.labels),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, self.path)
+
+    def stop(self) -> None:
+        """Stop the thread and write the final values."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.write()
+
+
+# Registry of the process, shared by the pipelines, extractors and storages
+metrics = MetricsRegistry()
@@ -0,0 +1,331 @@
+import json
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from config import profiling_config
+
+try:
+    import resource
+except ImportError:  # resource is Unix only, peak RSS is not reported elsewhere
+    resource = None
+
+CPU = "cpu"
+MEMORY = "memory"
+
+# Leaf frames of threads blocked in a wait: their samples are not CPU time
+IDLE_FRAMES = {
+    ("threading.py", "Condition.wait"),
+    ("threading.py", "Thread._wait_for_tstate_lock"),
+    ("thread.py", "_worker"),
+    ("handlers.py", "QueueListener.dequeue"),
+    ("selectors.py", "EpollSelector.select"),
+}
+
+
+def _peak_rss_mb() -> float | None:
+    """Peak resident set size of the process in MB, None if unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+class Profiler:
+    """
+    Profile of a pipeline run, split by stage. Pipelines mark their stages with stage(); the rest of the run
+    belongs to the stage 'run'.
+
+    - cpu: a thread samples the stacks of every thread (worker pools included) every 'sampling_interval'
+      seconds. Samples are counted as collapsed stacks 'stage;thread;frame;...;frame', the format of
+      flamegraph.pl and speedscope. Threads blocked in a wait are left out.
+    - memory: tracemalloc is snapshot at every stage boundary. Each stage reports its peak of traced memory,
+      the peak RSS of the process at its end, and the allocation sites which grew the most during it.
+    """
+
+    def __init__(self):
+        self.mode: str | None = None
+        self._stages: list[str] = ["run"]
+        self._start = time.perf_counter()
+        # cpu
+        self._samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._sampler: threading.Thread | None = None
+        # memory
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._memory: dict[str, dict] = {}
+
+    @property
+    def stage_name(self) -> str:
+        return self._stages[-1]
+
+    def start(self, mode: str) -> None:
+        """Start profiling the process.
+
+        Args:
+            mode (str): "cpu" or "memory".
+
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        if mode not in (CPU, MEMORY):
+            raise ValueError(f"Unknown profiling mode: mode={mode}")
+        self.mode = mode
+        self._stages = ["run"]
+        self._samples = Counter()
+        self._memory = {}
+        self._start = time.perf_counter()
+        if mode == CPU:
+            self._stop.clear()
+            self._sampler = threading.Thread(
+                target=self._sample, name="profiler", daemon=True
+            )
+            self._sampler.start()
+        else:
+            tracemalloc.start(profiling_config.traceback_frames)
+            self._snapshot = self._take_snapshot()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Context of a stage of the pipeline. Does nothing if the profiler is stopped.
+
+        Args:
+            name (str): Name of the stage, e.g. "jams" or "wav:dataset1".
+        """
+        if self.mode is None:
+            yield
+            return
+        self._close_segment()
+        self._stages.append(name)
+        try:
+            yield
+        finally:
+            self._close_segment()
+            self._stages.pop()
+
+    def _sample(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(profiling_config.sampling_interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stage = self.stage_name
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                code = frame.f_code
+                if (Path(code.co_filename).name, code.co_qualname) in IDLE_FRAMES:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{Path(code.co_filename).stem}:{code.co_qualname}")
+                    frame = frame.f_back
+                # Threads of a pool share a name up to their index, e.g. ThreadPoolExecutor-0_3
+                thread = re.sub(r"_\d+$", "", names.get(ident, "thread"))
+                self._samples[";".join([stage, thread, *reversed(frames)])] += 1
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            )
+        )
+
+    def _close_segment(self) -> None:
+        """Account the memory allocated since the last stage boundary to the current stage."""
+        now = time.perf_counter()
+        if self.mode != MEMORY:
+            self._start = now
+            return
+        snapshot = self._take_snapshot()
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        stage = self._memory.setdefault(
+            self.stage_name,
+            {"seconds": 0.0, "traced_peak_mb": 0.0, "rss_peak_mb": None, "sites": {}},
+        )
+        stage["seconds"] = round(stage["seconds"] + now - self._start, 3)
+        stage["traced_peak_mb"] = max(
+            stage["traced_peak_mb"], round(traced_peak / 2**20, 1)
+        )
+        stage["rss_peak_mb"] = _peak_rss_mb()
+        for stat in snapshot.compare_to(self._snapshot, "lineno"):
+            if stat.size_diff <= 0:
+                continue
+            frame = stat.traceback[0]
+            site = stage["sites"].setdefault(
+                f"{frame.filename}:{frame.lineno}", {"size_kb": 0.0, "count": 0}
+            )
+            site["size_kb"] += stat.size_diff / 1024
+            site["count"] += stat.count_diff
+        self._snapshot = snapshot
+        self._start = time.perf_counter()
+
+    def stop(self, path: Path) -> Path | None:
+        """Stop profiling and write the profile: collapsed stacks in cpu mode, a JSON report in memory mode.
+
+        Args:
+            path (Path): Path of the profile, without suffix.
+
+        Returns:
+            Path | None: Path of the profile, None if the profiler was not started.
+        """
+        if self.mode is None:
+            return None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if self.mode == CPU:
+            self._stop.set()
+            self._sampler.join()
+            path = write_collapsed(self._samples, path.with_name(f"{path.name}.collapsed"))
+        else:
+            self._close_segment()
+            tracemalloc.stop()
+            self._snapshot = None
+            report = {
+                "processes": 1,
+                "stages": {
+                    name: _top_sites(stage) for name, stage in self._memory.items()
+                },
+            }
+            path = path.with_name(f"{path.name}.json")
+            path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        self.mode = None
+        return path
+
+
+def _top_sites(stage: dict) -> dict:
+    """Keep the allocation sites of a stage which grew the most."""
+    sites = sorted(
+        stage["sites"].items(), key=lambda item: item[1]["size_kb"], reverse=True
+    )[: profiling_config.top]
+    return {
+        **stage,
+        "sites": {
+            site: {"size_kb": round(values["size_kb"], 1), "count": values["count"]}
+            for site, values in sites
+        },
+    }
+
+
+def write_collapsed(samples: Counter, path: Path) -> Path:
+    path.write_text(
+        "".join(f"{stack} {count}\n" for stack, count in sorted(samples.items())),
+        encoding="utf-8",
+    )
+    return path
+
+
+def read_collapsed(path: Path) -> Counter:
+    samples: Counter[str] = Counter()
+    for line in path.read_text(encoding="utf-8").splitlines():
+        stack, _, count = line.rpartition(" ")
+        samples[stack] += int(count)
+    return samples
+
+
+def merge_profiles(paths: list[Path], path: Path) -> Path | None:
+    """Merge the profiles of several processes. Samples and allocated sizes are summed,
+    stage durations are summed over the processes and peaks are the highest of a process.
+
+    Args:
+        paths (list[Path]): Paths of the profiles written by Profiler.stop, all of the same mode.
+        path (Path): Path of the merged profile, without suffix.
+
+    Returns:
+        Path | None: Path of the merged profile, None if there is no profile to merge.
+    """
+    if not paths:
+        return None
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if paths[0].suffix == ".collapsed":
+        samples: Counter[str] = Counter()
+        for profile_path in paths:
+            samples.update(read_collapsed(profile_path))
+        return write_collapsed(samples, path.with_name(f"{path.name}.collapsed"))
+
+    merged = {"processes": 0, "stages": {}}
+    for profile_path in paths:
+        report = json.loads(profile_path.read_text(encoding="utf-8"))
+        merged["processes"] += report["processes"]
+        for name, stage in report["stages"].items():
+            target = merged["stages"].setdefault(
+                name,
+                {"seconds": 0.0, "traced_peak_mb": 0.0, "rss_peak_mb": None, "sites": {}},
+            )
+            target["seconds"] = round(target["seconds"] + stage["seconds"], 3)
+            target["traced_peak_mb"] = max(
+                target["traced_peak_mb"], stage["traced_peak_mb"]
+            )
+            if stage["rss_peak_mb"] is not None:
+                target["rss_peak_mb"] = max(
+                    target["rss_peak_mb"] or 0.0, stage["rss_peak_mb"]
+                )
+            for site, values in stage["sites"].items():
+                site_target = target["sites"].setdefault(
+                    site, {"size_kb": 0.0, "count": 0}
+                )
+                site_target["size_kb"] += values["size_kb"]
+                site_target["count"] += values["count"]
+    merged["stages"] = {
+        name: _top_sites(stage) for name, stage in merged["stages"].items()
+    }
+    path = path.with_name(f"{path.name}.json")
+    path.write_text(json.dumps(merged, indent=2), encoding="utf-8")
+    return path
+
+
+def profile_summary(path: Path, top: int = 5) -> str:
+    """Short text summary of a profile: by stage, its share of the samples and its hottest functions (cpu),
+    or its duration, memory peaks and largest allocation sites (memory).
+
+    Args:
+        path (Path): Path of a profile written by Profiler.stop or merge_profiles.
+        top (int, optional): Number of functions or sites listed by stage. Defaults to 5.
+
+    Returns:
+        str: The summary.
+    """
+    lines = []
+    if path.suffix == ".collapsed":
+        samples = read_collapsed(path)
+        total = sum(samples.values()) or 1
+        stages: dict[str, Counter] = {}
+        for stack, count in samples.items():
+            stage, *frames = stack.split(";")
+            stages.setdefault(stage, Counter())[frames[-1]] += count
+        for stage, leaves in sorted(
+            stages.items(), key=lambda item: -sum(item[1].values())
+        ):
+            nb_samples = sum(leaves.values())
+            lines.append(
+                f"{stage}: {nb_samples} samples ({100 * nb_samples / total:.1f}%)"
+            )
+            lines.extend(
+                f"\t{100 * count / total:5.1f}% self  {leaf}"
+                for leaf, count in leaves.most_common(top)
+            )
+    else:
+        report = json.loads(path.read_text(encoding="utf-8"))
+        for name, stage in report["stages"].items():
+            lines.append(
+                f"{name}: {stage['seconds']}s, traced_peak={stage['traced_peak_mb']} MB, rss_peak={stage['rss_peak_mb']} MB"
+            )
+            lines.extend(
+                f"\t+{values['size_kb']:.1f} KB ({values['count']:+d} blocks)  {site}"
+                for site, values in list(stage["sites"].items())[:top]
+            )
+    return "\n".join(lines)
+
+
+# Profiler of the process, started by main.py --profile
+profiler = Profiler()
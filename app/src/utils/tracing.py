@@ -0,0 +1,232 @@
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from config import tracing_config
+
+# Correlation ID of the recording processed by the current thread, None if it is not traced
+_recording: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "trace_recording", default=None
+)
+
+
+class Tracer:
+    """
+    Recorder of spans in the Chrome trace-event format, viewable in Perfetto or chrome://tracing.
+
+    Spans are only recorded inside recording(), which carries the correlation ID of a recording
+    (e.g. the title of a GuitarSet track) to every span of its extractor reads, transformations and storage calls,
+    including those run in worker pools through contextvars. Recordings are sampled by a stable hash
+    of their correlation ID, so every file of a sampled recording is traced, in every process.
+    When tracing is disabled, recording() does nothing and record() returns on its first test.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = tracing_config.enabled,
+        sample_rate: float = tracing_config.sample_rate,
+        max_events: int = tracing_config.max_events,
+    ):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.max_events = max_events
+        self.nb_dropped = 0
+        self._lock = threading.Lock()
+        self._events: list[dict] = []
+        self._threads: dict[int, str] = {}
+        # perf_counter() is process-relative: spans are shifted to the epoch to line up processes
+        self._epoch_offset = time.time() - time.perf_counter()
+
+    def sampled(self, correlation_id: str) -> bool:
+        """Whether a recording is traced. The hash does not depend on the process, unlike hash()."""
+        if self.sample_rate >= 1:
+            return True
+        digest = hashlib.blake2b(correlation_id.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big") / 2**64 < self.sample_rate
+
+    @contextmanager
+    def recording(self, correlation_id: str) -> Iterator[None]:
+        """Context in which the spans of the current thread belong to a recording, if it is sampled.
+
+        Args:
+            correlation_id (str): Identifier of the recording, shared by its files.
+        """
+        if not self.enabled or not self.sampled(correlation_id):
+            yield
+            return
+        token = _recording.set(correlation_id)
+        try:
+            yield
+        finally:
+            _recording.reset(token)
+
+    def record(self, name: str, start: float, seconds: float, **args) -> None:
+        """Record a complete span of the current recording.
+
+        Args:
+            name (str): Name of the span, e.g. "minio.upload".
+            start (float): Start of the span, from time.perf_counter().
+            seconds (float): Duration of the span.
+            **args: Values shown with the span, e.g. bytes_written=1024.
+        """
+        if not self.enabled:
+            return
+        recording = _recording.get()
+        if recording is None:
+            return
+        tid = threading.get_native_id()
+        event = {
+            "name": name,
+            "cat": name.split(".")[0],
+            "ph": "X",
+            "ts": round((start + self._epoch_offset) * 1e6, 3),
+            "dur": round(seconds * 1e6, 3),
+            "pid": os.getpid(),
+            "tid": tid,
+            "args": {"recording": recording, **args},
+        }
+        with self._lock:
+            if len(self._events) >= self.max_events:
+                self.nb_dropped += 1
+                return
+            self._events.append(event)
+            if tid not in self._threads:
+                self._threads[tid] = threading.current_thread().name
+
+    def trace(self) -> dict:
+        """Spans of the process as a Chrome trace, with the names of the process and its threads.
+
+        Returns:
+            dict: {"traceEvents": list[dict], "displayTimeUnit": "ms", "otherData": dict}
+        """
+        pid = os.getpid()
+        with self._lock:
+            metadata = [
+                {
+                    "name": "process_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "args": {"name": f"ingestion {pid}"},
+                }
+            ] + [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": name},
+                }
+                for tid, name in self._threads.items()
+            ]
+            return {
+                "traceEvents": metadata + list(self._events),
+                "displayTimeUnit": "ms",
+                "otherData": {
+                    "sample_rate": self.sample_rate,
+                    "dropped_events": self.nb_dropped,
+                },
+            }
+
+    def slowest(self, name: str, limit: int = 10) -> list[dict]:
+        """Slowest spans of a name, with the time spent by name in the spans of the same recording they contain,
+        worker pool threads included.
+
+        Args:
+            name (str): Name of the spans, e.g. "stage.jams".
+            limit (int, optional): Number of spans. Defaults to 10.
+
+        Returns:
+            list[dict]: [{"recording": str, "ms": float, "breakdown_ms": {name: float}}], slowest first.
+        """
+        with self._lock:
+            events = list(self._events)
+        spans = sorted(
+            (event for event in events if event["name"] == name),
+            key=lambda event: event["dur"],
+            reverse=True,
+        )[:limit]
+        result = []
+        for span in spans:
+            end = span["ts"] + span["dur"]
+            breakdown: dict[str, float] = {}
+            for event in events:
+                if (
+                    event is not span
+                    and event["args"]["recording"] == span["args"]["recording"]
+                    and span["ts"] <= event["ts"]
+                    and event["ts"] + event["dur"] <= end
+                ):
+                    breakdown[event["name"]] = (
+                        breakdown.get(event["name"], 0.0) + event["dur"] / 1000
+                    )
+            result.append(
+                {
+                    "recording": span["args"]["recording"],
+                    "ms": round(span["dur"] / 1000, 3),
+                    "breakdown_ms": {k: round(v, 3) for k, v in breakdown.items()},
+                }
+            )
+        return result
+
+    def write(self, path: Path) -> Path | None:
+        """Write the trace of the process as JSON.
+
+        Args:
+            path (Path): Path of the JSON file.
+
+        Returns:
+            Path | None: Path of the JSON file, None if no span was recorded.
+        """
+        if not self._events:
+            return None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.trace()), encoding="utf-8")
+        return path
+
+    def reset(self) -> None:
+        """Drop every span."""
+        with self._lock:
+            self._events = []
+            self._threads = {}
+            self.nb_dropped = 0
+
+
+def merge_trace_files(paths: list[Path], path: Path) -> Path | None:
+    """Merge the traces of several processes into one file, each process keeping its own track.
+
+    Args:
+        paths (list[Path]): Paths of the traces written by Tracer.write.
+        path (Path): Path of the merged trace.
+
+    Returns:
+        Path | None: Path of the merged trace, None if there is no trace to merge.
+    """
+    if not paths:
+        return None
+    events, dropped = [], 0
+    for trace_path in paths:
+        trace = json.loads(trace_path.read_text(encoding="utf-8"))
+        events.extend(trace["traceEvents"])
+        dropped += trace.get("otherData", {}).get("dropped_events", 0)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(
+            {
+                "traceEvents": events,
+                "displayTimeUnit": "ms",
+                "otherData": {"dropped_events": dropped},
+            }
+        ),
+        encoding="utf-8",
+    )
+    return path
+
+
+# Tracer of the process, fed by the metrics registry
+tracer = Tracer()
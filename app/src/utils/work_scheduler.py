@@ -0,0 +1,117 @@
+import heapq
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+import soundfile as sf
+from config import scheduling_config
+
+
+@dataclass
+class FileCost:
+    path: Path
+    file_bytes: int
+    samples: int
+    cost: float
+
+
+def probe_audio_cost(path: Path) -> FileCost:
+    """Estimate the processing cost of an audio file from its size and its header only.
+
+    Args:
+        path (Path): Path of the audio file.
+
+    Returns:
+        FileCost: Size, number of samples (frames x channels) and estimated cost in seconds.
+    """
+    file_bytes = os.stat(path).st_size
+    try:
+        info = sf.info(path)
+        samples = info.frames * info.channels
+    except Exception:
+        samples = file_bytes // 2  # Unreadable header: assume 16-bit PCM
+    cost = (
+        scheduling_config.cost_overhead_seconds
+        + samples / scheduling_config.cost_samples_per_second
+    )
+    return FileCost(path=path, file_bytes=file_bytes, samples=samples, cost=cost)
+
+
+def predict_makespan(costs: Iterable[float], nb_workers: int) -> float:
+    """Makespan of tasks dispatched in the given order to the first idle of 'nb_workers' workers."""
+    workers = [0.0] * max(nb_workers, 1)
+    for cost in costs:
+        heapq.heappush(workers, heapq.heappop(workers) + cost)
+    return max(workers)
+
+
+@dataclass
+class Schedule:
+    """Dispatch order of files to a pool of workers, with its predicted makespan."""
+
+    costs: list[FileCost]
+    nb_workers: int
+    predicted_makespan: float
+
+    @classmethod
+    def largest_first(cls, file_paths: Iterable[Path], nb_workers: int) -> "Schedule":
+        """Longest-processing-time-first schedule: files are probed, then sorted by decreasing cost,
+        so the largest files do not start last and leave the pool waiting on stragglers.
+        The predicted makespan assumes the pool is fed as fast as it drains; work done serially
+        before dispatch (e.g. decoding on the pipeline thread) is not modeled.
+
+        Args:
+            file_paths (Iterable[Path]): Paths of the audio files.
+            nb_workers (int): Number of workers of the pool.
+
+        Returns:
+            Schedule: The schedule.
+        """
+        costs = sorted(
+            (probe_audio_cost(path) for path in file_paths),
+            key=lambda file_cost: file_cost.cost,
+            reverse=True,
+        )
+        return cls(
+            costs=costs,
+            nb_workers=nb_workers,
+            predicted_makespan=predict_makespan(
+                (file_cost.cost for file_cost in costs), nb_workers
+            ),
+        )
+
+    @property
+    def file_paths(self) -> list[Path]:
+        return [file_cost.path for file_cost in self.costs]
+
+    def report(self, actual_makespan: float) -> dict:
+        """Compare the predicted makespan to the actual one. 'fitted_samples_per_second' is the
+        value of SCHEDULING_COST_SAMPLES_PER_SECOND which would have predicted the actual makespan,
+        assuming the pool stayed busy.
+
+        Args:
+            actual_makespan (float): Measured makespan in seconds.
+
+        Returns:
+            dict: {"files", "samples", "predicted_makespan", "actual_makespan", "error_ratio", "fitted_samples_per_second"}
+        """
+        samples = sum(file_cost.samples for file_cost in self.costs)
+        busy_seconds = (
+            actual_makespan * min(self.nb_workers, max(len(self.costs), 1))
+            - len(self.costs) * scheduling_config.cost_overhead_seconds
+        )
+        return {
+            "files": len(self.costs),
+            "samples": samples,
+            "predicted_makespan": round(self.predicted_makespan, 3),
+            "actual_makespan": round(actual_makespan, 3),
+            "error_ratio": (
+                round(actual_makespan / self.predicted_makespan, 3)
+                if self.predicted_makespan
+                else None
+            ),
+            "fitted_samples_per_second": (
+                round(samples / busy_seconds) if busy_seconds > 0 else None
+            ),
+        }
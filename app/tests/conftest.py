@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Application modules are imported as in app/main.py: "from config import ..." and "from src... import ..."
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
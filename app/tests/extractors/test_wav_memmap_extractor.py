@@ -0,0 +1,130 @@
+import struct
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from src.extractors.wav_memmap_extractor import PCM24Memmap, WAVMemmapExtractor
+from src.models import WAVHeader
+
+SAMPLE_RATE = 8000
+
+
+def _write(path: Path, subtype: str, frames: int = 1000, channels: int = 2) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    audio_data = rng.uniform(-0.9, 0.9, size=(frames, channels))
+    sf.write(path, audio_data, SAMPLE_RATE, subtype=subtype)
+    return sf.read(path, always_2d=True)[0]
+
+
+def _chunk(chunk_id: bytes, body: bytes, size: int | None = None) -> bytes:
+    size = len(body) if size is None else size
+    return chunk_id + struct.pack("<I", size) + body + b"\x00" * (len(body) & 1)
+
+
+def _fmt(channels: int = 1, bits: int = 16) -> bytes:
+    block_align = channels * bits // 8
+    return _chunk(
+        b"fmt ",
+        struct.pack("<HHIIHH", 1, channels, SAMPLE_RATE, SAMPLE_RATE * block_align, block_align, bits),
+    )
+
+
+def _riff(*chunks: bytes) -> bytes:
+    body = b"WAVE" + b"".join(chunks)
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+@pytest.mark.parametrize("subtype", ["PCM_U8", "PCM_16", "PCM_24", "PCM_32", "FLOAT", "DOUBLE"])
+def test_header_of_soundfile_wav(tmp_path, subtype):
+    path = tmp_path / "audio.wav"
+    _write(path, subtype=subtype)
+
+    header = WAVMemmapExtractor().read_header(path)
+
+    assert header.subtype == subtype
+    assert (header.channels, header.sample_rate, header.frames) == (2, SAMPLE_RATE, 1000)
+    assert header.data_offset + header.data_size == path.stat().st_size
+
+
+@pytest.mark.parametrize("subtype", ["PCM_16", "PCM_24", "FLOAT"])
+def test_segment_matches_soundfile(tmp_path, subtype):
+    path = tmp_path / "audio.wav"
+    expected = _write(path, subtype=subtype)
+
+    audio_data, sample_rate = WAVMemmapExtractor().read_segment(
+        path, start_s=0.01, duration_s=0.05
+    )
+
+    assert sample_rate == SAMPLE_RATE
+    np.testing.assert_allclose(audio_data, expected[80:480])
+
+
+def test_segment_is_clamped_to_the_data_chunk(tmp_path):
+    path = tmp_path / "audio.wav"
+    expected = _write(path, subtype="PCM_16")
+
+    audio_data, _ = WAVMemmapExtractor().read_segment(path, start_s=0.1, duration_s=10.0)
+
+    np.testing.assert_allclose(audio_data, expected[800:])
+
+
+def test_pcm24_is_mapped_as_int32(tmp_path):
+    path = tmp_path / "audio.wav"
+    _write(path, subtype="PCM_24")
+    expected = sf.read(path, dtype="int32", always_2d=True)[0] >> 8
+
+    audio_data, _ = WAVMemmapExtractor().extract(path)
+
+    assert isinstance(audio_data, PCM24Memmap)
+    assert audio_data.shape == (1000, 2)
+    np.testing.assert_array_equal(audio_data[10:20], expected[10:20])
+
+
+def test_odd_sized_chunk_before_data_is_skipped(tmp_path):
+    samples = np.arange(-4, 4, dtype="<i2")
+    path = tmp_path / "audio.wav"
+    path.write_bytes(
+        _riff(_fmt(), _chunk(b"LIST", b"abc"), _chunk(b"data", samples.tobytes()))
+    )
+
+    header = WAVMemmapExtractor().read_header(path)
+    audio_data, _ = WAVMemmapExtractor().extract(path)
+
+    assert header.data_offset == 12 + 24 + 12 + 8
+    np.testing.assert_array_equal(audio_data[:, 0], samples)
+
+
+@pytest.mark.parametrize("data_size", [0, 0xFFFFFFFF])
+def test_unset_data_size_is_taken_from_the_file_size(tmp_path, data_size):
+    samples = np.arange(10, dtype="<i2")
+    path = tmp_path / "audio.wav"
+    path.write_bytes(_riff(_fmt(), _chunk(b"data", samples.tobytes(), size=data_size)))
+
+    header = WAVMemmapExtractor().read_header(path)
+
+    assert header.frames == 10
+
+
+@pytest.mark.parametrize(
+    "buffer, message",
+    [
+        (b"RIFX\x00\x00\x00\x00WAVE", "Not a RIFF/WAVE file"),
+        (_riff(_chunk(b"data", b"\x00\x00"), _fmt()), "before 'fmt '"),
+        (_riff(_fmt()), "No 'data' chunk"),
+    ],
+)
+def test_invalid_header_is_rejected(buffer, message):
+    with pytest.raises(ValueError, match=message):
+        WAVHeader.from_bytes(buffer)
+
+
+def test_unsupported_subtype_falls_back_to_soundfile(tmp_path):
+    path = tmp_path / "audio.wav"
+    expected = _write(path, subtype="ULAW")
+
+    audio_data, sample_rate = WAVMemmapExtractor().extract(path)
+
+    assert sample_rate == SAMPLE_RATE
+    np.testing.assert_allclose(audio_data, expected)
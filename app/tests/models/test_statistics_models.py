@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models import AnnotationStatistics, JAMSAnnotation, XMLAnnotation
+
+
+def _jams_annotation(beat_times: list[float]) -> JAMSAnnotation:
+    return JAMSAnnotation(
+        dataset_name="guitarset",
+        title="00_BN1-129-Eb_comp",
+        pitch_contour=pd.DataFrame({"time": [0.0, 0.01, 0.02], "value": [110.0, 111.0, 112.0]}),
+        note_midi=pd.DataFrame(
+            {
+                "time": [0.0, 1.0, 2.0, 3.0],
+                "duration": [0.5, 0.5, 1.0, 1.0],
+                "value": [40.2, 45.0, 52.6, 40.0],
+            }
+        ),
+        beat_position=pd.DataFrame({"time": beat_times, "value": [1] * len(beat_times)}),
+        chord=pd.DataFrame({"time": [0.0, 2.0, 4.0], "value": ["Eb:maj", "Bb:7", "Eb:maj"]}),
+    )
+
+
+def test_statistics_of_a_jams_annotation():
+    statistics = AnnotationStatistics.from_jams_annotation(_jams_annotation([1.5, 0.0, 0.5, 1.0]))
+
+    assert (statistics.n_pitch_contour, statistics.n_notes, statistics.n_beats) == (3, 4, 4)
+    assert (statistics.n_chords, statistics.distinct_chords) == (3, 2)
+    assert (statistics.pitch_min, statistics.pitch_max) == (40.0, 52.6)
+    assert statistics.pitch_histogram[40] == 2
+    assert statistics.pitch_histogram[45] == 1
+    assert statistics.pitch_histogram[53] == 1
+    assert sum(statistics.pitch_histogram) == 4
+    assert statistics.note_duration_mean == pytest.approx(0.75)
+    assert statistics.note_density == pytest.approx(1.0)
+    assert statistics.ibi_mean == pytest.approx(0.5)
+    assert statistics.ibi_std == pytest.approx(0.0)
+    assert (statistics.ibi_min, statistics.ibi_max) == (0.5, 0.5)
+
+
+def test_statistics_without_beats_leave_inter_beat_intervals_unset():
+    statistics = AnnotationStatistics.from_jams_annotation(_jams_annotation([0.0]))
+
+    assert statistics.n_beats == 1
+    assert statistics.ibi_mean is None
+    assert statistics.ibi_max is None
+
+
+def test_statistics_of_a_xml_annotation():
+    annotation = XMLAnnotation(
+        dataset_name="idmt_smt_guitar_1",
+        title="G53-40100-1111-00001",
+        transcription=pd.DataFrame(
+            {"pitch": [64, 60, np.nan], "onset": [0.5, 1.0, 1.5], "offset": [1.0, 1.25, 2.5]}
+        ),
+    )
+
+    statistics = AnnotationStatistics.from_xml_annotation(annotation)
+
+    assert statistics.n_notes == 3
+    assert (statistics.pitch_min, statistics.pitch_max) == (60.0, 64.0)
+    assert sum(statistics.pitch_histogram) == 2
+    assert statistics.note_duration_mean == pytest.approx(1.75 / 3)
+    assert statistics.note_density == pytest.approx(1.5)
+    assert (statistics.n_beats, statistics.n_chords, statistics.ibi_mean) == (0, 0, None)
+
+
+def test_statistics_of_an_empty_annotation():
+    annotation = XMLAnnotation(
+        dataset_name="idmt_smt_guitar_1",
+        title="empty",
+        transcription=pd.DataFrame({"pitch": [], "onset": [], "offset": []}),
+    )
+
+    statistics = AnnotationStatistics.from_xml_annotation(annotation)
+
+    assert statistics.n_notes == 0
+    assert statistics.pitch_min is None
+    assert statistics.note_duration_mean is None
+    assert statistics.pitch_histogram == [0] * 128
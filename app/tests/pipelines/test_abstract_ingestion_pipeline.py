@@ -0,0 +1,187 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from config import job_queue_config
+from src.pipelines.abstract_ingestion_pipeline import AbstractIngestionPipeline
+
+
+class FakeJobQueue:
+    """In-memory ingestion_jobs table with the semantics of the PostgresStorage job queue.
+    Leases expire on a manual clock, 'now'. 'on_poll' stands for the other workers, between two polls."""
+
+    def __init__(self, nb_jobs: int):
+        self.now = 0.0
+        self.on_poll = None
+        self.jobs = {
+            id_job: {
+                "id_job": id_job,
+                "kind": "wav",
+                "file_path": f"track_{id_job}.wav",
+                "status": "pending",
+                "claimed_by": None,
+                "attempts": 0,
+                "lease_expires_at": None,
+                "error": None,
+            }
+            for id_job in range(1, nb_jobs + 1)
+        }
+
+    def requeue_stale_jobs(self, pipeline: str, max_attempts: int) -> dict:
+        for job in self.jobs.values():
+            if job["status"] == "claimed" and job["lease_expires_at"] < self.now:
+                job["status"] = "pending" if job["attempts"] < max_attempts else "failed"
+                if job["status"] == "failed":
+                    job["error"] = "Lease expired"
+        return {}
+
+    def claim_jobs(self, pipeline: str, worker_id: str, batch_size: int, lease_seconds: int) -> list[dict]:
+        jobs = [job for job in self.jobs.values() if job["status"] == "pending"][:batch_size]
+        for job in jobs:
+            job.update(
+                status="claimed",
+                claimed_by=worker_id,
+                attempts=job["attempts"] + 1,
+                lease_expires_at=self.now + lease_seconds,
+            )
+        return [dict(job) for job in jobs]
+
+    def renew_leases(self, id_jobs: list[int], worker_id: str, lease_seconds: int) -> set[int]:
+        renewed = set()
+        for id_job in id_jobs:
+            job = self.jobs[id_job]
+            if job["claimed_by"] == worker_id and job["status"] == "claimed":
+                job["lease_expires_at"] = self.now + lease_seconds
+                renewed.add(id_job)
+        return renewed
+
+    def complete_job(self, id_job: int, worker_id: str, error: str | None = None) -> bool:
+        job = self.jobs[id_job]
+        if job["claimed_by"] != worker_id or job["status"] != "claimed":
+            return False
+        job.update(status="failed" if error else "done", error=error, lease_expires_at=None)
+        return True
+
+    def select_jobs_progress(self, pipeline: str) -> list[dict]:
+        if self.on_poll is not None:
+            self.on_poll()
+        return [{"status": job["status"]} for job in self.jobs.values()]
+
+    def statuses(self) -> dict[int, str]:
+        return {id_job: job["status"] for id_job, job in self.jobs.items()}
+
+
+class QueuePipeline(AbstractIngestionPipeline):
+    """Ingestion pipeline built without storages, whose jobs run 'on_job'."""
+
+    def __init__(self, queue: FakeJobQueue, on_job=None):
+        self.logger = logging.getLogger("test")
+        self.postgres_storage = queue
+        self.pipeline_name = "QueuePipeline"
+        self.statistics = SimpleNamespace(to_dict=lambda: {}, to_string=lambda: "")
+        self._pending = {}
+        self._current_job_id = None
+        self._failed_jobs = set()
+        self._nb_callback_errors = 0
+        self.on_job = on_job or (lambda job: None)
+        self.processed: list[tuple[int, int]] = []
+
+    def run(self) -> None:
+        self.work()
+
+    def _plan_jobs(self) -> list[dict]:
+        return []
+
+    def _process_job(self, job: dict) -> None:
+        self.processed.append((job["id_job"], job["attempts"]))
+        self.on_job(job)
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    monkeypatch.setattr(job_queue_config, "batch_size", 2)
+    monkeypatch.setattr(job_queue_config, "lease_seconds", 60)
+    monkeypatch.setattr(job_queue_config, "max_attempts", 2)
+    monkeypatch.setattr(job_queue_config, "poll_interval", 0)
+
+
+def test_worker_drains_the_queue_and_records_failures():
+    queue = FakeJobQueue(nb_jobs=5)
+
+    def on_job(job: dict) -> None:
+        if job["id_job"] == 3:
+            raise ValueError("Corrupted file")
+
+    nb_jobs = QueuePipeline(queue, on_job).work(worker_id="worker-1")
+
+    assert nb_jobs == 5
+    assert queue.statuses() == {1: "done", 2: "done", 3: "failed", 4: "done", 5: "done"}
+    assert queue.jobs[3]["error"] == "Processing has failed, see worker logs"
+
+
+def test_stale_claim_of_a_crashed_worker_is_requeued():
+    queue = FakeJobQueue(nb_jobs=3)
+    queue.claim_jobs("QueuePipeline", "crashed", batch_size=1, lease_seconds=60)
+    queue.now = 61
+
+    pipeline = QueuePipeline(queue)
+    nb_jobs = pipeline.work(worker_id="worker-1")
+
+    assert nb_jobs == 3
+    assert sorted(pipeline.processed) == [(1, 2), (2, 1), (3, 1)]
+    assert set(queue.statuses().values()) == {"done"}
+
+
+def test_claim_expired_after_max_attempts_fails_the_job():
+    queue = FakeJobQueue(nb_jobs=1)
+    queue.jobs[1]["attempts"] = 1
+    queue.claim_jobs("QueuePipeline", "crashed", batch_size=1, lease_seconds=60)
+    queue.now = 61
+
+    pipeline = QueuePipeline(queue)
+
+    assert pipeline.work(worker_id="worker-1") == 0
+    assert not pipeline.processed
+    assert queue.jobs[1]["status"] == "failed"
+    assert queue.jobs[1]["error"] == "Lease expired"
+
+
+def test_lease_of_a_slow_batch_is_renewed_after_each_job():
+    queue = FakeJobQueue(nb_jobs=2)
+
+    def on_job(job: dict) -> None:
+        # Each job takes most of the lease: the second one would expire without a renewal
+        queue.now += 45
+        queue.requeue_stale_jobs("QueuePipeline", max_attempts=2)
+
+    pipeline = QueuePipeline(queue, on_job)
+
+    assert pipeline.work(worker_id="worker-1") == 2
+    assert pipeline.processed == [(1, 1), (2, 1)]
+    assert queue.statuses() == {1: "done", 2: "done"}
+
+
+def test_jobs_whose_claim_was_lost_are_left_to_their_new_worker():
+    queue = FakeJobQueue(nb_jobs=2)
+
+    def on_job(job: dict) -> None:
+        if job["id_job"] == 1:
+            # The claim of job 2 is lost meanwhile, another worker takes it over
+            queue.jobs[2].update(claimed_by="worker-2", attempts=2)
+
+    polls = []
+
+    def on_poll() -> None:
+        # The worker waits for the job claimed by worker-2 until it completes
+        polls.append(queue.statuses())
+        queue.complete_job(2, "worker-2")
+
+    queue.on_poll = on_poll
+    pipeline = QueuePipeline(queue, on_job)
+    nb_jobs = pipeline.work(worker_id="worker-1")
+
+    assert nb_jobs == 1
+    assert pipeline.processed == [(1, 1)]
+    assert polls[0] == {1: "done", 2: "claimed"}
+    assert queue.statuses() == {1: "done", 2: "done"}
@@ -0,0 +1,93 @@
+import pandas as pd
+import pyarrow.parquet as pq
+
+from config import mongo_config
+from src.models.xml_models import Event, ExcitationStyle, XMLAnnotation
+from src.pipelines.parquet_export_pipeline import (
+    ANNOTATION_COLUMNS,
+    ParquetExportPipeline,
+    PartitionedParquetWriter,
+)
+
+NOTE_MIDI_COLUMNS = ANNOTATION_COLUMNS[mongo_config.collection_note_midi]
+
+
+def _xml_document() -> dict:
+    events = [
+        Event(
+            pitch=64,
+            onset=0.5,
+            offset=1.0,
+            fret_number=5,
+            string_number=2,
+            excitation_style=ExcitationStyle.PICKED,
+            expression_style=None,
+            loudness=None,
+            modulation_frequency_range=None,
+            modulation_frequency=None,
+        ),
+        Event(
+            pitch=60,
+            onset=1.0,
+            offset=1.25,
+            fret_number=None,
+            string_number=None,
+            excitation_style=None,
+            expression_style=None,
+            loudness=None,
+            modulation_frequency_range=None,
+            modulation_frequency=None,
+        ),
+    ]
+    annotation = XMLAnnotation(
+        dataset_name="idmt_smt_guitar_1",
+        title="G53-40100-1111-00001",
+        transcription=pd.DataFrame([event.to_dict() for event in events]),
+    )
+    return annotation.to_dict()
+
+
+def test_flatten_xml_document_with_missing_optional_fields():
+    document = _xml_document()
+    assert pd.isna(document["transcription"][1]["fret_number"])
+
+    rows = ParquetExportPipeline._flatten(document)
+
+    assert [row["time"] for row in rows] == [0.5, 1.0]
+    assert [row["duration"] for row in rows] == [0.5, 0.25]
+    assert rows[1]["fret_number"] is None
+    assert rows[1]["string_number"] is None
+    assert rows[1]["excitation_style"] is None
+
+
+def test_export_xml_document_with_missing_optional_fields(tmp_path):
+    document = _xml_document()
+    writer = PartitionedParquetWriter(
+        directory=tmp_path,
+        schema=ParquetExportPipeline._schema(NOTE_MIDI_COLUMNS),
+        row_group_size=1,
+    )
+    for row in ParquetExportPipeline._flatten(document):
+        writer.append(dataset_name=document["dataset_name"], row=row)
+    paths = writer.close()
+
+    assert writer.rows_written == 2
+    assert writer.rows_rejected == 0
+    table = pq.read_table(paths[0])
+    assert table.column("fret_number").to_pylist() == [5, None]
+    assert table.column("excitation_style").to_pylist() == ["picked", None]
+
+
+def test_rows_not_fitting_the_schema_are_rejected(tmp_path):
+    writer = PartitionedParquetWriter(
+        directory=tmp_path,
+        schema=ParquetExportPipeline._schema(NOTE_MIDI_COLUMNS),
+        row_group_size=10,
+    )
+    writer.append(dataset_name="a", row={"title": "t1", "fret_number": 3})
+    writer.append(dataset_name="a", row={"title": "t2", "fret_number": "x"})
+    paths = writer.close()
+
+    assert writer.rows_written == 1
+    assert writer.rows_rejected == 1
+    assert pq.read_table(paths[0]).column("title").to_pylist() == ["t1"]
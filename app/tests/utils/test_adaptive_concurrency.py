@@ -0,0 +1,116 @@
+from config import adaptive_concurrency_config
+from src.utils import AIMDController
+
+
+def _batch_controller(initial: int = 500) -> AIMDController:
+    return AIMDController(
+        name="bulk_write",
+        initial=initial,
+        minimum=50,
+        maximum=2000,
+        step=50,
+        wall_clock=False,
+        enabled=True,
+    )
+
+
+def _observe_window(
+    controller: AIMDController, latency: float, units: int = 1, error: bool = False
+) -> dict:
+    for _ in range(adaptive_concurrency_config.window):
+        controller.observe(latency=latency, units=units, error=error)
+    return controller.decisions[-1]
+
+
+def test_first_window_increases():
+    controller = _batch_controller()
+
+    decision = _observe_window(controller, latency=0.1, units=500)
+
+    assert decision["action"] == "increase"
+    assert controller.limit == 550
+
+
+def test_errors_decrease_down_to_minimum():
+    controller = _batch_controller(initial=80)
+
+    decision = _observe_window(controller, latency=0.1, units=80, error=True)
+
+    assert decision["action"] == "decrease:errors"
+    assert controller.limit == 50
+
+
+def test_latency_spike_decreases():
+    controller = AIMDController(name="put_object", initial=8, enabled=True)
+    _observe_window(controller, latency=0.01)
+
+    decision = _observe_window(controller, latency=0.05)
+
+    assert decision["action"] == "decrease:latency"
+    assert controller.limit == int(9 * adaptive_concurrency_config.decrease_factor)
+
+
+def test_batch_latency_is_compared_per_unit():
+    controller = _batch_controller(initial=100)
+
+    for _ in range(300):
+        batch_size = controller.limit
+        decision = _observe_window(
+            controller, latency=0.02 + 0.001 * batch_size, units=batch_size
+        )
+        assert not decision["action"].startswith("decrease")
+
+    assert controller.limit == controller.maximum
+
+
+def test_holds_then_probes():
+    controller = _batch_controller()
+    _observe_window(controller, latency=0.1, units=500)
+
+    actions = [
+        _observe_window(controller, latency=0.1, units=500)["action"]
+        for _ in range(adaptive_concurrency_config.probe_after + 1)
+    ]
+
+    assert actions == ["hold"] * adaptive_concurrency_config.probe_after + ["increase"]
+
+
+def test_disabled_controller_keeps_its_limit():
+    controller = AIMDController(name="put_object", initial=4, enabled=False)
+
+    _observe_window(controller, latency=0.1)
+    _observe_window(controller, latency=0.1, error=True)
+
+    assert controller.limit == 4
+    assert controller.summary()["decreases"] == 1
+
+
+def _upload_controller() -> AIMDController:
+    return AIMDController(name="put_object", initial=8, maximum=16, enabled=True)
+
+
+def test_large_uploads_after_small_ones_do_not_collapse_the_limit():
+    controller = _upload_controller()
+    for _ in range(4):
+        _observe_window(controller, latency=0.005, units=2_000)  # JAMS
+
+    for _ in range(20):
+        decision = _observe_window(controller, latency=0.4, units=20_000_000)  # WAV
+        assert not decision["action"].startswith("decrease")
+
+    assert controller.limit >= 8
+
+
+def test_small_uploads_after_large_ones_cost_one_decrease():
+    controller = _upload_controller()
+    for _ in range(4):
+        _observe_window(controller, latency=0.4, units=20_000_000)
+    limit = controller.limit
+
+    actions = [
+        _observe_window(controller, latency=0.005, units=2_000)["action"]
+        for _ in range(20)
+    ]
+
+    assert actions.count("decrease:latency") == 1
+    assert controller.limit >= int(limit * adaptive_concurrency_config.decrease_factor)
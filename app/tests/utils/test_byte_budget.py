@@ -0,0 +1,63 @@
+import threading
+
+import numpy as np
+import soundfile as sf
+
+from src.utils import ByteBudget, estimate_decoded_bytes
+
+
+def test_file_larger_than_the_budget_is_admitted_alone():
+    budget = ByteBudget(max_bytes=100)
+
+    budget.acquire(250)
+
+    assert budget.in_flight_bytes == 250
+    assert budget.nb_waits == 0
+
+
+def test_file_larger_than_the_budget_waits_for_the_others():
+    budget = ByteBudget(max_bytes=100)
+    budget.acquire(40)
+    admitted = threading.Event()
+    thread = threading.Thread(
+        target=lambda: (budget.acquire(250), admitted.set()), daemon=True
+    )
+    thread.start()
+
+    assert not admitted.wait(timeout=0.2)
+    budget.release(40)
+    assert admitted.wait(timeout=5)
+    thread.join(timeout=5)
+    assert budget.in_flight_bytes == 250
+    assert budget.peak_bytes == 250
+    assert budget.nb_waits == 1
+
+
+def test_files_within_the_budget_are_admitted_together():
+    budget = ByteBudget(max_bytes=100)
+
+    budget.acquire(60)
+    budget.acquire(40)
+
+    assert budget.in_flight_bytes == 100
+    assert budget.nb_waits == 0
+
+
+def test_no_budget_admits_everything():
+    budget = ByteBudget(max_bytes=0)
+
+    budget.acquire(10**12)
+    budget.acquire(10**12)
+
+    summary = budget.summary()
+    assert summary["max_mb"] is None
+    assert summary["waits"] == 0
+    assert budget.peak_bytes == 2 * 10**12
+
+
+def test_decoded_bytes_are_estimated_from_the_header(tmp_path):
+    path = tmp_path / "hex.wav"
+    sf.write(path, np.zeros((1000, 6)), 8000, subtype="PCM_16")
+
+    assert estimate_decoded_bytes(path) == 1000 * 6 * 8
+    assert estimate_decoded_bytes(path, dtype="float32") == 1000 * 6 * 4
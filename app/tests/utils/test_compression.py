@@ -0,0 +1,42 @@
+import pytest
+
+from src.storages import compression
+from src.storages.compression import GZIP, ZSTD, compress, decompress, resolve_codec
+
+DATA = b'{"annotations": [' + b'{"time": 0.5, "value": 60},' * 200 + b"]}"
+
+
+def test_gzip_round_trip():
+    compressed = compress(DATA, codec=GZIP)
+
+    assert compressed.startswith(compression.MAGIC_NUMBERS[GZIP])
+    assert len(compressed) < len(DATA)
+    assert decompress(compressed, codec=GZIP) == DATA
+
+
+def test_gzip_output_is_deterministic():
+    assert compress(DATA, codec=GZIP) == compress(DATA, codec=GZIP)
+
+
+def test_zstd_round_trip():
+    pytest.importorskip("zstandard")
+
+    compressed = compress(DATA, codec=ZSTD)
+
+    assert compressed.startswith(compression.MAGIC_NUMBERS[ZSTD])
+    assert decompress(compressed, codec=ZSTD) == DATA
+
+
+@pytest.mark.parametrize("codec", [GZIP, ZSTD])
+def test_bytes_already_decoded_are_returned_as_is(codec):
+    assert decompress(DATA, codec=codec) == DATA
+
+
+def test_codec_resolution(monkeypatch):
+    assert resolve_codec(None) is None
+    assert resolve_codec(GZIP) == GZIP
+    with pytest.raises(ValueError, match="Unknown compression codec"):
+        resolve_codec("brotli")
+
+    monkeypatch.setattr(compression, "zstandard", None)
+    assert resolve_codec(ZSTD) == GZIP
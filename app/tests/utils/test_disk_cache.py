@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from src.storages.disk_cache import DiskCache
+
+BUCKET = "raw"
+
+
+def _unexpected_etag() -> str:
+    raise AssertionError("the entry should not be validated")
+
+
+def _entry_path(cache: DiskCache, file_name: str, etag: str):
+    return cache._key_dir(BUCKET, file_name) / etag
+
+
+def test_entry_is_read_while_its_etag_is_unchanged(tmp_path):
+    cache = DiskCache(cache_dir=tmp_path, max_bytes=1000)
+    cache.put(BUCKET, "a.jams", etag="v1", data=b"content")
+
+    assert cache.get(BUCKET, "a.jams", get_etag=lambda: "v1") == b"content"
+    assert cache.get(BUCKET, "b.jams", get_etag=lambda: "v1") is None
+    assert (cache.statistics.hits, cache.statistics.misses) == (1, 1)
+
+
+def test_entry_of_a_changed_object_is_a_miss_and_removed(tmp_path):
+    cache = DiskCache(cache_dir=tmp_path, max_bytes=1000)
+    cache.put(BUCKET, "a.jams", etag="v1", data=b"content")
+
+    assert cache.get(BUCKET, "a.jams", get_etag=lambda: "v2") is None
+    assert not _entry_path(cache, "a.jams", "v1").exists()
+    assert cache._size == 0
+
+
+def test_entry_is_not_validated_within_its_ttl(tmp_path):
+    cache = DiskCache(cache_dir=tmp_path, max_bytes=1000, ttl=60)
+    cache.put(BUCKET, "a.jams", etag="v1", data=b"content")
+
+    assert cache.get(BUCKET, "a.jams", get_etag=_unexpected_etag) == b"content"
+
+    path = _entry_path(cache, "a.jams", "v1")
+    os.utime(path, (path.stat().st_atime, path.stat().st_mtime - 120))
+    assert cache.get(BUCKET, "a.jams", get_etag=lambda: "v2") is None
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = DiskCache(cache_dir=tmp_path, max_bytes=250)
+    for atime, file_name in ((1000, "a.jams"), (2000, "b.jams")):
+        cache.put(BUCKET, file_name, etag="v1", data=b"x" * 100)
+        path = _entry_path(cache, file_name, "v1")
+        os.utime(path, (atime, path.stat().st_mtime))
+    cache.get(BUCKET, "a.jams", get_etag=lambda: "v1")  # a is now the most recent
+
+    cache.put(BUCKET, "c.jams", etag="v1", data=b"x" * 100)
+
+    assert _entry_path(cache, "a.jams", "v1").exists()
+    assert not _entry_path(cache, "b.jams", "v1").exists()
+    assert _entry_path(cache, "c.jams", "v1").exists()
+    assert cache.statistics.evictions == 1
+    assert cache._size == 200
+
+
+@pytest.mark.parametrize("etag, size", [("v1", 1001), ("", 10)])
+def test_oversized_or_untagged_object_is_not_cached(tmp_path, etag, size):
+    cache = DiskCache(cache_dir=tmp_path, max_bytes=1000)
+
+    cache.put(BUCKET, "a.wav", etag=etag, data=b"x" * size)
+
+    assert cache._entries() == []
+
+
+def test_invalidated_entry_is_a_miss(tmp_path):
+    cache = DiskCache(cache_dir=tmp_path, max_bytes=1000)
+    cache.put(BUCKET, "a.jams", etag="v1", data=b"content")
+
+    cache.invalidate(BUCKET, "a.jams")
+
+    assert cache.get(BUCKET, "a.jams", get_etag=lambda: "v1") is None
+
+
+def test_size_is_restored_from_existing_entries(tmp_path):
+    DiskCache(cache_dir=tmp_path, max_bytes=1000).put(
+        BUCKET, "a.jams", etag="v1", data=b"x" * 100
+    )
+
+    assert DiskCache(cache_dir=tmp_path, max_bytes=1000)._size == 100
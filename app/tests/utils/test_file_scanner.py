@@ -0,0 +1,82 @@
+import pytest
+
+from src.pipelines.guitar_set_ingestion_pipeline import GuitarSetIngestionPipeline
+from src.utils import Shard, scan_files
+
+TITLES = [
+    f"{player:02d}_BN{take}-{100 + take}-Eb_comp"
+    for player in range(6)
+    for take in range(1, 9)
+]
+WAV_DIRECTORIES = {
+    "audio_hex_pickup_debleeded": "_hex_cln",
+    "audio_hex_pickup_original": "_hex",
+    "audio_mono-mic": "_mic",
+    "audio_mono-pickup_mix": "_mix",
+}
+
+
+@pytest.fixture
+def guitar_set(tmp_path):
+    (tmp_path / "annotation").mkdir()
+    for title in TITLES:
+        (tmp_path / "annotation" / f"{title}.jams").touch()
+    for directory, suffix in WAV_DIRECTORIES.items():
+        (tmp_path / directory).mkdir()
+        for title in TITLES:
+            (tmp_path / directory / f"{title}{suffix}.wav").touch()
+    return tmp_path
+
+
+def _scan(directory, suffix, shard=None, limit=None):
+    return list(
+        scan_files(
+            directory=directory,
+            suffix=suffix,
+            limit=limit,
+            shard=shard,
+            key=GuitarSetIngestionPipeline._title_key,
+        )
+    )
+
+
+def test_every_file_lands_in_exactly_one_shard(guitar_set):
+    shards = [Shard(index=index, count=4) for index in range(4)]
+    directories = [("annotation", ".jams")] + [(d, ".wav") for d in WAV_DIRECTORIES]
+    for directory, suffix in directories:
+        all_files = _scan(guitar_set / directory, suffix)
+        by_shard = [
+            _scan(guitar_set / directory, suffix, shard=shard) for shard in shards
+        ]
+
+        assert sorted(path for paths in by_shard for path in paths) == all_files
+        assert all(paths for paths in by_shard)
+
+
+def test_jams_and_wav_files_of_a_recording_share_a_shard(guitar_set):
+    shard_of = {}
+    for index in range(4):
+        shard = Shard(index=index, count=4)
+        for path in _scan(guitar_set / "annotation", ".jams", shard=shard):
+            shard_of[path.stem] = index
+        for directory in WAV_DIRECTORIES:
+            for path in _scan(guitar_set / directory, ".wav", shard=shard):
+                title = GuitarSetIngestionPipeline._title_key(path)
+                assert shard_of[title] == index
+
+    assert sorted(shard_of) == sorted(TITLES)
+
+
+def test_limit_applies_after_sharding(guitar_set):
+    shard = Shard(index=1, count=4)
+    shard_files = _scan(guitar_set / "annotation", ".jams", shard=shard)
+    assert len(shard_files) > 3
+
+    limited = _scan(guitar_set / "annotation", ".jams", shard=shard, limit=3)
+    assert limited == shard_files[:3]
+
+
+@pytest.mark.parametrize("value", ["4/4", "-1/4", "1", "a/b", "0/0"])
+def test_invalid_shard_is_rejected(value):
+    with pytest.raises(ValueError):
+        Shard.parse(value)
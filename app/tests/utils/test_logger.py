@@ -0,0 +1,76 @@
+import logging
+
+import pytest
+
+from src.utils import logger as logger_module
+from src.utils.logger import RateLimitFilter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(logger_module.time, "monotonic", clock)
+    return clock
+
+
+def _record(level: int = logging.WARNING, lineno: int = 10, msg: str = "Missing file: %s") -> logging.LogRecord:
+    return logging.makeLogRecord(
+        {
+            "levelno": level,
+            "levelname": logging.getLevelName(level),
+            "pathname": "extractor.py",
+            "lineno": lineno,
+            "msg": msg,
+            "args": ("a.wav",),
+        }
+    )
+
+
+def test_records_above_the_burst_are_suppressed_by_call_site(clock):
+    rate_limit = RateLimitFilter(burst=2, period=60)
+
+    kept = [rate_limit.filter(_record()) for _ in range(5)]
+
+    assert kept == [True, True, False, False, False]
+    assert rate_limit.filter(_record(lineno=20))
+    assert rate_limit.nb_suppressed == 3
+
+
+def test_first_record_of_the_next_period_counts_the_suppressed_records(clock):
+    rate_limit = RateLimitFilter(burst=1, period=60)
+    for _ in range(4):
+        rate_limit.filter(_record())
+
+    clock.now = 60
+    record = _record()
+
+    assert rate_limit.filter(record)
+    assert record.getMessage() == "Missing file: a.wav [3 similar messages suppressed]"
+    next_record = _record()
+    assert not rate_limit.filter(next_record)
+    clock.now = 120
+    assert rate_limit.filter(next_record)
+    assert next_record.getMessage() == "Missing file: a.wav [1 similar messages suppressed]"
+
+
+@pytest.mark.parametrize("level", [logging.ERROR, logging.CRITICAL, logging.INFO, logging.DEBUG])
+def test_errors_and_records_below_the_level_are_never_suppressed(clock, level):
+    rate_limit = RateLimitFilter(burst=1, period=60, level=logging.WARNING)
+
+    assert all(rate_limit.filter(_record(level=level)) for _ in range(10))
+    assert rate_limit.nb_suppressed == 0
+
+
+def test_burst_zero_disables_the_limit(clock):
+    rate_limit = RateLimitFilter(burst=0, period=60)
+
+    assert all(rate_limit.filter(_record()) for _ in range(10))
+    assert rate_limit.nb_suppressed == 0
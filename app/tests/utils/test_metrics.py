@@ -0,0 +1,59 @@
+import pytest
+
+from src.utils.metrics import (
+    LATENCY_BUCKETS,
+    MetricsRegistry,
+    merge_snapshots,
+    percentile,
+)
+
+
+def _registry(*latencies: float) -> MetricsRegistry:
+    registry = MetricsRegistry(enabled=True)
+    for seconds in latencies:
+        registry.observe("minio.get_object", seconds)
+    return registry
+
+
+def _metric(registry: MetricsRegistry) -> dict:
+    return registry.snapshot()["metrics"]["minio.get_object"]
+
+
+def test_percentile_of_an_empty_metric_is_none():
+    registry = _registry(0.001)
+    metric = {**_metric(registry), "count": 0}
+
+    assert percentile(metric, 0.5) is None
+
+
+def test_percentile_interpolates_within_the_bucket_clamped_to_min_and_max():
+    # The three latencies share the bucket (0.0032, 0.0045]
+    metric = _metric(_registry(0.0035, 0.004, 0.0045))
+
+    assert percentile(metric, 0.5) == pytest.approx(0.004)
+    assert percentile(metric, 1.0) == pytest.approx(0.0045)
+
+
+def test_percentile_walks_the_buckets():
+    metric = _metric(_registry(0.001, 0.001, 0.001, 0.002))
+    upper = LATENCY_BUCKETS[7]  # bucket of 0.001 is (0.0008, 0.0011]
+
+    assert percentile(metric, 0.5) == pytest.approx(0.001 + (upper - 0.001) * 2 / 3)
+    assert percentile(metric, 1.0) == pytest.approx(0.002)
+
+
+def test_merged_snapshots_match_a_single_process():
+    first = _registry(0.001, 0.01, 0.1)
+    second = _registry(0.0005, 0.02, 2.0)
+    single = _registry(0.001, 0.01, 0.1, 0.0005, 0.02, 2.0)
+
+    merged = merge_snapshots([first.snapshot(), second.snapshot()])
+    metric = merged["metrics"]["minio.get_object"]
+
+    assert metric["count"] == 6
+    assert metric["seconds"] == pytest.approx(2.1315)
+    assert metric["min_seconds"] == 0.0005
+    assert metric["max_seconds"] == 2.0
+    assert metric["buckets"] == _metric(single)["buckets"]
+    for q in (0.5, 0.95, 0.99):
+        assert percentile(metric, q) == pytest.approx(percentile(_metric(single), q))
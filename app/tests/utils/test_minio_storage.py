@@ -0,0 +1,306 @@
+import hashlib
+import io
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import soundfile as sf
+from minio.helpers import MIN_PART_SIZE
+
+from config import minio_config
+from src.storages.compression import GZIP
+from src.storages.minio_storage import MinIOStorage
+
+BUCKET = "raw"
+SAMPLE_RATE = 8000
+
+
+class FakeResponse:
+    def __init__(self, data: bytes, headers: dict):
+        self._data = data
+        self.headers = headers
+
+    def read(self) -> bytes:
+        return self._data
+
+    def close(self) -> None:
+        pass
+
+    def release_conn(self) -> None:
+        pass
+
+
+class FakeMinio:
+    """In-memory MinIO client. 'on_get' is called before each GET, e.g. to overwrite an object meanwhile."""
+
+    def __init__(self):
+        self.objects: dict[tuple[str, str], tuple[bytes, dict]] = {}
+        self.gets: list[tuple[str, int, int]] = []
+        self.on_get = None
+        self.uploads: dict[str, dict] = {}
+        self.part_attempts: list[int] = []
+        self.part_failures: dict[int, int] = {}
+
+    def bucket_exists(self, bucket_name: str) -> bool:
+        return True
+
+    def write(self, bucket_name: str, object_name: str, data: bytes, headers: dict | None = None) -> str:
+        etag = hashlib.md5(data).hexdigest()
+        self.objects[(bucket_name, object_name)] = (data, {"ETag": f'"{etag}"', **(headers or {})})
+        return etag
+
+    def put_object(self, bucket_name, object_name, data, length, content_type=None, metadata=None):
+        headers = {
+            key if key.startswith("Content-") else f"x-amz-meta-{key}": value
+            for key, value in (metadata or {}).items()
+        }
+        return SimpleNamespace(etag=self.write(bucket_name, object_name, data.read(length), headers))
+
+    def get_object(self, bucket_name, object_name, offset=0, length=0):
+        if self.on_get is not None:
+            self.on_get()
+        data, headers = self.objects[(bucket_name, object_name)]
+        self.gets.append((object_name, offset, length))
+        if not offset and not length:
+            return FakeResponse(data, dict(headers))
+        end = len(data) if not length else min(offset + length, len(data))
+        return FakeResponse(
+            data[offset:end],
+            {**headers, "Content-Range": f"bytes {offset}-{end - 1}/{len(data)}"},
+        )
+
+    def list_objects(self, bucket_name, prefix="", recursive=False, start_after=None):
+        names = sorted(
+            name
+            for bucket, name in self.objects
+            if bucket == bucket_name and name.startswith(prefix)
+        )
+        if not recursive:
+            # Names below a '/' are grouped into their directory, e.g. 'ds1/'
+            entries = set()
+            for name in names:
+                head, slash, _ = name[len(prefix) :].partition("/")
+                entries.add(prefix + head + slash)
+            names = sorted(entries)
+        for name in names:
+            if start_after is not None and name <= start_after:
+                continue
+            if name.endswith("/"):
+                yield SimpleNamespace(object_name=name, is_dir=True)
+                continue
+            data, headers = self.objects[(bucket_name, name)]
+            yield SimpleNamespace(
+                object_name=name,
+                is_dir=False,
+                size=len(data),
+                etag=headers["ETag"].strip('"'),
+                last_modified=None,
+            )
+
+    def remove_object(self, bucket_name, object_name):
+        del self.objects[(bucket_name, object_name)]
+
+    def stat_object(self, bucket_name, object_name):
+        data, headers = self.objects[(bucket_name, object_name)]
+        return SimpleNamespace(etag=headers["ETag"].strip('"'), size=len(data))
+
+    # Multipart API. 'part_failures' maps a part number to the number of times its upload fails.
+    def _create_multipart_upload(self, bucket_name, object_name, headers):
+        upload_id = f"upload-{len(self.uploads)}"
+        self.uploads[upload_id] = {"headers": headers, "parts": {}, "aborted": False}
+        return upload_id
+
+    def _upload_part(self, bucket_name, object_name, data, headers, upload_id, part_number):
+        self.part_attempts.append(part_number)
+        if self.part_failures.get(part_number, 0):
+            self.part_failures[part_number] -= 1
+            raise OSError(f"Connection reset while uploading part {part_number}")
+        self.uploads[upload_id]["parts"][part_number] = data
+        return hashlib.md5(data).hexdigest()
+
+    def _complete_multipart_upload(self, bucket_name, object_name, upload_id, parts):
+        upload = self.uploads.pop(upload_id)
+        data = b"".join(upload["parts"][part.part_number] for part in parts)
+        return SimpleNamespace(etag=self.write(bucket_name, object_name, data))
+
+    def _abort_multipart_upload(self, bucket_name, object_name, upload_id):
+        self.uploads[upload_id]["aborted"] = True
+
+
+@pytest.fixture
+def client(monkeypatch) -> FakeMinio:
+    client = FakeMinio()
+    monkeypatch.setattr(MinIOStorage, "_get_client", lambda self: client)
+    return client
+
+
+@pytest.fixture
+def storage(client) -> MinIOStorage:
+    storage = MinIOStorage()
+    yield storage
+    storage.executor.shutdown()
+    storage.part_executor.shutdown()
+
+
+def _wav(frames: int = 40000, channels: int = 2, seed: int = 0, **kwargs) -> tuple[bytes, np.ndarray]:
+    audio_data = np.random.default_rng(seed).uniform(-0.9, 0.9, size=(frames, channels))
+    buffer = io.BytesIO()
+    sf.write(buffer, audio_data, SAMPLE_RATE, **{"format": "WAV", "subtype": "PCM_16", **kwargs})
+    data = buffer.getvalue()
+    return data, sf.read(io.BytesIO(data), always_2d=True)[0]
+
+
+def test_segment_is_read_with_a_ranged_get(client, storage):
+    data, expected = _wav()
+    client.write(BUCKET, "audio.wav", data)
+
+    audio_data, sample_rate = storage.get_audio_segment(BUCKET, "audio.wav", start_s=0.1, duration_s=0.2)
+    storage.get_audio_segment(BUCKET, "audio.wav", start_s=0.3, duration_s=0.1)
+
+    assert sample_rate == SAMPLE_RATE
+    np.testing.assert_allclose(audio_data, expected[800:2400])
+    # One header probe, then only the bytes of each segment (2 channels of PCM_16)
+    assert [length for _, _, length in client.gets[1:]] == [1600 * 4, 800 * 4]
+
+
+def test_segment_of_an_overwritten_object_is_read_again(client, storage):
+    data, _ = _wav(seed=0)
+    client.write(BUCKET, "audio.wav", data)
+    storage.get_wav_header(BUCKET, "audio.wav")
+    new_data, expected = _wav(frames=2000, channels=1, seed=1)
+    client.write(BUCKET, "audio.wav", new_data)
+
+    audio_data, _ = storage.get_audio_segment(BUCKET, "audio.wav", start_s=0.0, duration_s=0.1)
+
+    np.testing.assert_allclose(audio_data, expected[:800, 0])
+
+
+def test_segment_of_an_object_changing_on_every_read_fails(client, storage):
+    versions = iter(range(100))
+    client.on_get = lambda: client.write(BUCKET, "audio.wav", _wav(seed=next(versions))[0])
+
+    assert storage.get_audio_segment(BUCKET, "audio.wav", start_s=0.0, duration_s=0.1) is None
+
+
+def test_segment_of_a_non_wav_object_falls_back_to_a_full_download(client, storage):
+    data, expected = _wav(format="FLAC")
+    client.write(BUCKET, "audio.flac", data)
+
+    audio_data, _ = storage.get_audio_segment(BUCKET, "audio.flac", start_s=0.1, duration_s=0.2)
+
+    np.testing.assert_allclose(audio_data, expected[800:2400])
+    assert ("audio.flac", 0, 0) in client.gets
+
+
+def test_get_object_reads_through_the_disk_cache(client, tmp_path):
+    storage = MinIOStorage(cache_dir=tmp_path)
+    client.write(BUCKET, "a.jams", b"content")
+
+    assert storage.get_object(BUCKET, "a.jams") == b"content"
+    assert storage.get_object(BUCKET, "a.jams") == b"content"
+    client.write(BUCKET, "a.jams", b"new content")
+    assert storage.get_object(BUCKET, "a.jams") == b"new content"
+
+    assert len(client.gets) == 2
+    assert (storage.cache.statistics.hits, storage.cache.statistics.misses) == (1, 2)
+
+
+def test_object_index_is_populated_on_first_use_and_refreshed(client, tmp_path):
+    storage = MinIOStorage(index_path=tmp_path / "index.sqlite")
+    for name in ("ds1/a.wav", "ds1/b.wav", "ds2/a.wav", "readme.txt"):
+        client.write(BUCKET, name, b"content")
+
+    assert storage.object_exists(BUCKET, "ds1/a.wav")
+
+    client.write(BUCKET, "ds1/c.wav", b"content")
+    client.remove_object(BUCKET, "ds2/a.wav")
+    storage.refresh_index(BUCKET)
+    assert storage.index.names(BUCKET) == {"ds1/a.wav", "ds1/b.wav", "ds1/c.wav", "ds2/a.wav", "readme.txt"}
+
+    storage.refresh_index(BUCKET, full=True)
+    assert storage.index.names(BUCKET) == {"ds1/a.wav", "ds1/b.wav", "ds1/c.wav", "readme.txt"}
+    assert storage.index.stats(BUCKET) == {"nb_objects": 4, "total_size": 4 * 7}
+
+
+@pytest.mark.parametrize(
+    "content_type, size, compressed",
+    [
+        ("application/jams", 4096, True),
+        ("application/jams", 100, False),  # Below MINIO_COMPRESSION_MIN_BYTES
+        ("application/octet-stream", 4096, False),
+    ],
+)
+def test_text_objects_are_compressed_transparently(
+    client, monkeypatch, content_type, size, compressed
+):
+    monkeypatch.setattr(minio_config, "compression", GZIP)
+    storage = MinIOStorage()
+    data = (b"0123456789abcdef" * 1024)[:size]
+
+    storage.put_object(BUCKET, "a.jams", data, content_type=content_type)
+
+    stored, headers = client.objects[(BUCKET, "a.jams")]
+    assert (len(stored) < size) == compressed
+    assert ("Content-Encoding" in headers) == compressed
+    assert storage.get_object(BUCKET, "a.jams") == data
+
+
+def test_objects_with_a_non_compression_codec_are_not_decompressed(client, storage):
+    client.write(BUCKET, "a.flac", b"\x1f\x8bnot gzip", headers={"x-amz-meta-codec": "flac"})
+
+    assert storage.get_object(BUCKET, "a.flac") == b"\x1f\x8bnot gzip"
+
+
+@pytest.mark.parametrize(
+    "audio_format, file_name", [("FLAC", "a.flac"), ("WAV", "a.wav")]
+)
+def test_audio_is_stored_in_the_requested_format_losslessly(client, storage, audio_format, file_name):
+    # Values on the PCM_16 grid so both formats round-trip exactly.
+    audio_data = np.round(np.random.default_rng(0).uniform(-0.9, 0.9, size=(4000, 2)) * 2**15) / 2**15
+
+    uri = storage.put_audio(BUCKET, "a.wav", audio_data, SAMPLE_RATE, audio_format=audio_format)
+
+    assert uri == f"minio://{BUCKET}/{file_name}"
+    _, headers = client.objects[(BUCKET, file_name)]
+    assert headers["x-amz-meta-audio-format"] == audio_format.lower()
+    assert "x-amz-meta-codec" not in headers
+    decoded, sample_rate = storage.get_audio(BUCKET, file_name)
+    assert sample_rate == SAMPLE_RATE
+    np.testing.assert_array_equal(decoded, audio_data)
+
+
+@pytest.fixture
+def multipart(monkeypatch):
+    monkeypatch.setattr(minio_config, "multipart_threshold", MIN_PART_SIZE)
+    monkeypatch.setattr(minio_config, "multipart_part_size", MIN_PART_SIZE)
+    monkeypatch.setattr(minio_config, "multipart_retries", 2)
+    return np.random.default_rng(0).bytes(2 * MIN_PART_SIZE + 1000)
+
+
+def test_multipart_upload_retries_a_failed_part(client, storage, multipart):
+    client.part_failures = {2: 1}
+
+    uri = storage.put_object(BUCKET, "big.bin", multipart)
+
+    assert uri == f"minio://{BUCKET}/big.bin"
+    assert sorted(client.part_attempts) == [1, 2, 2, 3]
+    assert client.objects[(BUCKET, "big.bin")][0] == multipart
+    assert not client.uploads
+
+
+def test_multipart_upload_is_aborted_when_a_part_keeps_failing(client, storage, multipart):
+    client.part_failures = {3: 2}
+
+    with pytest.raises(OSError):
+        storage._upload(BUCKET, "big.bin", multipart, content_type="application/octet-stream")
+
+    assert client.part_attempts.count(3) == 2
+    assert [upload["aborted"] for upload in client.uploads.values()] == [True]
+    assert (BUCKET, "big.bin") not in client.objects
+
+
+def test_small_objects_are_uploaded_with_a_single_put(client, storage, multipart):
+    storage.put_object(BUCKET, "small.bin", multipart[: MIN_PART_SIZE - 1])
+
+    assert not client.part_attempts
+    assert client.objects[(BUCKET, "small.bin")][0] == multipart[: MIN_PART_SIZE - 1]
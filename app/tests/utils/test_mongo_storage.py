@@ -0,0 +1,116 @@
+import copy
+import logging
+from types import SimpleNamespace
+
+import pytest
+from config import mongo_config
+from src.storages.mongo_storage import MongoStorage
+
+BUCKET_DURATION = 10.0
+
+NOTES = [
+    {"time": 5.0, "duration": 2.0, "value": 60},  # bucket 0
+    {"time": 9.0, "duration": 2.0, "value": 61},  # buckets 0 and 1
+    {"time": 10.0, "duration": 1.0, "value": 62},  # starts on the boundary of bucket 1
+    {"time": 19.5, "duration": 0.5, "value": 63},  # ends on the boundary of bucket 2
+    {"time": 20.0, "duration": 1.0, "value": 64},  # bucket 2
+]
+
+
+class FakeCollection:
+    """In-memory collection supporting the equality, $gte and $lt filters of find_range."""
+
+    def __init__(self):
+        self.documents: list[dict] = []
+        self.operations: list = []
+
+    @staticmethod
+    def _matches(document: dict, filter: dict) -> bool:
+        for key, condition in filter.items():
+            value = document.get(key)
+            if isinstance(condition, dict):
+                if "$gte" in condition and not value >= condition["$gte"]:
+                    return False
+                if "$lt" in condition and not value < condition["$lt"]:
+                    return False
+            elif value != condition:
+                return False
+        return True
+
+    def find(self, filter: dict, projection: dict | None = None) -> list[dict]:
+        return [
+            copy.deepcopy(document)
+            for document in self.documents
+            if self._matches(document, filter)
+        ]
+
+    def update_one(self, filter: dict, update: dict, upsert: bool = False):
+        self.documents.append(update["$set"])
+        return SimpleNamespace(did_upsert=True)
+
+    def bulk_write(self, operations: list, ordered: bool = True):
+        self.operations.extend(operations)
+
+
+@pytest.fixture
+def storage(monkeypatch) -> MongoStorage:
+    monkeypatch.setattr(mongo_config, "bucket_duration", BUCKET_DURATION)
+    storage = MongoStorage.__new__(MongoStorage)
+    storage.logger = logging.getLogger("test")
+    storage._bulk_operations = None
+    storage.collections = {
+        "note_midi": FakeCollection(),
+        "note_midi_bucketed": FakeCollection(),
+    }
+    document = {
+        "dataset_name": "guitarset",
+        "title": "00_BN1-129-Eb_comp",
+        "note_midi": [{**note, "data_source": 0} for note in NOTES],
+        "inserted_at": None,
+    }
+    storage.collections["note_midi_bucketed"].documents = storage._to_buckets(document)
+    return storage
+
+
+def _values(events: list[dict]) -> list[int]:
+    return [event["value"] for event in events]
+
+
+def test_event_over_a_boundary_is_copied_into_both_buckets(storage):
+    buckets = storage.collections["note_midi_bucketed"].documents
+
+    assert {bucket["bucket_start"]: _values(bucket["events"]) for bucket in buckets} == {
+        0.0: [60, 61],
+        10.0: [61, 62, 63],
+        20.0: [64],
+    }
+
+
+@pytest.mark.parametrize(
+    "t0, t1, values",
+    [
+        (0.0, 10.0, [60, 61]),
+        (10.0, 20.0, [61, 62, 63]),
+        (9.5, 10.5, [61, 62]),
+        (19.9, 20.0, [63]),
+        (20.0, 30.0, [64]),
+        (0.0, 30.0, [60, 61, 62, 63, 64]),
+    ],
+)
+def test_find_range_on_bucket_boundaries(storage, t0, t1, values):
+    events = storage.find_range(title="00_BN1-129-Eb_comp", t0=t0, t1=t1)
+
+    assert _values(events) == values
+    assert all(event["data_source"] == "0" for event in events)
+
+
+def test_bucketed_document_is_also_written_whole(storage):
+    storage.collections["note_midi_bucketed"] = FakeCollection()
+
+    result = storage.insert_note_midi(
+        {"dataset_name": "guitarset", "title": "01_Jazz1-200-B_solo", "note_midi": NOTES}
+    )
+
+    assert result == "inserted"
+    assert storage.collections["note_midi"].documents[0]["note_midi"] == NOTES
+    assert len(storage.collections["note_midi_bucketed"].operations) == 3 + 1
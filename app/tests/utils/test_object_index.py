@@ -0,0 +1,58 @@
+from src.storages.object_index import ObjectIndex
+
+BUCKET = "raw"
+
+
+def _rows(*names: str) -> list[tuple]:
+    return [(name, 10 * (index + 1), f"etag{index}", None) for index, name in enumerate(names)]
+
+
+def test_prefix_only_matches_its_own_names(tmp_path):
+    index = ObjectIndex(index_path=tmp_path / "index.sqlite")
+    index.upsert(BUCKET, _rows("ds1/a.wav", "ds1/b.wav", "ds10/c.wav", "ds1.txt"))
+
+    assert index.names(BUCKET, prefix="ds1/") == {"ds1/a.wav", "ds1/b.wav"}
+    assert index.last_name(BUCKET, prefix="ds1/") == "ds1/b.wav"
+    assert index.last_name(BUCKET, prefix="ds2/") is None
+    assert len(index.names(BUCKET)) == 4
+
+
+def test_upsert_updates_existing_objects(tmp_path):
+    index = ObjectIndex(index_path=tmp_path / "index.sqlite")
+    index.upsert(BUCKET, _rows("a.wav", "b.wav"))
+
+    index.upsert(BUCKET, [("a.wav", 100, "etag9", None)])
+
+    assert index.stats(BUCKET) == {"nb_objects": 2, "total_size": 120}
+    assert index.stats("output") == {"nb_objects": 0, "total_size": 0}
+
+
+def test_replace_prefix_drops_objects_removed_under_it_only(tmp_path):
+    index = ObjectIndex(index_path=tmp_path / "index.sqlite")
+    index.upsert(BUCKET, _rows("ds1/a.wav", "ds1/b.wav", "ds2/a.wav"))
+
+    index.replace_prefix(BUCKET, prefix="ds1/", rows=_rows("ds1/b.wav", "ds1/c.wav"))
+
+    assert index.names(BUCKET) == {"ds1/b.wav", "ds1/c.wav", "ds2/a.wav"}
+
+
+def test_removed_object_no_longer_exists(tmp_path):
+    index = ObjectIndex(index_path=tmp_path / "index.sqlite")
+    index.upsert(BUCKET, _rows("a.wav"))
+
+    index.remove(BUCKET, "a.wav")
+
+    assert not index.exists(BUCKET, "a.wav")
+
+
+def test_index_is_kept_across_processes(tmp_path):
+    index = ObjectIndex(index_path=tmp_path / "index.sqlite")
+    index.upsert(BUCKET, _rows("a.wav"))
+    index.mark_refreshed(BUCKET)
+    index.close()
+
+    index = ObjectIndex(index_path=tmp_path / "index.sqlite")
+
+    assert index.is_refreshed(BUCKET)
+    assert not index.is_refreshed("output")
+    assert index.exists(BUCKET, "a.wav")
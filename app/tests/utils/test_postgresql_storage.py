@@ -0,0 +1,128 @@
+import itertools
+import logging
+import re
+from contextlib import nullcontext
+
+import numpy as np
+import pytest
+
+from src.storages.postgresql_storage import PostgresStorage
+
+ROWS = [
+    {"id_metadata": 1, "title": "00_BN1", "tempo": 129, "duration": 30.5},
+    {"id_metadata": 2, "title": "00_BN2", "tempo": None, "duration": 21.0},
+    {"id_metadata": 3, "title": "00_BN3", "tempo": 96, "duration": None},
+]
+
+
+class FakeServerCursor:
+    def __init__(self, connection: "FakeConnection", name: str):
+        self.connection = connection
+        self.name = name
+        self.itersize = None
+        self._rows = iter(())
+
+    def __enter__(self) -> "FakeServerCursor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def execute(self, query, params) -> None:
+        query = query.as_string(None)
+        self.connection.executed.append((self.name, query, params))
+        columns = re.findall(r'"(\w+)"', query.split(" FROM ")[0])
+        self._rows = iter([{column: row[column] for column in columns} for row in ROWS])
+
+    def fetchmany(self, size: int) -> list[dict]:
+        return list(itertools.islice(self._rows, size))
+
+
+class FakeConnection:
+    """Connection whose named cursors return ROWS, whatever the filters."""
+
+    def __init__(self):
+        self.executed: list[tuple[str, str, tuple]] = []
+
+    def transaction(self):
+        return nullcontext()
+
+    def cursor(self, name: str) -> FakeServerCursor:
+        return FakeServerCursor(self, name)
+
+
+@pytest.fixture
+def storage() -> PostgresStorage:
+    storage = PostgresStorage.__new__(PostgresStorage)
+    storage.logger = logging.getLogger("test")
+    storage.connection = FakeConnection()
+    storage._cursor_ids = itertools.count()
+    return storage
+
+
+def test_stream_metadata_composes_the_projection_and_filters(storage):
+    batches = list(
+        storage.stream_metadata(
+            columns=["id_metadata", "title"],
+            filters={"dataset_name": "GuitarSet", "style": "jazz"},
+            itersize=2,
+        )
+    )
+
+    assert batches == [
+        [{"id_metadata": 1, "title": "00_BN1"}, {"id_metadata": 2, "title": "00_BN2"}],
+        [{"id_metadata": 3, "title": "00_BN3"}],
+    ]
+    ((name, query, params),) = storage.connection.executed
+    assert name == "stream_metadata_0"
+    assert query == (
+        'SELECT "id_metadata", "title" FROM metadata'
+        ' WHERE "dataset_name"=%s AND "style"=%s ORDER BY id_metadata;'
+    )
+    assert params == ("GuitarSet", "jazz")
+
+
+def test_concurrent_streams_use_distinct_cursors(storage):
+    first = storage.stream_metadata(columns=["id_metadata"], itersize=1)
+    second = storage.stream_metadata(columns=["id_metadata"], itersize=1)
+    next(first), next(second)
+
+    assert [name for name, _, _ in storage.connection.executed] == [
+        "stream_metadata_0",
+        "stream_metadata_1",
+    ]
+
+
+def test_stream_metadata_as_numpy_columns(storage):
+    (batch,) = storage.stream_metadata(
+        columns=["id_metadata", "title", "tempo", "duration"], itersize=10, batch_format="numpy"
+    )
+
+    assert batch["id_metadata"].dtype == np.int32
+    assert batch["title"].dtype == object
+    np.testing.assert_array_equal(batch["tempo"], [129.0, np.nan, 96.0])
+    np.testing.assert_array_equal(batch["duration"], [30.5, 21.0, np.nan])
+
+
+def test_stream_metadata_as_arrow_batches(storage):
+    pa = pytest.importorskip("pyarrow")
+
+    (batch,) = storage.stream_metadata(columns=["title", "tempo"], itersize=10, batch_format="arrow")
+
+    assert batch.schema == pa.schema([("title", pa.string()), ("tempo", pa.int32())])
+    assert batch.column("tempo").to_pylist() == [129, None, 96]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"columns": ["title; DROP TABLE metadata"]},
+        {"filters": {"unknown": 1}},
+        {"batch_format": "pandas"},
+    ],
+)
+def test_stream_metadata_rejects_unknown_columns_and_formats(storage, kwargs):
+    with pytest.raises(ValueError):
+        next(storage.stream_metadata(**kwargs))
+
+    assert not storage.connection.executed
@@ -0,0 +1,161 @@
+import json
+import time
+from collections import Counter
+
+import pytest
+
+from src.utils.profiler import (
+    CPU,
+    MEMORY,
+    Profiler,
+    merge_profiles,
+    profile_summary,
+    read_collapsed,
+    write_collapsed,
+)
+
+
+def _report(seconds: float, traced_peak_mb: float, rss_peak_mb: float | None, sites: dict) -> dict:
+    return {
+        "processes": 1,
+        "stages": {
+            "jams": {
+                "seconds": seconds,
+                "traced_peak_mb": traced_peak_mb,
+                "rss_peak_mb": rss_peak_mb,
+                "sites": sites,
+            }
+        },
+    }
+
+
+def test_collapsed_stacks_round_trip(tmp_path):
+    samples = Counter({"jams;MainThread;main:main;jams:read": 3, "run;MainThread;main:main": 1})
+
+    path = write_collapsed(samples, tmp_path / "profile.collapsed")
+
+    assert path.read_text(encoding="utf-8").splitlines() == [
+        "jams;MainThread;main:main;jams:read 3",
+        "run;MainThread;main:main 1",
+    ]
+    assert read_collapsed(path) == samples
+
+
+def test_merge_profiles_sums_collapsed_samples(tmp_path):
+    paths = [
+        write_collapsed(Counter({"jams;MainThread;jams:read": 3}), tmp_path / "a.collapsed"),
+        write_collapsed(
+            Counter({"jams;MainThread;jams:read": 2, "wav;ThreadPoolExecutor-0;sf:read": 5}),
+            tmp_path / "b.collapsed",
+        ),
+    ]
+
+    path = merge_profiles(paths, tmp_path / "merged" / "profile")
+
+    assert path.name == "profile.collapsed"
+    assert read_collapsed(path) == Counter(
+        {"jams;MainThread;jams:read": 5, "wav;ThreadPoolExecutor-0;sf:read": 5}
+    )
+    assert merge_profiles([], tmp_path / "empty") is None
+
+
+def test_merge_profiles_sums_durations_and_keeps_peaks(tmp_path):
+    reports = [
+        _report(1.5, 10.0, 200.0, {"a.py:1": {"size_kb": 100.0, "count": 2}}),
+        _report(
+            2.0,
+            30.0,
+            None,
+            {"a.py:1": {"size_kb": 50.0, "count": 1}, "b.py:2": {"size_kb": 400.0, "count": 4}},
+        ),
+    ]
+    paths = []
+    for index, report in enumerate(reports):
+        paths.append(tmp_path / f"profile_{index}.json")
+        paths[-1].write_text(json.dumps(report), encoding="utf-8")
+
+    path = merge_profiles(paths, tmp_path / "merged")
+
+    merged = json.loads(path.read_text(encoding="utf-8"))
+    assert merged["processes"] == 2
+    assert merged["stages"]["jams"] == {
+        "seconds": 3.5,
+        "traced_peak_mb": 30.0,
+        "rss_peak_mb": 200.0,
+        "sites": {"b.py:2": {"size_kb": 400.0, "count": 4}, "a.py:1": {"size_kb": 150.0, "count": 3}},
+    }
+
+
+def test_profile_summary_of_collapsed_samples(tmp_path):
+    path = write_collapsed(
+        Counter({"jams;MainThread;main:main;jams:read": 3, "run;MainThread;main:main": 1}),
+        tmp_path / "profile.collapsed",
+    )
+
+    assert profile_summary(path).splitlines() == [
+        "jams: 3 samples (75.0%)",
+        "\t 75.0% self  jams:read",
+        "run: 1 samples (25.0%)",
+        "\t 25.0% self  main:main",
+    ]
+
+
+def test_profile_summary_of_a_memory_report(tmp_path):
+    path = tmp_path / "profile.json"
+    path.write_text(
+        json.dumps(_report(1.5, 10.0, 200.0, {"a.py:1": {"size_kb": 100.0, "count": 2}})),
+        encoding="utf-8",
+    )
+
+    assert profile_summary(path).splitlines() == [
+        "jams: 1.5s, traced_peak=10.0 MB, rss_peak=200.0 MB",
+        "\t+100.0 KB (+2 blocks)  a.py:1",
+    ]
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        Profiler().start("wall")
+
+
+def test_stopped_profiler_writes_nothing(tmp_path):
+    profiler = Profiler()
+
+    with profiler.stage("jams"):
+        pass
+
+    assert profiler.stop(tmp_path / "profile") is None
+
+
+def test_cpu_samples_are_attributed_to_the_current_stage(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.utils.profiler.profiling_config.sampling_interval", 0.001)
+    profiler = Profiler()
+
+    profiler.start(CPU)
+    with profiler.stage("jams"):
+        deadline = time.perf_counter() + 0.2
+        while time.perf_counter() < deadline:
+            pass
+    path = profiler.stop(tmp_path / "profile")
+
+    assert path.name == "profile.collapsed"
+    stages = {stack.split(";")[0] for stack in read_collapsed(path)}
+    assert "jams" in stages
+    assert profiler.mode is None
+
+
+def test_memory_allocations_are_attributed_to_the_current_stage(tmp_path):
+    profiler = Profiler()
+
+    profiler.start(MEMORY)
+    with profiler.stage("jams"):
+        blocks = [bytearray(1024 * 1024) for _ in range(4)]
+    path = profiler.stop(tmp_path / "profile")
+
+    report = json.loads(path.read_text(encoding="utf-8"))
+    assert path.name == "profile.json"
+    assert set(report["stages"]) == {"run", "jams"}
+    assert report["stages"]["jams"]["traced_peak_mb"] >= 4
+    largest_site = next(iter(report["stages"]["jams"]["sites"]))
+    assert largest_site.startswith(__file__)
+    del blocks
@@ -0,0 +1,106 @@
+import multiprocessing
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from src.storages.shared_audio_cache import SharedAudioCache
+
+SAMPLE_RATE = 8000
+
+
+@pytest.fixture
+def cache():
+    cache = SharedAudioCache(max_bytes=3 * 4000 * 4, load_timeout=60)
+    yield cache
+    cache.close()
+
+
+def _loader(calls: list, value: float = 0.5, frames: int = 4000):
+    def load():
+        calls.append(value)
+        return np.full(frames, value, dtype=np.float64), SAMPLE_RATE
+
+    return load
+
+
+def test_audio_is_decoded_once_then_attached(cache):
+    calls = []
+
+    with cache.audio("raw/a.wav", _loader(calls)) as (audio_data, sample_rate):
+        assert sample_rate == SAMPLE_RATE
+        assert audio_data.dtype == np.float32
+        assert not audio_data.flags.writeable
+        np.testing.assert_array_equal(audio_data, np.full(4000, 0.5, dtype=np.float32))
+    with cache.audio("raw/a.wav", _loader(calls, value=0.1)) as (audio_data, _):
+        np.testing.assert_array_equal(audio_data, np.full(4000, 0.5, dtype=np.float32))
+
+    assert calls == [0.5]
+    statistics = cache.statistics()
+    assert (statistics["hits"], statistics["misses"], statistics["entries"]) == (1, 1, 1)
+    assert statistics["resident_bytes"] == 4000 * 4
+
+
+def test_failed_load_leaves_no_entry(cache):
+    with cache.audio("raw/missing.wav", lambda: None) as result:
+        assert result is None
+
+    def fail():
+        raise OSError("Truncated file")
+
+    with cache.audio("raw/broken.wav", fail) as result:
+        assert result is None
+    assert cache.statistics()["entries"] == 0
+
+
+def test_unreferenced_entries_are_evicted_in_lru_order(cache):
+    calls = []
+    held = cache.acquire("raw/held.wav", _loader(calls))
+    for name in ["a", "b", "c"]:
+        with cache.audio(f"raw/{name}.wav", _loader(calls)):
+            pass
+    # 'a' was evicted for 'c', the held entry is the oldest but stays resident
+    with cache.audio("raw/a.wav", _loader(calls)):
+        pass
+
+    statistics = cache.statistics()
+    assert statistics["resident_bytes"] <= cache.max_bytes
+    assert statistics["evictions"] == 2
+    assert set(cache._entries.keys()) == {"raw/held.wav", "raw/c.wav", "raw/a.wav"}
+    np.testing.assert_array_equal(held.audio_data, np.full(4000, 0.5, dtype=np.float32))
+    cache.release(held)
+
+
+def test_key_of_a_dead_loader_is_reclaimed(cache):
+    process = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True
+    )
+    cache._entries["raw/a.wav"] = {
+        "state": "loading",
+        "refcount": 1,
+        "token": "dead",
+        "pid": int(process.stdout),
+        "deadline": time.monotonic() + 60,
+    }
+    calls = []
+
+    with cache.audio("raw/a.wav", _loader(calls)) as (audio_data, _):
+        assert audio_data[0] == 0.5
+
+    assert calls == [0.5]
+
+
+def _worker_sum(cache: SharedAudioCache) -> float:
+    with cache.audio("raw/a.wav", _loader([], value=0.25)) as (audio_data, _):
+        return float(audio_data.sum())
+
+
+def test_worker_processes_attach_to_the_block_of_the_coordinator(cache):
+    with cache.audio("raw/a.wav", _loader([])):
+        with multiprocessing.get_context("spawn").Pool(processes=2) as pool:
+            sums = pool.map(_worker_sum, [cache, cache])
+
+    assert sums == [2000.0, 2000.0]
+    assert cache.statistics()["hits"] == 2
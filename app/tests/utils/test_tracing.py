@@ -0,0 +1,123 @@
+import contextvars
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.utils.tracing import Tracer, merge_trace_files
+
+
+def _spans(trace: dict) -> list[dict]:
+    return [event for event in trace["traceEvents"] if event["ph"] == "X"]
+
+
+def test_spans_are_recorded_only_inside_a_recording():
+    tracer = Tracer(enabled=True, sample_rate=1.0, max_events=100)
+
+    tracer.record("minio.get", time.perf_counter(), 0.01)
+    with tracer.recording("track_01"):
+        tracer.record("minio.get", time.perf_counter(), 0.01, bytes_read=1024)
+    tracer.record("minio.get", time.perf_counter(), 0.01)
+
+    spans = _spans(tracer.trace())
+    assert len(spans) == 1
+    assert spans[0]["cat"] == "minio"
+    assert spans[0]["dur"] == pytest.approx(10_000)
+    assert spans[0]["args"] == {"recording": "track_01", "bytes_read": 1024}
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer(enabled=False, sample_rate=1.0, max_events=100)
+
+    with tracer.recording("track_01"):
+        tracer.record("minio.get", time.perf_counter(), 0.01)
+
+    assert not _spans(tracer.trace())
+
+
+def test_recording_is_carried_to_worker_threads_with_the_context():
+    tracer = Tracer(enabled=True, sample_rate=1.0, max_events=100)
+
+    with tracer.recording("track_01"), ThreadPoolExecutor(max_workers=1) as executor:
+        executor.submit(
+            contextvars.copy_context().run, tracer.record, "minio.get", time.perf_counter(), 0.01
+        ).result()
+
+    spans = _spans(tracer.trace())
+    assert [span["args"]["recording"] for span in spans] == ["track_01"]
+    assert spans[0]["tid"] != threading.get_native_id()
+
+
+def test_sampling_is_stable_for_a_recording():
+    tracer = Tracer(enabled=True, sample_rate=0.5, max_events=100)
+    ids = [f"track_{index:03d}" for index in range(400)]
+
+    sampled = [tracer.sampled(correlation_id) for correlation_id in ids]
+
+    assert sampled == [Tracer(sample_rate=0.5).sampled(correlation_id) for correlation_id in ids]
+    assert 120 < sum(sampled) < 280
+
+
+def test_events_above_the_limit_are_dropped():
+    tracer = Tracer(enabled=True, sample_rate=1.0, max_events=2)
+
+    with tracer.recording("track_01"):
+        for _ in range(5):
+            tracer.record("minio.get", time.perf_counter(), 0.01)
+
+    trace = tracer.trace()
+    assert len(_spans(trace)) == 2
+    assert trace["otherData"]["dropped_events"] == 3
+
+
+def test_write_returns_none_without_spans(tmp_path):
+    tracer = Tracer(enabled=True, sample_rate=1.0, max_events=100)
+
+    assert tracer.write(tmp_path / "trace.json") is None
+    assert not (tmp_path / "trace.json").exists()
+
+
+def test_write_and_merge_trace_files(tmp_path):
+    paths = []
+    for index in range(2):
+        tracer = Tracer(enabled=True, sample_rate=1.0, max_events=1)
+        with tracer.recording(f"track_{index}"):
+            tracer.record("minio.get", time.perf_counter(), 0.01)
+            tracer.record("minio.get", time.perf_counter(), 0.01)
+        paths.append(tracer.write(tmp_path / "traces" / f"trace_{index}.json"))
+
+    written = json.loads(paths[0].read_text(encoding="utf-8"))
+    assert [event["name"] for event in written["traceEvents"]] == [
+        "process_name",
+        "thread_name",
+        "minio.get",
+    ]
+
+    path = merge_trace_files(paths, tmp_path / "merged" / "trace.json")
+
+    merged = json.loads(path.read_text(encoding="utf-8"))
+    assert [span["args"]["recording"] for span in _spans(merged)] == ["track_0", "track_1"]
+    assert merged["otherData"]["dropped_events"] == 2
+    assert merge_trace_files([], tmp_path / "empty.json") is None
+
+
+def test_slowest_breaks_down_the_spans_of_a_recording():
+    tracer = Tracer(enabled=True, sample_rate=1.0, max_events=100)
+    start = time.perf_counter()
+
+    with tracer.recording("track_01"):
+        tracer.record("stage.jams", start, 0.1)
+        tracer.record("minio.get", start + 0.01, 0.02)
+        tracer.record("minio.get", start + 0.05, 0.03)
+    with tracer.recording("track_02"):
+        tracer.record("stage.jams", start, 0.05)
+        tracer.record("minio.get", start + 0.01, 0.02)
+
+    slowest = tracer.slowest("stage.jams", limit=1)
+
+    assert len(slowest) == 1
+    assert slowest[0]["recording"] == "track_01"
+    assert slowest[0]["ms"] == pytest.approx(100)
+    assert slowest[0]["breakdown_ms"] == {"minio.get": pytest.approx(50, abs=0.01)}
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+import soundfile as sf
+
+from config import scheduling_config
+from src.utils.work_scheduler import Schedule, predict_makespan, probe_audio_cost
+
+
+@pytest.fixture(autouse=True)
+def cost_model(monkeypatch):
+    monkeypatch.setattr(scheduling_config, "cost_overhead_seconds", 0.0)
+    monkeypatch.setattr(scheduling_config, "cost_samples_per_second", 1000.0)
+
+
+def _wav(path, frames: int, channels: int = 1):
+    sf.write(path, np.zeros((frames, channels)), 8000, subtype="PCM_16")
+    return path
+
+
+def test_probe_reads_the_number_of_samples_from_the_header(tmp_path):
+    cost = probe_audio_cost(_wav(tmp_path / "a.wav", frames=2000, channels=2))
+
+    assert cost.samples == 4000
+    assert cost.cost == pytest.approx(4.0)
+    assert cost.file_bytes == (tmp_path / "a.wav").stat().st_size
+
+
+def test_probe_of_an_unreadable_header_assumes_16_bit_pcm(tmp_path):
+    path = tmp_path / "broken.wav"
+    path.write_bytes(b"\x00" * 3000)
+
+    assert probe_audio_cost(path).samples == 1500
+
+
+def test_predict_makespan_dispatches_to_the_first_idle_worker():
+    assert predict_makespan([1, 1, 1, 1, 4], nb_workers=2) == 6
+    assert predict_makespan([4, 1, 1, 1, 1], nb_workers=2) == 4
+    assert predict_makespan([3], nb_workers=0) == 3
+
+
+def test_largest_first_schedule(tmp_path):
+    paths = [
+        _wav(tmp_path / f"{index}_{frames}.wav", frames=frames)
+        for index, frames in enumerate([1000, 1000, 1000, 1000, 4000])
+    ]
+
+    schedule = Schedule.largest_first(paths, nb_workers=2)
+
+    assert schedule.file_paths[0] == tmp_path / "4_4000.wav"
+    assert schedule.predicted_makespan == pytest.approx(4.0)
+    report = schedule.report(actual_makespan=8.0)
+    assert report["samples"] == 8000
+    assert report["error_ratio"] == 2.0
+    assert report["fitted_samples_per_second"] == 500
@@ -23,4 +23,45 @@ CREATE TABLE IF NOT EXISTS metadata (
     composer VARCHAR(255),
     recording_source VARCHAR(255)
     -- polyphony BOOLEAN
-);
\ No newline at end of file
+);
+
+CREATE INDEX IF NOT EXISTS idx_metadata_dataset_name ON metadata (dataset_name);
+CREATE INDEX IF NOT EXISTS idx_metadata_style ON metadata (style);
+CREATE INDEX IF NOT EXISTS idx_metadata_guitarist_id ON metadata (guitarist_id);
+CREATE INDEX IF NOT EXISTS idx_metadata_playing_version ON metadata (playing_version);
+
+CREATE TABLE IF NOT EXISTS annotation_statistics (
+    id_metadata INTEGER PRIMARY KEY REFERENCES metadata (id_metadata) ON DELETE CASCADE,
+    n_pitch_contour INTEGER,
+    n_notes INTEGER,
+    n_beats INTEGER,
+    n_chords INTEGER,
+    pitch_min FLOAT,
+    pitch_max FLOAT,
+    pitch_histogram INTEGER[],
+    note_duration_mean FLOAT,
+    note_density FLOAT,
+    distinct_chords INTEGER,
+    ibi_mean FLOAT,
+    ibi_std FLOAT,
+    ibi_min FLOAT,
+    ibi_max FLOAT
+);
+
+CREATE TABLE IF NOT EXISTS ingestion_jobs (
+    id_job SERIAL PRIMARY KEY,
+    pipeline VARCHAR(255) NOT NULL,
+    kind VARCHAR(15) NOT NULL,
+    file_path TEXT NOT NULL,
+    dataset_number INTEGER,
+    status VARCHAR(15) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claimed_by VARCHAR(255),
+    lease_expires_at TIMESTAMPTZ,
+    error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    UNIQUE (pipeline, file_path)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_status ON ingestion_jobs (pipeline, status, id_job);